@@ -0,0 +1,60 @@
+"""
+Measures requests per second for /games/ under the database adapter, with the old connection setup
+(NullPool, SQLite defaults) and with the configured connection pool and pragmas.
+
+Run from the project directory:
+    python -m benchmarks.database_pool_benchmark [number of requests]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.orm import clear_mappers
+
+from games import create_app
+from games.config import Config
+
+CONFIGURATIONS = {
+    'NullPool, no pragmas': dict(SQLALCHEMY_POOL_CLASS='null', SQLITE_JOURNAL_MODE=None, SQLITE_SYNCHRONOUS=None, SQLITE_MMAP_SIZE=None, SQLITE_CACHE_SIZE=None),
+    'QueuePool + pragmas': dict(),  # The defaults from Config
+}
+
+
+def make_config(database_uri, **overrides):
+    config = Config()
+    config.TESTING = False
+    config.REPOSITORY_ADAPTER_TYPE = 'database'
+    config.SQLALCHEMY_DATABASE_URI = database_uri
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return config
+
+
+def requests_per_second(database_uri, requests, **overrides):
+    clear_mappers()
+    client = create_app(make_config(database_uri, **overrides)).test_client()
+    for _ in range(10):  # warm up
+        client.get('/games/')
+
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get('/games/?page={}'.format(i % 20 + 1))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_uri = 'sqlite:///{}'.format(Path(directory) / 'benchmark.db')
+
+        clear_mappers()
+        create_app(make_config(database_uri))  # Populates the database from games.csv
+
+        for name, overrides in CONFIGURATIONS.items():
+            print(f"{name:24} {requests_per_second(database_uri, requests, **overrides):8.1f} requests/s")
+
+
+if __name__ == '__main__':
+    main()
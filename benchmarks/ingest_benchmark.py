@@ -0,0 +1,39 @@
+"""
+Measures how long parsing the games CSV file into columns takes with different numbers of worker processes, on a
+synthetic catalogue made of copies of the bundled games (with new AppIDs).
+
+Run from the project directory:
+    python -m benchmarks.ingest_benchmark [number of games] [largest number of workers]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.startup_benchmark import synthetic_csv
+from games.repository.game_repository.adapters import csv_ingest
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "games.csv"
+        synthetic_csv(path, n)
+        print(f"{n} games, {path.stat().st_size / 2 ** 20:.1f} MiB CSV, {os.cpu_count()} CPU cores")
+
+        workers = 1
+        baseline = None
+        while workers <= max_workers:
+            start = time.perf_counter()
+            columns = csv_ingest.read_columns(path, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:3} workers {elapsed:7.2f}s   {len(columns) / elapsed:9.0f} games/s   speedup {baseline / elapsed:5.2f}x")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures the memory of a CSV adapter worker after loading a synthetic catalogue (copies of the bundled games with
+new AppIDs and unique descriptions), with descriptions held by every game (parsing games.csv) versus read on demand
+from the snapshot's memory mapped detail file. Several workers are forked from one loaded process, like a pre-forking
+server, and each one renders every game page's description once.
+
+Reports, per worker, the resident set size (RSS) and the memory that isn't shared with any other process (private).
+Only works on Linux, since it reads /proc/<pid>/smaps_rollup.
+
+Run from the project directory:
+    python -m benchmarks.memory_benchmark [number of games] [number of workers]
+"""
+import csv
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.startup_benchmark import GAMES_CSV
+from games.repository.game_repository.adapters import csv_snapshot
+
+WORKER = """
+import os, sys, time
+from pathlib import Path
+from games.repository.game_repository.adapters import csv_game_repository
+
+path, directory, workers = sys.argv[1], sys.argv[2], int(sys.argv[3])
+csv_game_repository.games_csv_path = lambda testing: Path(path)  # load the synthetic catalogue instead
+
+repository = csv_game_repository.CSVGameRepository()
+repository.populate(False, snapshot_directory=directory or None)
+
+
+def memory(pid):
+    values = {}
+    with open("/proc/{}/smaps_rollup".format(pid)) as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return values["Rss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+workers_started = []  # (pid, end of the pipe the worker writes to once it has read every description)
+for _ in range(workers):
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        sum(len(repository.get_game(game_id).description or "") for game_id in range(1, repository.get_number_of_games() + 1))
+        os.write(write_end, b"x")
+        time.sleep(60)  # stay alive until measured
+        os._exit(0)
+    workers_started.append((pid, read_end))
+
+children = []
+for pid, read_end in workers_started:
+    os.read(read_end, 1)
+    children.append(memory(pid))
+    os.kill(pid, 9)
+
+rss = sum(rss for rss, _ in children) / len(children)
+private = sum(private for _, private in children) / len(children)
+print(rss, private)
+"""
+
+
+def synthetic_csv(path: Path, n: int):
+    with open(GAMES_CSV, mode='r', encoding='utf-8-sig', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        rows = list(reader)
+    id_position, description_position = header.index("AppID"), header.index("About the game")
+
+    with open(path, mode='w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for i in range(n):
+            row = list(rows[i % len(rows)])
+            row[id_position] = str(i + 1)
+            row[description_position] = "{} ({})".format(row[description_position], i + 1)  # no two games share one
+            writer.writerow(row)
+
+
+def worker_memory(path: Path, directory: str, workers: int):
+    output = subprocess.run([sys.executable, "-c", WORKER, str(path), directory, str(workers)], capture_output=True, text=True, check=True).stdout
+    rss, private = output.split()[-2:]
+    return float(rss), float(private)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "games.csv"
+        synthetic_csv(path, n)
+        snapshot_directory = str(Path(directory) / "snapshots")
+        csv_snapshot.compile_snapshot(path, snapshot_directory)
+
+        print(f"{n} games, {workers} workers, "
+              f"{csv_snapshot.details_path(path, snapshot_directory).stat().st_size / 2 ** 20:.1f} MiB of details")
+        for name, source in (("Descriptions held", ""), ("Descriptions mapped", snapshot_directory)):
+            rss, private = worker_memory(path, source, workers)
+            print(f"{name:20} per worker: RSS {rss:7.1f} MiB   private {private:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures search latency per query on a synthetic catalogue built from the bundled game titles.
+
+Run from the project directory:
+    python -m benchmarks.search_benchmark [number of titles]
+"""
+import csv
+import random
+import sys
+import time
+import warnings
+from pathlib import Path
+from statistics import mean, median
+
+from games.repository.search_index import SearchIndex
+
+GAMES_CSV = Path(__file__).parent.parent / "games" / "repository" / "game_repository" / "data" / "games.csv"
+QUERIES = ["call of duty", "earth defense", "racing", "zombie survival", "space", "farm simulator", "dark", "puzzle adventure", "war", "vr"]
+
+
+def synthetic_titles(n: int, seed: int = 235):
+    with open(GAMES_CSV, mode='r', encoding='utf-8-sig') as csv_file:
+        titles = [row["Name"] for row in csv.DictReader(csv_file)]
+    words = [word for title in titles for word in title.split()]
+
+    rng = random.Random(seed)
+    generated = list(titles)
+    while len(generated) < n:
+        generated.append(" ".join(rng.choice(words) for _ in range(rng.randint(1, 5))))
+    return generated[:n]
+
+
+def time_queries(search, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    titles = synthetic_titles(n)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for game_id, title in enumerate(titles, start=1):
+        index.add(game_id, title)
+    print(f"{n} titles, index built in {time.perf_counter() - start:.2f}s")
+
+    timings = time_queries(index.search, QUERIES)
+    print(f"indexed search:      mean {mean(timings):8.1f} ms   median {median(timings):8.1f} ms   max {max(timings):8.1f} ms")
+
+    # The previous implementation scored every title with thefuzz and sorted the whole catalogue
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from thefuzz import fuzz
+
+    def score_everything(query):
+        results = [(fuzz.token_sort_ratio(title.lower(), query.lower()), game_id) for game_id, title in enumerate(titles, start=1)]
+        results.sort(reverse=True)
+        return results
+
+    timings = time_queries(score_everything, QUERIES[:3])
+    print(f"score every title:   mean {mean(timings):8.1f} ms   median {median(timings):8.1f} ms   max {max(timings):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
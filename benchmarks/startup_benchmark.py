@@ -0,0 +1,74 @@
+"""
+Measures how long a CSV adapter worker takes to load the games at startup, parsing games.csv versus loading its
+compiled snapshot, on a synthetic catalogue made of copies of the bundled games (with new AppIDs).
+Each load runs in a fresh process, like a worker starting.
+
+Run from the project directory:
+    python -m benchmarks.startup_benchmark [number of games]
+"""
+import csv
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from games.repository.game_repository.adapters import csv_snapshot
+
+GAMES_CSV = Path(__file__).parent.parent / "games" / "repository" / "game_repository" / "data" / "games.csv"
+
+WORKER = """
+import sys, time
+from pathlib import Path
+start = time.perf_counter()
+from games.repository.game_repository.adapters import csv_game_repository
+imported = time.perf_counter()
+
+path, directory = sys.argv[1], sys.argv[2]
+csv_game_repository.games_csv_path = lambda testing: Path(path)  # load the synthetic catalogue instead
+
+repository = csv_game_repository.CSVGameRepository()
+repository.populate(False, snapshot_directory=directory or None)
+print(time.perf_counter() - imported, time.perf_counter() - start)
+"""
+
+
+def synthetic_csv(path: Path, n: int):
+    with open(GAMES_CSV, mode='r', encoding='utf-8-sig', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        rows = list(reader)
+    id_position = header.index("AppID")
+
+    with open(path, mode='w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for i in range(n):
+            row = list(rows[i % len(rows)])
+            row[id_position] = str(i + 1)
+            writer.writerow(row)
+
+
+def cold_start(path: Path, directory: str):
+    output = subprocess.run([sys.executable, "-c", WORKER, str(path), directory], capture_output=True, text=True, check=True).stdout
+    load, total = output.split()[-2:]
+    return float(load), float(total)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "games.csv"
+        synthetic_csv(path, n)
+        snapshot_directory = str(Path(directory) / "snapshots")
+        csv_snapshot.compile_snapshot(path, snapshot_directory)
+
+        print(f"{n} games, {path.stat().st_size / 2 ** 20:.1f} MiB CSV, "
+              f"{csv_snapshot.snapshot_path(path, snapshot_directory).stat().st_size / 2 ** 20:.1f} MiB snapshot")
+        for name, source in (("CSV", ""), ("Snapshot", snapshot_directory)):
+            load, total = min(cold_start(path, source) for _ in range(3))
+            print(f"{name:10} load {load:6.2f}s   process start to loaded {total:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,10 @@ from games.home import home_blueprint
 from games.authentication import authenticaton_blueprint
 from games.wishlist import wishlist_blueprint
 from games.profile import profile_blueprint
-from games.utils.rendering import render_template # custom render_template that automatically passes in genres to create sidebar
+from games.utils import response_cache
+from games.utils.response_cache import create_response_cache
+from games.utils.http_caching import hashed_static_url, static_cache_headers
+from games.utils.rendering import render_template, template_defaults # template_defaults gives every template the cached sidebar
 from games.config import Config
 from games.reviews import review_blueprint
 
@@ -18,8 +21,8 @@ load_dotenv()
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, clear_mappers
-from sqlalchemy.pool import NullPool
-from games.repository.orm import metadata, map_model_to_tables
+from sqlalchemy.pool import NullPool, QueuePool, SingletonThreadPool, StaticPool
+from games.repository.orm import metadata, map_model_to_tables, create_search_index, create_indexes, create_rating_summaries, create_data_versions, set_sqlite_pragmas
 
 from games.repository.game_repository.adapters import csv_game_repository, database_game_repository
 from games.repository.user_repository.adapters import csv_user_repository, database_user_repository
@@ -27,6 +30,38 @@ from games.repository.review_repository.adapters import csv_review_repository, d
 from games.repository.wishlist_repository.adapters import csv_wishlist_repository, database_wishlist_repository
 
 from games.repository.orm import SessionContextManager
+from games.repository.database_loader import DatabaseLoader
+
+POOL_CLASSES = {'null': NullPool, 'queue': QueuePool, 'singleton': SingletonThreadPool, 'static': StaticPool}
+
+
+def create_database_engine(database_uri, config):
+    """Create the database engine with the connection pool and SQLite pragmas from the app config."""
+    pool_name = config.get('SQLALCHEMY_POOL_CLASS') or Config.SQLALCHEMY_POOL_CLASS
+    if pool_name not in POOL_CLASSES:
+        raise ValueError(f"Invalid pool class {pool_name}, must be one of {list(POOL_CLASSES)}")
+    pool_class = POOL_CLASSES[pool_name]
+
+    pool_options = {}
+    if pool_class is QueuePool:
+        pool_options['pool_size'] = config.get('SQLALCHEMY_POOL_SIZE')
+        pool_options['max_overflow'] = config.get('SQLALCHEMY_MAX_OVERFLOW')
+    elif pool_class is SingletonThreadPool:
+        pool_options['pool_size'] = config.get('SQLALCHEMY_POOL_SIZE')
+    if pool_class is not NullPool and config.get('SQLALCHEMY_POOL_RECYCLE') is not None:
+        pool_options['pool_recycle'] = config.get('SQLALCHEMY_POOL_RECYCLE')
+
+    database_engine = create_engine(database_uri, connect_args={"check_same_thread": False}, poolclass=pool_class, echo=config.get('SQLALCHEMY_ECHO'), **pool_options)
+
+    set_sqlite_pragmas(database_engine, {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS'),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE'),
+        'cache_size': config.get('SQLITE_CACHE_SIZE'),
+    })
+
+    return database_engine
+
 
 def create_app(custom_config=None):
     """Construct the core application."""
@@ -51,9 +86,8 @@ def create_app(custom_config=None):
         database_uri = app.config.get('SQLALCHEMY_DATABASE_URI')
         if testing:
             database_uri = database_uri + "_test"
-        database_echo = app.config.get('SQLALCHEMY_ECHO')
 
-        database_engine = create_engine(database_uri, connect_args={"check_same_thread": False}, poolclass=NullPool, echo=database_echo)
+        database_engine = create_database_engine(database_uri, app.config)
 
         session_factory = sessionmaker(autocommit=False, autoflush=True, bind=database_engine)
         session_context = SessionContextManager(session_factory)
@@ -68,19 +102,23 @@ def create_app(custom_config=None):
             # For testing, or first-time use of the web application, reinitialise the database.
             clear_mappers()
             metadata.create_all(database_engine)  # Conditionally create database tables.
+            create_search_index(database_engine)
+            create_indexes(database_engine)
             for table in reversed(metadata.sorted_tables):  # Remove any data from the tables.
                 database_engine.execute(table.delete())
 
             # Generate mappings that map domain model classes to the database tables.
             map_model_to_tables()
 
-            game_repository.game_repo_instance.populate(testing)
-            user_repository.user_repo_instance.populate(testing)
-            review_repository.review_repo_instance.populate(testing)
-            wishlist_repository.wishlist_repo_instance.populate(testing)
+            # Games, users, reviews and wishlists are loaded in one pass, each CSV file is read once
+            DatabaseLoader(session_context).load(game_repository.game_repo_instance, testing)
 
             print("REPOPULATING DATABASE... FINISHED")
         else:
+            create_search_index(database_engine)  # Databases created before full text search was added won't have the index yet
+            create_indexes(database_engine)  # Same for the indexes on foreign keys and sort columns
+            create_rating_summaries(database_engine)  # And for the per game rating summaries
+            create_data_versions(database_engine)  # And for the data versions cached pages are keyed on
             map_model_to_tables()
 
 
@@ -90,13 +128,21 @@ def create_app(custom_config=None):
         review_repository.review_repo_instance = csv_review_repository.CSVReviewRepository()
         wishlist_repository.wishlist_repo_instance = csv_wishlist_repository.CSVWishlistRepository()
 
-        game_repository.game_repo_instance.populate(testing)
+        game_repository.game_repo_instance.populate(
+            testing, snapshot_directory=app.config.get('CSV_SNAPSHOT_DIRECTORY'), workers=app.config.get('CSV_INGEST_WORKERS') or None
+        )
         user_repository.user_repo_instance.populate(testing)
         review_repository.review_repo_instance.populate(testing)
         wishlist_repository.wishlist_repo_instance.populate(testing)
 
 
 
+    response_cache.response_cache_instance = create_response_cache(app.config)
+
+    app.context_processor(template_defaults)
+    app.url_defaults(hashed_static_url)
+    app.after_request(static_cache_headers)
+
     app.register_blueprint(home_blueprint.home)
     app.register_blueprint(games_blueprint.games, url_prefix='/games')
     app.register_blueprint(authenticaton_blueprint.authentication, url_prefix='/authentication')
@@ -1,10 +1,14 @@
 """Flask configuration variables."""
-from os import environ
+from os import environ, path
 from dotenv import load_dotenv
 
 # Load environment variables from file .env, stored in this directory.
 load_dotenv()
 
+# Files the application generates at runtime (e.g. compiled snapshots) go in the project's instance folder
+INSTANCE_DIRECTORY = path.join(path.dirname(path.dirname(path.abspath(__file__))), 'instance')
+
+
 class Config:
     """Set Flask configuration from .env file."""
 
@@ -20,4 +24,28 @@ class Config:
     REPOSITORY_ADAPTER_TYPE = environ.get('REPOSITORY_ADAPTER_TYPE')
     SQLALCHEMY_DATABASE_URI = environ.get('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_ECHO = environ.get('SQLALCHEMY_ECHO')=="True"
-    WTF_CSRF_ENABLED = environ.get('WTF_CSRF_ENABLED')=="True"
\ No newline at end of file
+    WTF_CSRF_ENABLED = environ.get('WTF_CSRF_ENABLED')=="True"
+
+    # Database connection pool configuration
+    SQLALCHEMY_POOL_CLASS = environ.get('SQLALCHEMY_POOL_CLASS', 'queue')  # 'null', 'queue', 'singleton' or 'static'
+    SQLALCHEMY_POOL_SIZE = int(environ.get('SQLALCHEMY_POOL_SIZE', 5))
+    SQLALCHEMY_MAX_OVERFLOW = int(environ.get('SQLALCHEMY_MAX_OVERFLOW', 10))
+    SQLALCHEMY_POOL_RECYCLE = int(environ.get('SQLALCHEMY_POOL_RECYCLE', 3600))  # Seconds before a pooled connection is replaced, -1 to never replace
+
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE = environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes
+    SQLITE_CACHE_SIZE = int(environ.get('SQLITE_CACHE_SIZE', -64 * 1024))  # Negative means KiB rather than pages
+
+    # Whole page cache for visitors who aren't logged in
+    RESPONSE_CACHE_BACKEND = environ.get('RESPONSE_CACHE_BACKEND', 'memory')  # 'memory', 'disk' or 'none'
+    RESPONSE_CACHE_MAX_ENTRIES = int(environ.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+    RESPONSE_CACHE_MAX_BYTES = int(environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_DIRECTORY = environ.get('RESPONSE_CACHE_DIRECTORY', path.join(INSTANCE_DIRECTORY, 'response_cache'))  # Only used by the disk backend, every worker can share it
+
+    # Compiled snapshots of the games CSV file that the CSV adapter loads at startup, set to '' to always parse the CSV
+    CSV_SNAPSHOT_DIRECTORY = environ.get('CSV_SNAPSHOT_DIRECTORY', path.join(INSTANCE_DIRECTORY, 'games_snapshots'))
+
+    # Worker processes the games CSV file is parsed with when it is large, 0 for one per CPU core
+    CSV_INGEST_WORKERS = int(environ.get('CSV_INGEST_WORKERS', 0))
@@ -1,4 +1,31 @@
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+
+RELEASE_DATE_FORMAT = "%b %d, %Y"  # e.g. "Oct 21, 2008"
+RELEASE_DATE_CACHE_SIZE = 16384  # The catalogue has a few thousand distinct release dates
+
+
+@lru_cache(maxsize=RELEASE_DATE_CACHE_SIZE)
+def parse_release_date(release_date: str) -> int:
+    """
+    Parses a release date in 'Oct 21, 2008' format, each distinct string is only parsed once
+    :return: The date's ordinal (days since Jan 1 of year 1)
+    :raises ValueError: If the string isn't in that format
+    """
+    return datetime.strptime(release_date, RELEASE_DATE_FORMAT).toordinal()
+
+
+@lru_cache(maxsize=RELEASE_DATE_CACHE_SIZE)
+def release_date_text(ordinal: int) -> str:
+    """
+    Returns the date with the ordinal as it is shown on pages (e.g. "2008-10-21"), formatted once per date
+    """
+    return date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=RELEASE_DATE_CACHE_SIZE)
+def release_datetime(ordinal: int) -> datetime:
+    return datetime.fromordinal(ordinal)
 
 
 class Publisher:
@@ -65,6 +92,9 @@ class Genre:
 
 
 class Game:
+    # (store, row) to read the description and website URL from when they are used, for games that don't hold them
+    __details = None
+
     def __init__(self, game_id: int, game_title: str):
         if type(game_id) is not int or game_id < 0:
             raise ValueError("Game ID should be a positive integer!")
@@ -76,7 +106,7 @@ class Game:
             self.__game_title = None
 
         self.__price = None
-        self.__release_date = None
+        self.__release_date = None  # Ordinal of the date, see release_date_ordinal
         self.__description = None
         self.__image_url = None
         self.__website_url = None
@@ -124,25 +154,42 @@ class Game:
 
     @property
     def release_date(self):
-        return str(self.__release_date) if self.__release_date is not None else None
+        return release_date_text(self.__release_date) if self.__release_date is not None else None
 
     @release_date.setter
     def release_date(self, release_date: str):
         if isinstance(release_date, str):
             try:
                 # Check if the release_date string is in the correct date format (e.g., "Oct 21, 2008")
-                release_date = datetime.strptime(release_date, "%b %d, %Y")
-                self.__release_date = release_date
+                self.__release_date = parse_release_date(release_date)
             except ValueError:
                 raise ValueError("Release date must be in 'Oct 21, 2008' format!")
         else:
             raise ValueError("Release date must be a string in 'Oct 21, 2008' format!")
 
-    def get_datetime(self):
+    @property
+    def release_date_ordinal(self):
+        """
+        The release date as an ordinal (days since Jan 1 of year 1), which is how it is stored and sorted, or None
+        """
         return self.__release_date
 
+    def get_datetime(self):
+        return release_datetime(self.__release_date) if self.__release_date is not None else None
+
+    def load_details_from(self, store, row: int):
+        """
+        Makes the game read its description and website URL from a store when they are used, instead of holding them.
+        Setting either one to non-blank text replaces what the store has.
+        :param store: Object with a get(row, field) method that returns the text of the field or None
+        :param row: The row of this game in the store
+        """
+        self.__details = (store, row)
+
     @property
     def description(self):
+        if self.__description is None and self.__details is not None:
+            return self.__details[0].get(self.__details[1], "description")
         return self.__description
 
     @description.setter
@@ -165,6 +212,8 @@ class Game:
 
     @property
     def website_url(self):
+        if self.__website_url is None and self.__details is not None:
+            return self.__details[0].get(self.__details[1], "website_url")
         return self.__website_url
 
     @website_url.setter
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, current_app, render_template, session
-from games.utils import validation, constants
+from games.utils import validation, constants, page_versions
 from games.utils.rendering import render_template
+from games.utils.response_cache import cached_response, game_tag
+from games.utils.http_caching import conditional_get
 from games.exceptions import view_layer_exceptions, service_layer_exceptions
 
 from games.repository import game_repository, review_repository, user_repository, wishlist_repository
@@ -13,39 +15,56 @@ from games.reviews.review_blueprint import ReviewForm
 games = Blueprint('games', __name__)
 
 
-@games.route('/')
-def index(page_number=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT, sort_by=constants.DEFAULT_SORT_BY, ascending=constants.DEFAULT_ASCENDING):
+# The *_args functions validate the arguments of a page and look up what it shows, raising the errors the page gives.
+# The pages call them, and conditional_get calls them before answering 304 without running the page.
 
+def index_args(page_number=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT, sort_by=constants.DEFAULT_SORT_BY, ascending=constants.DEFAULT_ASCENDING):
     page_number = validation.validate_page_number(request.args.get('page', page_number))
     count = validation.validate_count(request.args.get('count', count))
     sort_by = validation.validate_sort_by(request.args.get('sort_by', sort_by))
     ascending = validation.validate_ascending(request.args.get('ascending', ascending))
+    cursor = validation.validate_cursor(request.args.get('cursor'), sort_by)
+    return page_number, count, sort_by, ascending, cursor
+
+
+@games.route('/')
+@conditional_get(validate=index_args)
+@cached_response()
+def index(page_number=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT, sort_by=constants.DEFAULT_SORT_BY, ascending=constants.DEFAULT_ASCENDING):
+
+    page_number, count, sort_by, ascending, cursor = index_args(page_number, count, sort_by, ascending)
 
     if sort_by == 'default':
-        page = game_service.get_games(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=ascending, endpoint='games.index', ascending=ascending)
+        page = game_service.get_games(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=ascending, endpoint='games.index', cursor=cursor, ascending=ascending)
 
     elif sort_by == 'title':
-        page = game_service.get_games_sorted_alphabetically(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=ascending, endpoint='games.index', sort_by=sort_by, ascending=ascending)
+        page = game_service.get_games_sorted_alphabetically(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=ascending, endpoint='games.index', cursor=cursor, sort_by=sort_by, ascending=ascending)
 
     elif sort_by == 'release_date':
-        page = game_service.get_games_sorted_by_date(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=(not ascending), endpoint='games.index', sort_by=sort_by, ascending=ascending)
+        page = game_service.get_games_sorted_by_date(repository=game_repository.game_repo_instance, page_number=page_number, count=count, reverse=(not ascending), endpoint='games.index', cursor=cursor, sort_by=sort_by, ascending=ascending)
 
     return render_template('browseGames.html', page=page)
 
 
-@games.route('search')
-def search(search_term:str="", page: int=constants.DEFAULT_PAGE_NUMBER, count: int=constants.DEFAULT_COUNT):
+def search_args(search_term: str="", page: int=constants.DEFAULT_PAGE_NUMBER, count: int=constants.DEFAULT_COUNT):
     search_term = validation.validate_search_term(request.args.get('q', search_term))
     page = validation.validate_page_number(request.args.get('page', page))
     count = validation.validate_count(request.args.get('count', count))
+    return search_term, page, count
+
+
+@games.route('search')
+@conditional_get(validate=search_args)
+@cached_response()
+def search(search_term:str="", page: int=constants.DEFAULT_PAGE_NUMBER, count: int=constants.DEFAULT_COUNT):
+    search_term, page, count = search_args(search_term, page, count)
 
     page = game_service.search_games(search_term, repository=game_repository.game_repo_instance, page_number=page, count=count, reverse=False, endpoint='games.search', q=search_term)
     return render_template('browseGames.html', page=page)
 
 from games.service.wishlist_service import WishlistForm
 
-@games.route('game/<game_id>')
-def game(game_id):
+def game_args(game_id):
     game_id = validation.validate_game_id(game_id)
 
     try:
@@ -53,6 +72,22 @@ def game(game_id):
     except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.NotFoundException(f"Game {game_id} not found")
 
+    page_number = validation.validate_page_number(request.args.get('page', constants.DEFAULT_PAGE_NUMBER))
+    count = validation.validate_count(request.args.get('count', constants.DEFAULT_REVIEW_COUNT))
+    sort_by = validation.validate_review_sort_by(request.args.get('sort_by', constants.DEFAULT_GAME_REVIEW_SORT_BY))
+    return game, page_number, count, sort_by
+
+
+def game_versions(game_id):
+    return [page_versions.game_reviews(game_id)]
+
+
+@games.route('game/<game_id>')
+@conditional_get(versions=game_versions, validate=game_args)
+@cached_response(versions=game_versions, tags=lambda game_id: [game_tag(int(game_id))])
+def game(game_id):
+    game, page_number, count, sort_by = game_args(game_id)
+
     user = user_service.get_logged_in_user_from_session(session, user_repository.user_repo_instance)
 
     wishlisted_status = None
@@ -65,25 +100,16 @@ def game(game_id):
 
     form = WishlistForm()
 
-    reviews = sorted(review_service.get_reviews_for_game(game, review_repository=review_repository.review_repo_instance), key=lambda review: review.rating, reverse=True)
-
-    average_rating = None
-    for review in reviews:
-        if average_rating is None:
-            average_rating = review.rating
-        else:
-            average_rating += review.rating
+    reviews = review_service.get_page_of_reviews_for_game(game, sort_by, repository=review_repository.review_repo_instance, page_number=page_number, count=count, reverse=False, endpoint='games.game', game_id=game.game_id, sort_by=sort_by)
 
-    if average_rating is not None:
-        average_rating /= len(reviews)
-        average_rating = round(average_rating, 1)
+    rating_summary = review_service.get_rating_summary(game, review_repository=review_repository.review_repo_instance)
+    average_rating = round(rating_summary.average, 1) if rating_summary.average is not None else None
 
 
     return render_template('gameDescription.html', game=game, wishlist_form=form, wishlisted_status=wishlisted_status, reviews=reviews, review_form=ReviewForm(game_id=game.game_id), average_rating=average_rating)
 
 
-@games.route('genre/<string:genre_name>')
-def genre(genre_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
+def genre_args(genre_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
     genre_name = validation.validate_genre_name(genre_name)
     page = validation.validate_page_number(request.args.get('page', page))
     count = validation.validate_count(request.args.get('count', count))
@@ -92,13 +118,20 @@ def genre(genre_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.D
         genre = game_service.get_genre(genre_name, repository=game_repository.game_repo_instance)
     except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.NotFoundException(f"Genre {genre_name} not found")
+    return genre, page, count
 
-    page = game_service.get_games_with_genre(genre, repository=game_repository.game_repo_instance, page_number=page, count=count, reverse=False, endpoint='games.genre', genre_name=genre_name, ascending=False)
+
+@games.route('genre/<string:genre_name>')
+@conditional_get(validate=genre_args)
+@cached_response()
+def genre(genre_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
+    genre, page, count = genre_args(genre_name, page, count)
+
+    page = game_service.get_games_with_genre(genre, repository=game_repository.game_repo_instance, page_number=page, count=count, reverse=False, endpoint='games.genre', genre_name=genre.genre_name, ascending=False)
 
     return render_template('browseGamesGenre.html', page=page)
 
-@games.route('publisher/<string:publisher_name>')
-def publisher(publisher_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
+def publisher_args(publisher_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
     publisher_name = validation.validate_publisher_name(publisher_name)
     page = validation.validate_page_number(request.args.get('page', page))
     count = validation.validate_count(request.args.get('count', count))
@@ -107,7 +140,15 @@ def publisher(publisher_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=con
         publisher = game_service.get_publisher(publisher_name, repository=game_repository.game_repo_instance)
     except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.NotFoundException(f"Publisher {publisher_name} not found")
+    return publisher, page, count
+
+
+@games.route('publisher/<string:publisher_name>')
+@conditional_get(validate=publisher_args)
+@cached_response()
+def publisher(publisher_name: str, page=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT):
+    publisher, page, count = publisher_args(publisher_name, page, count)
 
-    page = game_service.get_games_by_publisher(publisher, repository=game_repository.game_repo_instance, page_number=page, count=count, reverse=False, endpoint='games.publisher', publisher_name=publisher_name, ascending=False)
+    page = game_service.get_games_by_publisher(publisher, repository=game_repository.game_repo_instance, page_number=page, count=count, reverse=False, endpoint='games.publisher', publisher_name=publisher.publisher_name, ascending=False)
 
     return render_template('browseGamesPublisher.html', page=page)
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any
+
+
+class Cursor:
+    """
+    A position in a sorted listing: the sort key and id of a game, and whether the wanted page comes after or before it.
+    Pages read from a cursor continue from that position instead of skipping an offset, so a deep page costs the same
+    as the first one. For a cursor that points before, repositories return the games just before it (the lookahead
+    extending further back), still in listing order.
+    """
+
+    def __init__(self, sort_key: Any, game_id: int, before: bool = False):
+        self.__sort_key = sort_key
+        self.__game_id = game_id
+        self.__before = before
+
+    @property
+    def sort_key(self) -> Any:
+        return self.__sort_key
+
+    @property
+    def game_id(self) -> int:
+        return self.__game_id
+
+    @property
+    def before(self) -> bool:
+        return self.__before
+
+    def encode(self) -> str:
+        """
+        Returns the cursor as an opaque token that can be put in a URL
+        """
+        sort_key = self.__sort_key
+        if isinstance(sort_key, (date, datetime)):
+            sort_key = {"date": sort_key.strftime("%Y-%m-%d")}
+        payload = json.dumps([sort_key, self.__game_id, self.__before], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode(token: str) -> 'Cursor':
+        """
+        Reads a token made by encode
+        :param token: The token to read
+        :return: The cursor the token was made from
+        :raises ValueError: If the token wasn't made by encode
+        """
+        try:
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            sort_key, game_id, before = json.loads(payload.decode("utf-8"))
+            if isinstance(sort_key, dict):
+                sort_key = datetime.strptime(sort_key["date"], "%Y-%m-%d")
+        except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError):
+            raise ValueError("Invalid cursor")
+
+        if not isinstance(game_id, int) or not isinstance(before, bool) or not isinstance(sort_key, (str, int, datetime, type(None))):
+            raise ValueError("Invalid cursor")
+        return Cursor(sort_key, game_id, before)
+
+    def __eq__(self, other):
+        if not isinstance(other, Cursor):
+            return False
+        return (self.__sort_key, self.__game_id, self.__before) == (other.sort_key, other.game_id, other.before)
+
+    def __repr__(self):
+        return f'<Cursor {self.__sort_key!r} {self.__game_id} {"before" if self.__before else "after"}>'
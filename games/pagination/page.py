@@ -1,54 +1,104 @@
+from math import ceil
+
 from flask import url_for, request
 from typing import Iterable
 from typing import Generic, List, Any, TypeVar
 from games.utils import constants
 from games.repository.game_repository.game_repository import GameRepository
+from games.pagination.cursor import Cursor
 
 T = TypeVar('T')
 
 from functools import wraps
+from inspect import signature
 
-def paginated(default_reverse=False):
+def paginated(default_reverse=False, total=None, cursor_key=None):
+    """
+    Turns a function that returns one page of results into one that returns a Page
+    :param default_reverse: The reverse value to use when the caller doesn't give one
+    :param total: Optional function that takes the same arguments (minus the paging ones) and returns the total number of results
+    :param cursor_key: Optional function that returns the sort key of a result. Listings that have one accept a cursor
+        and link to the next and previous pages with cursors instead of offsets
+    """
     def decorator(func):
+        # Functions that accept a lookahead fetch one extra result, which tells us if there is a next page without a second call
+        supports_lookahead = 'lookahead' in signature(func).parameters
+
         @wraps(func)
-        def wrapper(*args, repository, page_number=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT, reverse=default_reverse, endpoint=None, **kwargs):
+        def wrapper(*args, repository, page_number=constants.DEFAULT_PAGE_NUMBER, count=constants.DEFAULT_COUNT, reverse=default_reverse, endpoint=None, cursor: Cursor = None, **kwargs):
             if endpoint is None:
                 endpoint = request.endpoint
 
-            games = func(*args, repository=repository, page_number=page_number, count=count, reverse=reverse)
-            has_next_page = func(*args, repository=repository, page_number=page_number+1, count=count, reverse=reverse) != []
+            has_prev_page = page_number > 1
+            if cursor_key is not None:
+                data = func(*args, repository=repository, page_number=page_number, count=count, reverse=reverse, lookahead=1, cursor=cursor)
+                if cursor is not None and cursor.before:
+                    # The extra result is the one before the page
+                    has_prev_page = len(data) > count
+                    has_next_page = True
+                    data = data[-count:]
+                else:
+                    has_next_page = len(data) > count
+                    data = data[:count]
+            elif supports_lookahead:
+                data = func(*args, repository=repository, page_number=page_number, count=count, reverse=reverse, lookahead=1)
+                has_next_page = len(data) > count
+                data = data[:count]
+            else:
+                data = func(*args, repository=repository, page_number=page_number, count=count, reverse=reverse)
+                has_next_page = func(*args, repository=repository, page_number=page_number+1, count=count, reverse=reverse) != []
 
-            return Page(endpoint, games, page_number, count, has_next_page, **kwargs)
+            total_items = total(*args, repository=repository) if total is not None else None
+
+            return Page(endpoint, data, page_number, count, has_next_page, total_items=total_items,
+                        has_prev_page=has_prev_page, cursor_key=cursor_key, **kwargs)
         return wrapper
     return decorator
 
 
 class Page(Generic[T]):
-    def __init__(self, endpoint: str, data: List, page: int, per_page: int, has_next_page: bool, **params):
+    def __init__(self, endpoint: str, data: List, page: int, per_page: int, has_next_page: bool, total_items: int = None,
+                 has_prev_page: bool = None, cursor_key=None, **params):
         self.endpoint = endpoint
         self.__data = data
         self.page = page
         self.per_page = per_page
         self.has_next_page = has_next_page
+        self.has_prev_page = has_prev_page if has_prev_page is not None else page > 1
+        self.total_items = total_items  # None if the listing can't be counted
+        self.cursor_key = cursor_key  # None if the listing only pages by offset
         self.params = params
 
+    @property
+    def total_pages(self):
+        if self.total_items is None:
+            return None
+        return max(1, ceil(self.total_items / self.per_page))
+
     @property
     def data(self):
         return self.__data
 
     @property
     def next_page_url(self):
-        if self.has_next_page:
-            return url_for(self.endpoint, page=self.page + 1, **self.params)
-        else:
+        if not self.has_next_page:
             return None
+        if self.cursor_key is not None and self.__data:
+            last = self.__data[-1]
+            cursor = Cursor(self.cursor_key(last), last.game_id)
+            return url_for(self.endpoint, page=self.page + 1, cursor=cursor.encode(), **self.params)
+        return url_for(self.endpoint, page=self.page + 1, **self.params)
 
     @property
     def prev_page_url(self):
-        if self.page > 1:
-            return url_for(self.endpoint, page=self.page - 1, **self.params)
-        else:
+        if not self.has_prev_page:
             return None
+        # The first page is cheap to read by offset, so it doesn't need a cursor
+        if self.cursor_key is not None and self.__data and self.page > 2:
+            first = self.__data[0]
+            cursor = Cursor(self.cursor_key(first), first.game_id, before=True)
+            return url_for(self.endpoint, page=self.page - 1, cursor=cursor.encode(), **self.params)
+        return url_for(self.endpoint, page=max(self.page - 1, 1), **self.params)
 
     @property
     def first_page_url(self):
@@ -56,7 +106,15 @@ class Page(Generic[T]):
 
     @property
     def last_page_url(self):
+        if self.total_pages is None:
+            return None
         return url_for(self.endpoint, page=self.total_pages, **self.params)
 
+    def url_with(self, **params):
+        """
+        Returns the URL of the first page of the listing with some of its parameters changed, e.g. another sort order
+        """
+        return url_for(self.endpoint, page=1, **dict(self.params, **params))
+
     def __iter__(self):
         return iter(self.__data)
\ No newline at end of file
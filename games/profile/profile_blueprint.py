@@ -1,5 +1,5 @@
 from games.utils.rendering import render_template
-from flask import Blueprint
+from flask import Blueprint, request
 from games.authentication.authenticaton_blueprint import login_required
 from games.domainmodel.model import User, Review, Game
 
@@ -11,6 +11,7 @@ from games.service import user_service
 from games.service import review_service
 
 from games.exceptions import service_layer_exceptions, view_layer_exceptions
+from games.utils import validation, constants
 
 profile = Blueprint('profile', __name__)
 
@@ -18,12 +19,7 @@ profile = Blueprint('profile', __name__)
 @profile.route('/')
 @login_required
 def logged_in_user_profile(authenticated_user: User):
-    user = authenticated_user
-    reviews = review_service.get_reviews_by_user(user, review_repository.review_repo_instance)
-    wishlist = wishlist_service.get_wishes_by_user(user, wishlist_repository.wishlist_repo_instance)
-
-
-    return render_template('profilePage.html', user=user, reviews=reviews, wishlist=wishlist)
+    return render_profile(authenticated_user, 'profile.logged_in_user_profile')
 
 # /profile/username goes to specific user
 @profile.route('/<string:username>')
@@ -34,7 +30,18 @@ def profile_for_username(authenticated_user: User, username: str):
     except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.NotFoundException(f"User with username {username} does not exist")
 
-    reviews = review_service.get_reviews_by_user(user, review_repository.review_repo_instance)
+    return render_profile(user, 'profile.profile_for_username', username=username)
+
+def render_profile(user: User, endpoint: str, **endpoint_params):
+    '''
+    Renders the profile page of the given user with their wishlist and one page of their reviews
+    :param endpoint: The endpoint (and its arguments) the review page links point to
+    '''
+    page_number = validation.validate_page_number(request.args.get('page', constants.DEFAULT_PAGE_NUMBER))
+    count = validation.validate_count(request.args.get('count', constants.DEFAULT_REVIEW_COUNT))
+    sort_by = validation.validate_review_sort_by(request.args.get('sort_by', constants.DEFAULT_PROFILE_REVIEW_SORT_BY))
+
+    reviews = review_service.get_page_of_reviews_by_user(user, sort_by, repository=review_repository.review_repo_instance, page_number=page_number, count=count, reverse=False, endpoint=endpoint, sort_by=sort_by, **endpoint_params)
     wishlist = wishlist_service.get_wishes_by_user(user, wishlist_repository.wishlist_repo_instance)
 
     return render_template('profilePage.html', user=user, reviews=reviews, wishlist=wishlist)
\ No newline at end of file
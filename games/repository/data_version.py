@@ -0,0 +1,29 @@
+"""
+Versions of the data that pages are built from, so caches and ETags can tell whether a page is still current
+"""
+import time
+from typing import NamedTuple
+
+CATALOGUE = "catalogue"
+
+
+class DataVersion(NamedTuple):
+    """
+    A version number that goes up with every change to a piece of data, and when the last change was made
+    """
+    version: int
+    modified: float  # seconds since the epoch
+
+
+UNCHANGED = DataVersion(0, 0.0)  # Data that has no recorded change
+
+
+def game_reviews(game_id: int) -> str:
+    return "reviews:{}".format(game_id)
+
+
+def changed(data_version: DataVersion) -> DataVersion:
+    """
+    Returns the version that follows the given one, made now
+    """
+    return DataVersion(data_version.version + 1, time.time())
@@ -0,0 +1,169 @@
+"""
+Fills the database from the CSV files in dependency order: games, then users, then the reviews and wishlists that
+refer to both. Each file is read once, and review and wishlist rows are resolved to user and game ids with maps held
+in memory instead of a query per row.
+"""
+import time
+from typing import Dict, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from games.domainmodel.model import User
+from games.repository.orm import games_table, users_table, reviews_table, wish_table, rating_summaries_table, touch_data_versions
+from games.repository.data_version import game_reviews
+from games.repository.review_repository.review_repository import RatingSummary, RATINGS
+from games.repository.game_repository.adapters.database_game_repository import BULK_INSERT_BATCH_SIZE
+from games.repository.user_repository.adapters import csv_user_repository
+from games.repository.review_repository.adapters import csv_review_repository
+from games.repository.wishlist_repository.adapters import csv_wishlist_repository
+
+
+class DatabaseLoader:
+    """
+    Loads the users, reviews and wishlists CSV files into the database. Rows that are already in the database are
+    left as they are, and reviews or wishes of users or games that don't exist are skipped.
+    """
+
+    def __init__(self, session_context_manager):
+        self.__session_context_manager = session_context_manager
+
+    def load(self, game_repository, testing: bool):
+        """
+        Loads every CSV file, in dependency order
+        :param game_repository: The database game repository, which bulk loads the games
+        :param testing: Whether to load the test datasets
+        """
+        game_repository.populate(testing)
+
+        if not testing:  # users, reviews and wishlists are only loaded for testing
+            return
+
+        user_ids = self.load_users(testing)
+        game_ids = self.game_ids()
+        self.load_reviews(testing, user_ids, game_ids)
+        self.load_wishlist(testing, user_ids, game_ids)
+
+    def user_ids(self) -> Dict[str, int]:
+        """
+        :return: Username -> id of every user in the database
+        """
+        with self.__session_context_manager as scm:
+            return {username: user_id for user_id, username in scm.session.execute(select(users_table.c.id, users_table.c.username))}
+
+    def game_ids(self) -> Set[int]:
+        """
+        :return: The ids of every game in the database
+        """
+        with self.__session_context_manager as scm:
+            return set(scm.session.execute(select(games_table.c.id)).scalars())
+
+    def load_users(self, testing: bool) -> Dict[str, int]:
+        """
+        Loads the users CSV file
+        :return: Username -> id of every user in the database afterwards
+        """
+        started = time.perf_counter()
+        rows = {}  # username -> row, the first row of each username wins
+        for user_dto in csv_user_repository.read_users(testing):
+            user = User(user_dto.username, user_dto.password)
+            rows.setdefault(user.username, {'username': user.username, 'password': user.password})
+
+        with self.__session_context_manager as scm:
+            self.__insert_rows(scm, users_table, list(rows.values()))
+            scm.commit()
+
+        user_ids = self.user_ids()
+        print("Loaded {} users in {:.2f}s".format(len(rows), time.perf_counter() - started))
+        return user_ids
+
+    def load_reviews(self, testing: bool, user_ids: Dict[str, int] = None, game_ids: Set[int] = None):
+        """
+        Loads the reviews CSV file and adds the reviews to their games' rating summaries
+        :param user_ids: Username -> id of the users in the database, read from the database if not given
+        :param game_ids: The ids of the games in the database, read from the database if not given
+        """
+        started = time.perf_counter()
+        user_ids = self.user_ids() if user_ids is None else user_ids
+        game_ids = self.game_ids() if game_ids is None else game_ids
+
+        with self.__session_context_manager as scm:
+            seen = set(tuple(row) for row in scm.session.execute(select(reviews_table.c.user_id, reviews_table.c.game_id, reviews_table.c.comment)))
+
+            rows = []
+            summaries = {}  # game_id -> RatingSummary of the reviews being added
+            for review in csv_review_repository.read_reviews(testing):
+                user_id = user_ids.get(review.username)
+                if user_id is None or review.game_id not in game_ids or (user_id, review.game_id, review.comment) in seen:
+                    continue
+                seen.add((user_id, review.game_id, review.comment))
+                rows.append({'user_id': user_id, 'game_id': review.game_id, 'rating': review.rating, 'comment': review.comment})
+                summaries.setdefault(review.game_id, RatingSummary()).add(review.rating)
+
+            self.__insert_rows(scm, reviews_table, rows)
+            self.__add_to_rating_summaries(scm, summaries)
+            touch_data_versions(scm.session, [game_reviews(game_id) for game_id in summaries])
+            scm.commit()
+
+        print("Loaded {} reviews in {:.2f}s".format(len(rows), time.perf_counter() - started))
+
+    def load_wishlist(self, testing: bool, user_ids: Dict[str, int] = None, game_ids: Set[int] = None):
+        """
+        Loads the wishlist CSV file
+        :param user_ids: Username -> id of the users in the database, read from the database if not given
+        :param game_ids: The ids of the games in the database, read from the database if not given
+        """
+        started = time.perf_counter()
+        user_ids = self.user_ids() if user_ids is None else user_ids
+        game_ids = self.game_ids() if game_ids is None else game_ids
+
+        with self.__session_context_manager as scm:
+            seen = set(tuple(row) for row in scm.session.execute(select(wish_table.c.user_id, wish_table.c.game_id)))
+
+            rows = []
+            for wish in csv_wishlist_repository.read_wishes(testing):
+                user_id = user_ids.get(wish.username)
+                if user_id is None or wish.game_id not in game_ids or (user_id, wish.game_id) in seen:
+                    continue
+                seen.add((user_id, wish.game_id))
+                rows.append({'user_id': user_id, 'game_id': wish.game_id, 'date_added': wish.wish_time})
+
+            self.__insert_rows(scm, wish_table, rows)
+            scm.commit()
+
+        print("Loaded {} wishes in {:.2f}s".format(len(rows), time.perf_counter() - started))
+
+    @staticmethod
+    def __add_to_rating_summaries(scm, summaries: Dict[int, RatingSummary]):
+        """
+        Adds the counts of the new reviews to the rating summaries, creating the ones games don't have yet
+        """
+        if not summaries:
+            return
+        columns = rating_summaries_table.c
+        statement = insert(rating_summaries_table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[columns.game_id],
+            set_={
+                'review_count': columns.review_count + statement.excluded.review_count,
+                'rating_total': columns.rating_total + statement.excluded.rating_total,
+                **{
+                    'rating_{}_count'.format(rating): columns['rating_{}_count'.format(rating)] + statement.excluded['rating_{}_count'.format(rating)]
+                    for rating in RATINGS
+                },
+            }
+        )
+        rows = [
+            {
+                'game_id': game_id, 'review_count': summary.count, 'rating_total': summary.total,
+                **{'rating_{}_count'.format(rating): summary.histogram[rating] for rating in RATINGS}
+            }
+            for game_id, summary in summaries.items()
+        ]
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            scm.session.execute(statement, rows[start:start + BULK_INSERT_BATCH_SIZE])
+
+    @staticmethod
+    def __insert_rows(scm, table, rows: List[dict]):
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            scm.session.execute(table.insert().prefix_with('OR IGNORE'), rows[start:start + BULK_INSERT_BATCH_SIZE])
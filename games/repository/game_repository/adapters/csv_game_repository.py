@@ -1,157 +1,316 @@
-import csv
+import time
 from pathlib import Path
-from typing import List
-from thefuzz import fuzz
+from typing import Any, Iterable, Iterator, List, Tuple
 
 from games.repository.game_repository.game_repository import GameRepository
+from games.repository.data_version import DataVersion, changed
+from games.repository.game_repository.adapters import csv_ingest, csv_snapshot
+from games.repository.ordered_index import OrderedIndex
+from games.pagination.cursor import Cursor
+from games.repository.search_index import SearchIndex, normalise
+from games.utils import constants
+from games.utils.cache import LRUCache
 from games.domainmodel.model import Genre, Game, Publisher
 
 from games.exceptions import repository_layer_exceptions
 
-class CSVGameRepository(GameRepository):
-    def __init__(self):
-        self.__dataset_of_games = set()
-        self.__dataset_of_publishers = set()
-        self.__dataset_of_genres = set()
-
-    def __read_csv_file(self, testing):
-
-        if testing:
 
-            path = Path(__file__).parent.parent / "data" / "test_games.csv"
-        else:
-            path = Path(__file__).parent.parent / "data" / "games.csv"
+def games_csv_path(testing: bool) -> Path:
+    if testing:
+        return Path(__file__).parent.parent / "data" / "test_games.csv"
+    return Path(__file__).parent.parent / "data" / "games.csv"
+
+
+def build_game(game_id: int, title: str, price: float, release_date: str, description: str, image_url: str,
+               website_url: str, publisher: Publisher, genres: List[Genre]) -> Game:
+    game = Game(
+        game_id=game_id,
+        game_title=title
+    )
+    game.price = price
+    game.release_date = release_date
+    game.description = description
+    game.image_url = image_url
+    game.website_url = website_url
+
+    game.publisher = publisher
+    for genre in genres:
+        game.add_genre(genre)
+
+    return game
+
+
+def games_from_columns(columns: csv_ingest.GameColumns) -> Iterator[Game]:
+    """
+    Builds games from the columns of the games CSV file. Games with the same publisher or genre share one object for
+    it. When the columns come from a snapshot, descriptions and website URLs are read from its detail file when they
+    are used.
+    """
+    strings = columns.strings
+    details_in_store = isinstance(columns.details, csv_snapshot.DetailStore)
+    publishers, genres = {}, {}  # string index -> Publisher / Genre
+
+    def text(column: str, i: int):
+        index = columns.text[column][i]
+        return strings[index] if index != csv_ingest.NONE else None
+
+    for i in range(len(columns)):
+        publisher_index = columns.text["Publishers"][i]
+        if publisher_index not in publishers:
+            publishers[publisher_index] = Publisher(strings[publisher_index])
+
+        game_genres = []
+        for genre_index in columns.genres[columns.genre_offsets[i]:columns.genre_offsets[i + 1]]:
+            if genre_index not in genres:
+                genres[genre_index] = Genre(strings[genre_index])
+            game_genres.append(genres[genre_index])
+
+        description, website_url = (None, None) if details_in_store else columns.details[i]
+        game = build_game(
+            columns.ids[i], text("Name", i), columns.prices[i], text("Release date", i), description,
+            text("Header image", i), website_url, publishers[publisher_index], game_genres
+        )
+        if details_in_store:
+            game.load_details_from(columns.details, i)
+        yield game
+
+
+def read_games(testing: bool, snapshot_directory: str = None, workers: int = None) -> Iterator[Game]:
+    """
+    Reads the games CSV file, in AppID order. Rows that can't be loaded are reported and skipped.
+    :param snapshot_directory: Optional directory of compiled snapshots, when given the games are loaded from the
+        snapshot of the CSV file instead (compiling it first if it is missing or out of date)
+    :param workers: Number of worker processes to parse a large CSV file with, defaults to one per CPU core
+    """
+    if snapshot_directory:
+        yield from games_from_columns(csv_snapshot.load_columns(games_csv_path(testing), snapshot_directory, workers))
+        return
+
+    yield from games_from_columns(csv_ingest.read_columns(games_csv_path(testing), workers))
 
-        with open(path, mode='r', encoding='utf-8-sig') as csv_file:
-            data = csv.DictReader(csv_file)
-            for row in data:
-                genres = [(Genre(genre_name)) for genre_name in row["Genres"].split(",")]
-                publisher = Publisher(row["Publishers"])
 
-                game = Game(
-                    game_id=int(row["AppID"]),
-                    game_title=row["Name"]
-                )
-                game.price = float(row["Price"])
-                game.release_date = row.get("Release date")
-                game.description = row.get("About the game")
-                game.image_url = row.get("Header image")
-                game.website_url = row.get("Website")
+class CSVGameRepository(GameRepository):
+    def __init__(self, search_cache_size: int = constants.SEARCH_CACHE_SIZE, search_cache_ttl: float = constants.SEARCH_CACHE_TTL):
+        self.__dataset_of_games = {}  # Primary key index (game_id -> Game) so lookups don't scan the whole dataset
+        self.__dataset_of_publishers = {}  # publisher name -> Publisher
+        self.__dataset_of_genres = {}  # genre name -> Genre
+
+        self.__game_ids_by_genre = {}  # genre name -> OrderedIndex of game ids
+        self.__game_ids_by_publisher = {}  # publisher name -> OrderedIndex of game ids
+
+        # Presorted orderings, so browsing a page is a slice rather than a sort of the whole catalogue
+        self.__games_by_id = OrderedIndex()
+        self.__games_by_title = OrderedIndex()
+        self.__games_by_release_date = OrderedIndex()  # Only games that have a release date
+        self.__games_without_release_date = OrderedIndex()  # These always come after the dated games
+
+        self.__search_index = SearchIndex()
+        self.__search_cache = LRUCache(search_cache_size, search_cache_ttl)  # normalised search term -> ranked game ids, shared by every page
+
+        # The games only live in this process, so the version starts from when they were loaded: a restarted process
+        # never hands out a version an earlier one did
+        self.__catalogue_version = DataVersion(0, time.time())
+        self.__sorted_genres = None  # Sorted genre list, cleared whenever a genre is added
+
+    def __read_csv_file(self, testing, snapshot_directory=None, workers=None):
+        self.__add_games(read_games(testing, snapshot_directory, workers))
+
+    def populate(self, testing=False, snapshot_directory=None, workers=None):
+        """
+        Populates the repository with games
+        :param snapshot_directory: Optional directory of compiled snapshots to load the games from instead of the CSV file
+        :param workers: Number of worker processes to parse a large CSV file with, defaults to one per CPU core
+        """
+        self.__read_csv_file(testing=testing, snapshot_directory=snapshot_directory, workers=workers)
 
-                game.publisher = publisher
-                for genre in genres:
-                    game.add_genre(genre)
+    def get_number_of_games(self) -> int:
+        return len(self.__dataset_of_games)
 
-                self.add_game(game)
+    def get_number_of_games_with_genre(self, genre: Genre) -> int:
+        return len(self.__game_ids_by_genre.get(genre.genre_name, ()))
 
-    def populate(self, testing=False):
-        self.__read_csv_file(testing=testing)
+    def get_number_of_games_by_publisher(self, publisher: Publisher) -> int:
+        return len(self.__game_ids_by_publisher.get(publisher.publisher_name, ()))
 
-    def get_number_of_games(self) -> int:
-        return len(self.__dataset_of_games)
+    def get_number_of_search_results(self, search_term: str) -> int:
+        return len(self.__ranked_search_results(search_term))
 
     def get_genres(self) -> List[Genre]:
-        return sorted(list(self.__dataset_of_genres))
+        if self.__sorted_genres is None:
+            self.__sorted_genres = sorted(self.__dataset_of_genres.values())
+        return list(self.__sorted_genres)
+
+    def get_catalogue_version(self) -> DataVersion:
+        return self.__catalogue_version
 
     def get_publishers(self) -> List[Publisher]:
-        return list(self.__dataset_of_publishers)
+        return list(self.__dataset_of_publishers.values())
 
     def add_publisher(self, publisher: Publisher):
-        if publisher in self.__dataset_of_publishers:
+        if publisher.publisher_name in self.__dataset_of_publishers:
             raise repository_layer_exceptions.ResourceAlreadyExistsException(f"Publisher with name {publisher.publisher_name} already exists")
-        self.__dataset_of_publishers.add(publisher)
+        self.__index_publisher(publisher)
+        self.__catalogue_version = changed(self.__catalogue_version)
 
     def get_game(self, game_id: int) -> Game:
-        for game in self.__dataset_of_games:
-            if game.game_id == game_id:
-                return game
+        game = self.__dataset_of_games.get(game_id)
+        if game is not None:
+            return game
         raise repository_layer_exceptions.ResourceNotFoundException(f"Game with ID {game_id} does not exist")
 
     def get_genre(self, genre_name: str) -> Genre:
-        for genre in self.__dataset_of_genres:
-            if genre.genre_name == genre_name:
-                return genre
+        genre = self.__dataset_of_genres.get(genre_name)
+        if genre is not None:
+            return genre
         raise repository_layer_exceptions.ResourceNotFoundException(f"Genre with name {genre_name} does not exist")
 
     def add_game(self, game: Game):
-        if game in self.__dataset_of_games:
+        for index, key in self.__store(game):
+            index.insert(key, game.game_id)
+        self.__search_cache.clear()  # Any cached ranking could now be missing the new game
+        self.__catalogue_version = changed(self.__catalogue_version)
+
+    def __add_games(self, games: Iterable[Game]):
+        """
+        Adds many games at once, sorting each ordered index once at the end rather than inserting into it game by game
+        """
+        entries = {}  # index -> [(key, game_id), ...]
+        for game in games:
+            for index, key in self.__store(game):
+                entries.setdefault(index, []).append((key, game.game_id))
+        for index, index_entries in entries.items():
+            index.insert_many(index_entries)
+        self.__search_cache.clear()
+        self.__catalogue_version = changed(self.__catalogue_version)
+
+    def __store(self, game: Game) -> List[Tuple[OrderedIndex, Any]]:
+        """
+        Stores the game and adds it to the search index
+        :return: The ordered indexes the game belongs in, with its sort key in each
+        """
+        if game.game_id in self.__dataset_of_games:
             raise repository_layer_exceptions.ResourceAlreadyExistsException(f"Game with ID {game.game_id} already exists")
-        self.__dataset_of_games.add(game)
+        self.__dataset_of_games[game.game_id] = game
+        self.__search_index.add(game.game_id, game.title)
 
+        indexes = [(self.__games_by_id, game.game_id), (self.__games_by_title, (game.title or "").casefold())]
+        if game.release_date_ordinal is not None:
+            indexes.append((self.__games_by_release_date, game.release_date_ordinal))
+        else:
+            indexes.append((self.__games_without_release_date, game.game_id))
         for genre in game.genres:
-            self.__dataset_of_genres.add(genre)
+            indexes.append((self.__index_genre(genre), game.game_id))
         if game.publisher is not None:
-            self.__dataset_of_publishers.add(game.publisher)
+            indexes.append((self.__index_publisher(game.publisher), game.game_id))
+        return indexes
+
+    def __index_genre(self, genre: Genre) -> OrderedIndex:
+        """
+        Registers the genre (if it is new) and returns the index of game ids for it
+        """
+        if genre.genre_name not in self.__dataset_of_genres:
+            self.__dataset_of_genres[genre.genre_name] = genre
+            self.__sorted_genres = None
+        return self.__game_ids_by_genre.setdefault(genre.genre_name, OrderedIndex())
+
+    def __index_publisher(self, publisher: Publisher) -> OrderedIndex:
+        """
+        Registers the publisher (if it is new) and returns the index of game ids for it
+        """
+        self.__dataset_of_publishers.setdefault(publisher.publisher_name, publisher)
+        return self.__game_ids_by_publisher.setdefault(publisher.publisher_name, OrderedIndex())
+
+    def __get_games(self, page: int, count: int, segments: List[Tuple[OrderedIndex, bool]], lookahead: int = 0,
+                    cursor: Cursor = None, cursor_segment: int = 0, cursor_key=None) -> List[Game]:
+        """
+        Returns a page of games read from one or more presorted indexes placed one after another
+        :param segments: (index, reverse) pairs, in the order they should be listed
+        :param lookahead: The number of extra games to return after the page
+        :param cursor: The game the page continues from, found with a binary search instead of counting an offset
+        :param cursor_segment: The position in segments of the index that holds the cursor's game
+        :param cursor_key: The key of the cursor's game in that index
+        """
+        if cursor is None:
+            start = (page - 1) * count
+            stop = page * count + lookahead
+        else:
+            index, reverse = segments[cursor_segment]
+            first, stop = index.span(cursor_key, cursor.game_id, reverse)
+            offset = sum(len(index) for index, _ in segments[:cursor_segment])
+            if cursor.before:
+                start, stop = max(offset + first - count - lookahead, 0), offset + first
+            else:
+                start, stop = offset + stop, offset + stop + count + lookahead
+
+        game_ids = []
+        for index, reverse in segments:
+            if start < len(index) and stop > 0:
+                game_ids.extend(index.slice(max(start, 0), stop, reverse))
+            start -= len(index)
+            stop -= len(index)
+
+        return [self.__dataset_of_games[game_id] for game_id in game_ids]
 
     def get_publisher(self, publisher_name: str) -> Publisher:
-        for publisher in self.__dataset_of_publishers:
-            if publisher.publisher_name == publisher_name:
-                return publisher
+        publisher = self.__dataset_of_publishers.get(publisher_name)
+        if publisher is not None:
+            return publisher
         raise repository_layer_exceptions.ResourceNotFoundException(f"Publisher with name {publisher_name} does not exist")
 
-    def get_games_by_publisher(self, publisher: Publisher, page: int, count: int) -> List[Game]:
-        if publisher not in self.__dataset_of_publishers:
+    def get_games_by_publisher(self, publisher: Publisher, page: int, count: int, lookahead: int = 0) -> List[Game]:
+        if publisher.publisher_name not in self.__dataset_of_publishers:
             raise repository_layer_exceptions.ResourceNotFoundException(f"Publisher with name {publisher.publisher_name} does not exist")
 
-        games = []
-
-        for game in self.__dataset_of_games:
-            if game.publisher == publisher:
-                games.append(game)
-
-        p = games[(page - 1) * count:page * count]
-
-        return p
-
-    def search_games(self, search_term: str, page: int, count: int) -> List['Game']:
-
-        results = []
-        for game in self.__dataset_of_games:
-            results.append(
-                (fuzz.token_sort_ratio(game.title.lower(), search_term.lower()), game) # Gets the ratio of similarity of the game title to the search term
-            )
+        return self.__get_games(page, count, [(self.__game_ids_by_publisher[publisher.publisher_name], False)], lookahead)
 
-        results.sort(reverse=True) # Sorts the results by the ratio of similarity (Sorts tuples so if similarity is the same, the game with the higher ID is first)
-        results = [x[1] for x in results] # Gets rid of the ratios
+    def search_games(self, search_term: str, page: int, count: int, lookahead: int = 0) -> List['Game']:
+        game_ids = self.__ranked_search_results(search_term)
+        return [self.__dataset_of_games[game_id] for game_id in game_ids[(page - 1) * count:page * count + lookahead]]
 
-        return results[(page - 1) * count:page * count]
+    def __ranked_search_results(self, search_term: str) -> tuple:
+        """
+        Returns the ids of every game matching the search term ranked by similarity (best first), scoring the catalogue only if the term isn't cached
+        """
+        return self.__search_cache.get_or_compute(normalise(search_term), lambda: tuple(self.__search_index.search(search_term)))
 
-    def __get_games(self, page: int, count: int, sort_lambda=None, filter_lambda=None, reverse=False):
-        games = list(self.__dataset_of_games)
-        if filter_lambda:
-            games = filter(filter_lambda, games)
-
-        if sort_lambda:
-            games = sorted(games, key=sort_lambda, reverse=reverse)
-        elif reverse:
-            games.reverse()  # If there is a sort function, we should reverse the order according to the sort lambda, otherwise we can just apply a reverse using the default sort method of the objects
-
-
-        return list(games)[(page - 1) * count:page * count]
+    @property
+    def search_cache(self) -> LRUCache:
+        return self.__search_cache
 
     def add_genre(self, genre: Genre):
-        if genre in self.__dataset_of_genres:
+        if genre.genre_name in self.__dataset_of_genres:
             raise repository_layer_exceptions.ResourceAlreadyExistsException(f"Genre with name {genre.genre_name} already exists")
-        self.__dataset_of_genres.add(genre)
+        self.__index_genre(genre)
+        self.__catalogue_version = changed(self.__catalogue_version)
 
-    def get_games(self, page: int, count: int, reverse: bool=False) -> List[Game]:
+    def get_games(self, page: int, count: int, reverse: bool=False, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         if reverse is None:
             reverse = False
-        return self.__get_games(page, count, reverse=reverse)
+        cursor_key = cursor.game_id if cursor is not None else None
+        return self.__get_games(page, count, [(self.__games_by_id, reverse)], lookahead, cursor, 0, cursor_key)
 
-    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool=False) -> List[Game]:
+    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool=False, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         if reverse is None:
             reverse = False
-        return self.__get_games(page, count, sort_lambda=lambda game: (game.get_datetime() is None, game.get_datetime(), game < game), reverse=reverse)
 
-    def get_games_sorted_alphabetically(self, page: int, count: int, reverse=False) -> List[Game]:
+        # Games with a release date are indexed by its ordinal, games without one by their id
+        undated = cursor is not None and cursor.sort_key is None
+        cursor_key = (cursor.game_id if undated else cursor.sort_key.toordinal()) if cursor is not None else None
+
+        if reverse:
+            segments = [(self.__games_without_release_date, False), (self.__games_by_release_date, True)]
+            return self.__get_games(page, count, segments, lookahead, cursor, 0 if undated else 1, cursor_key)
+        segments = [(self.__games_by_release_date, False), (self.__games_without_release_date, False)]
+        return self.__get_games(page, count, segments, lookahead, cursor, 1 if undated else 0, cursor_key)
+
+    def get_games_sorted_alphabetically(self, page: int, count: int, reverse=False, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         if reverse is None:
             reverse = False
-        return self.__get_games(page, count, sort_lambda=lambda game: game.title.lower(), reverse=reverse)
+        cursor_key = (cursor.sort_key or "").casefold() if cursor is not None else None
+        return self.__get_games(page, count, [(self.__games_by_title, reverse)], lookahead, cursor, 0, cursor_key)
 
-    def get_games_with_genre(self, genre: Genre, page: int, count: int) -> List['Game']:
-        if genre not in self.__dataset_of_genres:
+    def get_games_with_genre(self, genre: Genre, page: int, count: int, lookahead: int = 0) -> List['Game']:
+        if genre.genre_name not in self.__dataset_of_genres:
             raise repository_layer_exceptions.ResourceNotFoundException(f"Genre with name {genre.genre_name} does not exist")
 
-        genre_filter = lambda game: genre in game.genres  # Define the genre outside the call
-        return self.__get_games(page, count, filter_lambda=genre_filter)
\ No newline at end of file
+        return self.__get_games(page, count, [(self.__game_ids_by_genre[genre.genre_name], False)], lookahead)
\ No newline at end of file
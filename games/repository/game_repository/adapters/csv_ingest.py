@@ -0,0 +1,274 @@
+"""
+Parses the games CSV file into columns, keeping only the ones the application uses.
+
+Large files are split into byte ranges that start and end on record boundaries (newlines outside quoted fields), the
+ranges are parsed by a pool of worker processes, and the results are merged in AppID order, so the columns are the
+same whatever the number of workers. Rows that can't be loaded (too few fields, an invalid AppID, price or release
+date, or an AppID that is already taken) are reported and skipped instead of stopping the load.
+"""
+import csv
+import io
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from games.domainmodel.model import Game
+
+NONE = 0xFFFFFFFF  # String index of a missing value
+
+# Text columns of the CSV that are kept, in the order they are stored
+TEXT_COLUMNS = ("Name", "Release date", "Header image", "Publishers")
+
+# Detail-only columns of the CSV that go into the side file, and the game attribute each one is read as
+DETAIL_COLUMNS = ("About the game", "Website")
+DETAIL_FIELDS = ("description", "website_url")
+
+PARALLEL_THRESHOLD = 16 * 1024 * 1024  # Bytes, smaller files are parsed in this process since starting workers costs more
+RANGES_PER_WORKER = 4  # More ranges than workers, so a worker that gets a slow range doesn't hold up the others
+MAX_RANGE_SIZE = 32 * 1024 * 1024  # Bytes, so no single range has to be held in memory whole if it is larger
+_BLOCK_SIZE = 1024 * 1024  # Bytes scanned at a time when looking for record boundaries
+MAX_REPORTED_ROWS = 20  # Skipped rows printed one by one, the rest are only counted
+
+_BOM = b"\xef\xbb\xbf"
+
+
+class GameColumns:
+    """
+    The projected columns of the games CSV file. Text values are indexes into strings (NONE if the column is missing),
+    and the genres of game i are genres[genre_offsets[i]:genre_offsets[i + 1]]. Detail-only text is in details: a
+    DetailStore once the snapshot is written, or the text itself (per row, per DETAIL_FIELDS) straight after parsing.
+    """
+
+    def __init__(self, strings: List[str], ids: array, prices: array, text: Dict[str, array], genre_offsets: array, genres: array,
+                 details=None, rejected_rows: List[Tuple[int, str]] = None):
+        self.strings = strings
+        self.ids = ids
+        self.prices = prices
+        self.text = text  # CSV column name -> array of string indexes
+        self.genre_offsets = genre_offsets
+        self.genres = genres
+        self.details = details
+        self.rejected_rows = rejected_rows or []  # (row number, reason) of the rows that were skipped, rows count from 1 after the header
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class ParsedRange(NamedTuple):
+    """
+    The columns parsed from one byte range of the file, with row numbers counted from the start of the range
+    """
+    columns: GameColumns
+    row_numbers: array  # Row number of each game in the columns
+    rows: int  # Number of rows in the range, including the rejected ones
+
+
+class StringTable:
+    """
+    Gives every distinct string one index, so repeated values are stored once
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.__indexes = {}  # text -> its index in strings
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        index = self.__indexes.get(value)
+        if index is None:
+            index = self.__indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def _count_quotes(data, start: int, stop: int) -> int:
+    return sum(data[i:min(i + _BLOCK_SIZE, stop)].count(b'"') for i in range(start, stop, _BLOCK_SIZE))
+
+
+def read_header(data) -> Tuple[List[str], int]:
+    """
+    Reads the header row of the file
+    :param data: The file's contents, or a memory map of it
+    :return: The column names, and the byte offset the first row starts at
+    """
+    start = len(_BOM) if data[:len(_BOM)] == _BOM else 0
+    end = next_record_boundary(data, start)
+    return next(csv.reader(io.StringIO(data[start:end].decode("utf-8"), newline=""))), end
+
+
+def next_record_boundary(data, position: int, start: int = 0) -> int:
+    """
+    Finds where the first record that starts at or after a position begins
+    :param data: The file's contents, or a memory map of it
+    :param position: The byte offset to search from
+    :param start: A byte offset known to be a record boundary, at or before position
+    :return: The byte offset after the first newline at or after position that isn't inside a quoted field, or the
+        length of the data if there is none
+    """
+    # Quotes inside quoted fields are doubled, so a newline is outside quotes when an even number of quotes come before it
+    inside_quotes = _count_quotes(data, start, position) % 2
+    while True:
+        newline = data.find(b"\n", position)
+        if newline == -1:
+            return len(data)
+        inside_quotes = (inside_quotes + _count_quotes(data, position, newline)) % 2
+        if not inside_quotes:
+            return newline + 1
+        position = newline + 1
+
+
+def record_ranges(data, start: int, number_of_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Splits the data after start into about equally sized byte ranges that each hold whole records
+    """
+    size = max(1, (len(data) - start) // number_of_ranges)
+    ranges = []
+    while start < len(data):
+        stop = next_record_boundary(data, start + size, start) if start + size < len(data) else len(data)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def parse_range(csv_path: Path, start: int, stop: int, header: List[str]) -> ParsedRange:
+    """
+    Parses the rows in a byte range of the file (run in the worker processes)
+    """
+    with open(csv_path, "rb") as file:
+        file.seek(start)
+        range_file = io.TextIOWrapper(io.BytesIO(file.read(stop - start)), encoding="utf-8", newline="")
+
+    strings = StringTable()
+    intern = strings.intern
+    ids, prices = array("q"), array("d")
+    text = {column: array("I") for column in TEXT_COLUMNS}
+    genre_offsets, genres = array("I", [0]), array("I")
+    details = []
+    row_numbers = array("I")
+    rejected_rows = []
+
+    positions = {column: header.index(column) if column in header else None for column in TEXT_COLUMNS}
+    detail_positions = [header.index(column) if column in header else None for column in DETAIL_COLUMNS]
+    id_position, price_position, genres_position = header.index("AppID"), header.index("Price"), header.index("Genres")
+    date_position = positions["Release date"]
+
+    probe = Game(0, None)  # checks prices and release dates with the model's own rules
+
+    rows = 0
+    for row in csv.reader(range_file):
+        if not row:  # blank line
+            continue
+        rows += 1
+        try:
+            if len(row) < len(header):
+                raise ValueError("has {} fields, expected {}".format(len(row), len(header)))
+            game_id = int(row[id_position])
+            Game(game_id, None)
+            price = float(row[price_position])
+            probe.price = price
+            if date_position is not None:
+                probe.release_date = row[date_position]  # each distinct date is only parsed once
+        except ValueError as error:
+            rejected_rows.append((rows, str(error)))
+            continue
+
+        ids.append(game_id)
+        prices.append(price)
+        for column, position in positions.items():
+            text[column].append(intern(row[position] if position is not None else None))
+        genres.extend(intern(genre_name) for genre_name in row[genres_position].split(","))
+        genre_offsets.append(len(genres))
+        details.append([row[position] if position is not None else None for position in detail_positions])
+        row_numbers.append(rows)
+
+    columns = GameColumns(strings.strings, ids, prices, text, genre_offsets, genres, details, rejected_rows)
+    return ParsedRange(columns, row_numbers, rows)
+
+
+def merge(parsed_ranges: List[ParsedRange]) -> GameColumns:
+    """
+    Merges the columns parsed from consecutive ranges of the file into one set of columns in AppID order. Games with
+    the same AppID keep the one that comes first in the file, the others are rejected.
+    """
+    # Join the ranges in file order, moving their string indexes into one table
+    strings = StringTable()
+    ids, prices, row_numbers = array("q"), array("d"), array("I")
+    text = {column: array("I") for column in TEXT_COLUMNS}
+    genre_offsets, genres = array("I", [0]), array("I")
+    details = []
+    rejected_rows = []
+
+    first_row = 0
+    for parsed in parsed_ranges:
+        columns = parsed.columns
+        remap = [strings.intern(string) for string in columns.strings]
+        if remap == list(range(len(remap))):  # the first range's strings keep their indexes
+            remap = None
+
+        ids.extend(columns.ids)
+        prices.extend(columns.prices)
+        row_numbers.extend(first_row + row for row in parsed.row_numbers)
+        for column in TEXT_COLUMNS:
+            text[column].extend(columns.text[column] if remap is None else
+                                (remap[index] if index != NONE else NONE for index in columns.text[column]))
+        genre_offsets.extend(len(genres) + offset for offset in columns.genre_offsets[1:])
+        genres.extend(columns.genres if remap is None else (remap[index] for index in columns.genres))
+        details.extend(columns.details)
+        rejected_rows.extend((first_row + row, reason) for row, reason in columns.rejected_rows)
+        first_row += parsed.rows
+
+    # Sort by AppID (the sort is stable, so games with the same AppID stay in file order) and drop the repeats
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    kept = []
+    for i in order:
+        if kept and ids[i] == ids[kept[-1]]:
+            rejected_rows.append((row_numbers[i], "AppID {} is already taken".format(ids[i])))
+        else:
+            kept.append(i)
+    rejected_rows.sort()
+
+    if kept != list(range(len(ids))):
+        ids, prices = array("q", [ids[i] for i in kept]), array("d", [prices[i] for i in kept])
+        text = {column: array("I", [indexes[i] for i in kept]) for column, indexes in text.items()}
+        genres_in_file_order, offsets_in_file_order = genres, genre_offsets
+        genre_offsets, genres = array("I", [0]), array("I")
+        for i in kept:
+            genres.extend(genres_in_file_order[offsets_in_file_order[i]:offsets_in_file_order[i + 1]])
+            genre_offsets.append(len(genres))
+        details = [details[i] for i in kept]
+
+    return GameColumns(strings.strings, ids, prices, text, genre_offsets, genres, details, rejected_rows)
+
+
+def read_columns(csv_path: Path, workers: int = None) -> GameColumns:
+    """
+    Parses the games CSV file into columns, keeping only the ones the application uses
+    :param csv_path: The games CSV file
+    :param workers: Number of worker processes to parse large files with, defaults to one per CPU core. Files smaller
+        than PARALLEL_THRESHOLD, or a single worker, are parsed in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    with open(csv_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header, start = read_header(data)
+        parallel = workers > 1 and len(data) >= PARALLEL_THRESHOLD
+        number_of_ranges = max(workers * RANGES_PER_WORKER if parallel else 1, -(-(len(data) - start) // MAX_RANGE_SIZE))
+        ranges = record_ranges(data, start, number_of_ranges)
+
+    starts, stops = [start for start, _ in ranges], [stop for _, stop in ranges]
+    if parallel:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed_ranges = list(pool.map(parse_range, repeat(csv_path), starts, stops, repeat(header)))
+    else:
+        parsed_ranges = list(map(parse_range, repeat(csv_path), starts, stops, repeat(header)))
+
+    columns = merge(parsed_ranges)
+    for row, reason in columns.rejected_rows[:MAX_REPORTED_ROWS]:
+        print("Skipped row {} of {}: {}".format(row, Path(csv_path).name, reason))
+    if len(columns.rejected_rows) > MAX_REPORTED_ROWS:
+        print("Skipped {} more rows of {}".format(len(columns.rejected_rows) - MAX_REPORTED_ROWS, Path(csv_path).name))
+    return columns
@@ -0,0 +1,219 @@
+"""
+Compiles the games CSV file into a binary snapshot that loads without parsing CSV.
+
+Only the columns the application uses are kept. Each one is stored as an array, and every text value is an index into
+one string table, so repeated values (publishers, genres, release dates) are stored and decoded once. The text only
+shown on a game's own page (its description and website) goes into a side file instead, which is memory mapped and
+read on demand, so it is never loaded by listings and forked workers share it through the OS page cache. Both files
+record a checksum of the CSV they were compiled from and are rebuilt whenever the CSV changes.
+
+Compile a snapshot ahead of time (e.g. while building a deployment) from the project directory with:
+    python -m games.repository.game_repository.adapters.csv_snapshot [directory] [--testing]
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional
+
+from games.repository.game_repository.adapters.csv_ingest import GameColumns, TEXT_COLUMNS, DETAIL_FIELDS, read_columns
+
+MAGIC = b"GSNP"
+DETAILS_MAGIC = b"GDTL"
+FORMAT_VERSION = 3  # Bump whenever the layout or order of the data changes, older snapshots are then rebuilt
+
+_HEADER = struct.Struct("<4sHB32sI")  # magic, format version, byte order, checksum of the CSV, number of games
+_DETAILS_HEADER = struct.Struct("<4sHB32sIx")  # the same, padded so the offset table after it is 8 byte aligned
+_SECTION = struct.Struct("<cQ")  # array type code, length in bytes
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+_DETAIL_POSITIONS = {field: position for position, field in enumerate(DETAIL_FIELDS)}
+
+
+class DetailStore:
+    """
+    The detail-only text of every game in a memory mapped file: a table of byte offsets (one per row and field)
+    followed by the UTF-8 text. Nothing is read until a field is asked for.
+    """
+
+    def __init__(self, path: Path, source_checksum: bytes):
+        """
+        :raises ValueError: If the file is missing, corrupt, or wasn't compiled from the CSV with the given checksum
+        """
+        try:
+            with open(path, "rb") as file:
+                self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, byte_order, file_checksum, self.__rows = _DETAILS_HEADER.unpack_from(self.__map, 0)
+        except (OSError, ValueError, struct.error):
+            raise ValueError("Missing or corrupt detail file {}".format(path))
+        if (magic, version, byte_order, file_checksum) != (DETAILS_MAGIC, FORMAT_VERSION, _BYTE_ORDER, source_checksum):
+            raise ValueError("Detail file {} is out of date".format(path))
+
+        table_end = _DETAILS_HEADER.size + (self.__rows * len(DETAIL_FIELDS) + 1) * 8
+        if table_end > len(self.__map):
+            raise ValueError("Missing or corrupt detail file {}".format(path))
+        self.__offsets = memoryview(self.__map)[_DETAILS_HEADER.size:table_end].cast("Q")
+        self.__text_start = table_end
+        if self.__text_start + self.__offsets[-1] != len(self.__map):
+            raise ValueError("Missing or corrupt detail file {}".format(path))
+
+    @staticmethod
+    def write(details: List[List[Optional[str]]], path: Path, source_checksum: bytes):
+        """
+        Writes the detail file
+        :param details: For each row, its text for each of DETAIL_FIELDS (or None)
+        """
+        offsets, blob = array("Q", [0]), bytearray()
+        for row in details:
+            for text in row:
+                blob += (text or "").encode("utf-8")
+                offsets.append(len(blob))
+
+        temporary_path = path.with_name("{}.{}.tmp".format(path.name, os.getpid()))
+        with open(temporary_path, "wb") as file:
+            file.write(_DETAILS_HEADER.pack(DETAILS_MAGIC, FORMAT_VERSION, _BYTE_ORDER, source_checksum, len(details)))
+            file.write(offsets.tobytes())
+            file.write(blob)
+        os.replace(temporary_path, path)
+
+    def get(self, row: int, field: str) -> Optional[str]:
+        """
+        Reads one field of one row, blank text is returned as None like the game setters do
+        """
+        i = row * len(DETAIL_FIELDS) + _DETAIL_POSITIONS[field]
+        start, stop = self.__text_start + self.__offsets[i], self.__text_start + self.__offsets[i + 1]
+        text = self.__map[start:stop].decode("utf-8")
+        return text if text.strip() != "" else None
+
+    def __len__(self):
+        return self.__rows
+
+
+def checksum(csv_path: Path) -> bytes:
+    """
+    Returns the SHA-256 digest of a file, read in blocks so large files aren't held in memory
+    """
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def snapshot_path(csv_path: Path, directory) -> Path:
+    return Path(directory) / (Path(csv_path).stem + ".snapshot")
+
+
+def details_path(csv_path: Path, directory) -> Path:
+    return Path(directory) / (Path(csv_path).stem + ".details")
+
+
+def write_snapshot(columns: GameColumns, path: Path, source_checksum: bytes):
+    """
+    Writes the columns to a snapshot file (the details are written separately, by DetailStore.write). The file is
+    written under a temporary name and then renamed, so a worker starting at the same time never reads half a snapshot.
+    """
+    joined = "".join(columns.strings)
+    string_offsets = array("Q", [0])
+    for string in columns.strings:
+        string_offsets.append(string_offsets[-1] + len(string))  # offsets are in characters of the decoded text
+
+    sections = [string_offsets, array("B", joined.encode("utf-8")), columns.ids, columns.prices,
+                *[columns.text[column] for column in TEXT_COLUMNS], columns.genre_offsets, columns.genres]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name("{}.{}.tmp".format(path.name, os.getpid()))
+    with open(temporary_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, _BYTE_ORDER, source_checksum, len(columns)))
+        for section in sections:
+            data = section.tobytes()
+            file.write(_SECTION.pack(section.typecode.encode("ascii"), len(data)))
+            file.write(data)
+    os.replace(temporary_path, path)
+
+
+def read_snapshot(path: Path, source_checksum: bytes) -> Optional[GameColumns]:
+    """
+    Reads a snapshot file
+    :param path: The snapshot to read
+    :param source_checksum: The checksum of the CSV file as it is now
+    :return: The columns, or None if there is no snapshot or it is from another CSV file, format version or machine
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+
+    try:
+        magic, version, byte_order, snapshot_checksum, number_of_games = _HEADER.unpack_from(data, 0)
+        if (magic, version, byte_order, snapshot_checksum) != (MAGIC, FORMAT_VERSION, _BYTE_ORDER, source_checksum):
+            return None
+
+        sections = []
+        position = _HEADER.size
+        while position < len(data):
+            typecode, length = _SECTION.unpack_from(data, position)
+            position += _SECTION.size
+            section = array(typecode.decode("ascii"))
+            section.frombytes(data[position:position + length])
+            sections.append(section)
+            position += length
+
+        string_offsets, joined, ids, prices, *text, genre_offsets, genres = sections
+    except (struct.error, ValueError):  # truncated or corrupt, compile it again
+        return None
+
+    if len(ids) != number_of_games or len(text) != len(TEXT_COLUMNS):
+        return None
+
+    joined = joined.tobytes().decode("utf-8")
+    strings = [joined[string_offsets[i]:string_offsets[i + 1]] for i in range(len(string_offsets) - 1)]
+    return GameColumns(strings, ids, prices, dict(zip(TEXT_COLUMNS, text)), genre_offsets, genres)
+
+
+def load_columns(csv_path: Path, directory, workers: int = None) -> GameColumns:
+    """
+    Returns the columns of the games CSV file from its snapshot, compiling the snapshot first if it is missing or
+    the CSV file has changed since it was compiled
+    :param csv_path: The games CSV file
+    :param directory: The directory snapshots are kept in
+    :param workers: Number of worker processes to parse the CSV file with if the snapshot has to be compiled
+    """
+    source_checksum = checksum(csv_path)
+
+    columns = read_snapshot(snapshot_path(csv_path, directory), source_checksum)
+    try:
+        if columns is not None:
+            columns.details = DetailStore(details_path(csv_path, directory), source_checksum)
+            return columns
+    except ValueError:
+        pass
+    return compile_snapshot(csv_path, directory, source_checksum, workers)
+
+
+def compile_snapshot(csv_path: Path, directory, source_checksum: bytes = None, workers: int = None) -> GameColumns:
+    """
+    Compiles the games CSV file into a snapshot in the given directory
+    :return: The columns that were written
+    """
+    start = time.perf_counter()
+    source_checksum = source_checksum or checksum(csv_path)
+    columns = read_columns(csv_path, workers)
+    write_snapshot(columns, snapshot_path(csv_path, directory), source_checksum)
+    DetailStore.write(columns.details, details_path(csv_path, directory), source_checksum)
+    columns.details = DetailStore(details_path(csv_path, directory), source_checksum)
+    print("Compiled snapshot of {} games from {} in {:.2f}s".format(len(columns), Path(csv_path).name, time.perf_counter() - start))
+    return columns
+
+
+if __name__ == '__main__':
+    from games.config import Config
+    from games.repository.game_repository.adapters.csv_game_repository import games_csv_path
+
+    arguments = [argument for argument in sys.argv[1:] if argument != "--testing"]
+    compile_snapshot(games_csv_path("--testing" in sys.argv), arguments[0] if arguments else Config.CSV_SNAPSHOT_DIRECTORY)
@@ -1,7 +1,10 @@
+import re
 import sqlite3
+import time
 from typing import List
 
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func, distinct, text, tuple_, literal
+from sqlalchemy.orm import defer, selectinload
 from sqlalchemy.orm.exc import NoResultFound
 
 from sqlalchemy.exc import IntegrityError
@@ -9,14 +12,37 @@ from sqlalchemy.exc import IntegrityError
 from games.repository.game_repository.game_repository import GameRepository
 from games.repository.game_repository.adapters import csv_game_repository
 from games.domainmodel.model import Genre, Game, Publisher
+from games.pagination.cursor import Cursor
 
 from games.exceptions import repository_layer_exceptions
 
-from games.repository.orm import game_genre_relationship_table, genres_table
+from games.repository.orm import game_genre_relationship_table, genres_table, games_table, publishers_table, read_data_version, touch_data_versions
+from games.repository.data_version import DataVersion, CATALOGUE
+from games.utils import constants
+from games.utils.cache import LRUCache
+
+# Relevance weights for the title and description columns of the games_search full text index
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Number of rows sent to the database in each executemany when bulk loading the catalogue
+BULK_INSERT_BATCH_SIZE = 5000
+
+
+def full_text_query(search_term: str) -> str:
+    """
+    Turns a search term into an FTS5 query that matches games containing every word of the term, where the words
+    may be the start of a longer word (so "call of dut" still finds "Call of Duty")
+    :param search_term: The search term as typed by the user
+    :return: The FTS5 query, or an empty string if the term has no words to search for
+    """
+    return " ".join('"{}"*'.format(word) for word in re.findall(r"\w+", search_term.lower()))
+
 
 class DatabaseGameRepository(GameRepository):
-    def __init__(self, session_context_manager):
+    def __init__(self, session_context_manager, count_cache_size: int = constants.COUNT_CACHE_SIZE):
         self.__session_context_manager = session_context_manager
+        self.__count_cache = LRUCache(count_cache_size)  # (catalogue version, listing, key) -> number of games in the listing
 
     def close_session(self):
         self.__session_context_manager.close_current_session()
@@ -37,24 +63,51 @@ class DatabaseGameRepository(GameRepository):
             except NoResultFound:
                 raise repository_layer_exceptions.ResourceNotFoundException("Game with ID {} not found".format(game_id))
 
-    def get_games_by_publisher(self, publisher: Publisher, page: int, count: int) -> List[Game]:
+    def get_games_by_publisher(self, publisher: Publisher, page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Returns a list of games that have the given publisher
         :param publisher: The publisher to search for
         :param page: The page number to return (offset)
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games that have the given publisher
         """
         with self.__session_context_manager as scm:
             games = (
-                scm.session.query(Game)
+                self.__listing_query(scm.session)
                 .filter(Game._Game__publisher == publisher)
+                .order_by(Game._Game__game_id)
                 .offset((page - 1) * count)
-                .limit(count)
+                .limit(count + lookahead)
                 .all()
             )
 
-            return games
+            return self.__detach(scm.session, games)
+
+    @staticmethod
+    def __listing_query(session, include_description: bool = False):
+        """
+        Starts a query for a page of games that loads the genres and publisher of the whole page in one batched query
+        each, instead of one lazy query per game when the page is rendered
+        :param session: The session to query with
+        :param include_description: Whether to load the description, which listings don't show
+        """
+        options = [selectinload(Game._Game__genres), selectinload(Game._Game__publisher)]
+        if not include_description:
+            options.append(defer(Game._Game__description))
+        return session.query(Game).options(*options)
+
+    @staticmethod
+    def __detach(session, games: List[Game]) -> List[Game]:
+        """
+        Removes a page of games (with their genres and publisher) from the session. Leaving the session context rolls
+        back, which would expire every game and reload it one row at a time the first time the page is rendered.
+        """
+        for game in games:
+            for instance in [game, game.publisher, *game.genres]:
+                if instance is not None and instance in session:
+                    session.expunge(instance)
+        return games
 
     def get_publisher(self, publisher_name: str) -> Publisher:
         """
@@ -82,13 +135,70 @@ class DatabaseGameRepository(GameRepository):
             except NoResultFound:
                 raise repository_layer_exceptions.ResourceNotFoundException("Genre with name {} not found".format(genre_name))
 
+    def __cached_count(self, cache_key: tuple, count_query) -> int:
+        """
+        Returns the cached count for the listing, running the COUNT query only if it hasn't been cached yet
+        :param cache_key: (listing, key) that identifies the listing
+        :param count_query: Function that takes a session and returns the count
+        """
+        # The version is read from the database, so games added through another process are counted too.
+        # Counts for older versions are never hit again and fall out of the cache as it fills up
+        version = self.get_catalogue_version()
+
+        def count() -> int:
+            with self.__session_context_manager as scm:
+                return count_query(scm.session)
+
+        return self.__count_cache.get_or_compute((version,) + cache_key, count)
+
+    @property
+    def count_cache(self) -> LRUCache:
+        return self.__count_cache
+
     def get_number_of_games(self) -> int:
         """
         Returns the number of games in the test_repository
         :return: The number of games in the test_repository
         """
-        with self.__session_context_manager as scm:
-            return scm.session.query(Game).count()
+        return self.__cached_count(('games', None), lambda session: session.query(func.count(games_table.c.id)).scalar())
+
+    def get_number_of_games_with_genre(self, genre: Genre) -> int:
+        """
+        Returns the number of games that have the given genre
+        :param genre: The genre to count games for
+        :return: The number of games with the genre
+        """
+        return self.__cached_count(('genre', genre.genre_name), lambda session: (
+            session.query(func.count(distinct(game_genre_relationship_table.c.game_id)))
+            .filter(game_genre_relationship_table.c.genre_name == genre.genre_name)
+            .scalar()
+        ))
+
+    def get_number_of_games_by_publisher(self, publisher: Publisher) -> int:
+        """
+        Returns the number of games by the given publisher
+        :param publisher: The publisher to count games for
+        :return: The number of games by the publisher
+        """
+        return self.__cached_count(('publisher', publisher.publisher_name), lambda session: (
+            session.query(func.count(games_table.c.id))
+            .filter(games_table.c.publisher_name == publisher.publisher_name)
+            .scalar()
+        ))
+
+    def get_number_of_search_results(self, search_term: str) -> int:
+        """
+        Returns the number of games that search_games would return for the search term across all pages
+        :param search_term: The term to search for
+        :return: The number of games that match the search term
+        """
+        query = full_text_query(search_term)
+        if query == "":
+            return 0
+
+        return self.__cached_count(('search', query), lambda session: (
+            session.execute(text("SELECT count(*) FROM games_search WHERE games_search MATCH :query"), {'query': query}).scalar()
+        ))
 
     def add_game(self, game: Game):
         """
@@ -103,6 +213,7 @@ class DatabaseGameRepository(GameRepository):
                 pass
 
             scm.session.merge(game)
+            touch_data_versions(scm.session, [CATALOGUE])
             scm.commit()
 
     def add_genre(self, genre: Genre):
@@ -117,8 +228,13 @@ class DatabaseGameRepository(GameRepository):
             except repository_layer_exceptions.ResourceNotFoundException:
                 pass
             scm.session.add(genre)
+            touch_data_versions(scm.session, [CATALOGUE])
             scm.commit()
 
+    def get_catalogue_version(self) -> DataVersion:
+        with self.__session_context_manager as scm:
+            return read_data_version(scm.session, CATALOGUE)
+
     def get_genres(self) -> List[Genre]:
         """
         Returns a list of all genres in the test_repository
@@ -143,108 +259,243 @@ class DatabaseGameRepository(GameRepository):
 
         with self.__session_context_manager as scm:
             scm.session.add(publisher)
+            touch_data_versions(scm.session, [CATALOGUE])
             scm.commit()
 
-    def search_games(self, search_term: str, page: int, count: int) -> List[Game]:
+    def search_games(self, search_term: str, page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Searches for games that match the search term
         :param search_term: The term to search for
         :param page: The page number to return
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games that match the search term
         """
+        query = full_text_query(search_term)
+        if query == "":
+            return []
+
         with self.__session_context_manager as scm:
             games = (
-                scm.session.query(Game)
-                .filter(Game._Game__game_title.like("%{}%".format(search_term)))
-                .offset((page - 1) * count)
-                .limit(count)
+                self.__listing_query(scm.session)
+                .from_statement(text(
+                    "SELECT games.* FROM games_search JOIN games ON games.id = games_search.rowid "
+                    "WHERE games_search MATCH :query "
+                    "ORDER BY bm25(games_search, :title_weight, :description_weight), games.id "
+                    "LIMIT :limit OFFSET :offset"
+                ))
+                .params(query=query, title_weight=TITLE_WEIGHT, description_weight=DESCRIPTION_WEIGHT, limit=count + lookahead, offset=(page - 1) * count)
                 .all()
             )
 
-            return games
+            return self.__detach(scm.session, games)
 
-    def get_games(self, page: int, count: int, reverse: bool) -> List[Game]:
+    def get_games(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of games
         :param page: The page number to return (offset)
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game the page continues from, the page number is ignored when given
         :return: A list of games
         """
         with self.__session_context_manager as scm:
-            games = scm.session.query(Game).offset((page - 1) * count).limit(count).all()
-            return games
+            if cursor is not None:
+                games = self.__games_from_cursor(scm.session, None, False, cursor, count + lookahead)
+            else:
+                games = self.__listing_query(scm.session).order_by(asc(Game._Game__game_id)).offset((page - 1) * count).limit(count + lookahead).all()
+            return self.__detach(scm.session, games)
 
-    def get_games_sorted_alphabetically(self, page: int, count: int, reverse: bool) -> List[Game]:
+    def get_games_sorted_alphabetically(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of games sorted alphabetically by title
         :param page: The page number to return (offset)
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game the page continues from, the page number is ignored when given
         :return: A list of games sorted alphabetically by title
         """
         with self.__session_context_manager as scm:
-            if not reverse:
-                games = scm.session.query(Game).order_by(asc(Game._Game__game_title)).offset((page - 1) * count).limit(count).all()
+            if cursor is not None:
+                games = self.__games_from_cursor(scm.session, Game._Game__game_title, bool(reverse), cursor, count + lookahead)
             else:
-                games = scm.session.query(Game).order_by(desc(Game._Game__game_title)).offset((page - 1) * count).limit(count).all()
-            return games
-
-
-    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool) -> List[Game]:
+                order = desc if reverse else asc
+                games = (
+                    self.__listing_query(scm.session)
+                    .order_by(order(Game._Game__game_title), order(Game._Game__game_id))
+                    .offset((page - 1) * count)
+                    .limit(count + lookahead)
+                    .all()
+                )
+            return self.__detach(scm.session, games)
+
+    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of games sorted by release date
         :param page: The page number to return (offset)
         :param count: The number of results to return
         :param reverse: Whether to reverse the order of the results
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game the page continues from, the page number is ignored when given
         :return: A list of games sorted by release date
         """
         with self.__session_context_manager as scm:
-            if not reverse:
-                games = scm.session.query(Game).order_by(asc(Game._Game__release_date)).offset((page - 1) * count).limit(count).all()
+            if cursor is not None:
+                games = self.__games_from_cursor(scm.session, Game._Game__release_date, bool(reverse), cursor, count + lookahead)
             else:
-                games = scm.session.query(Game).order_by(desc(Game._Game__release_date)).offset((page - 1) * count).limit(count).all()
-            return games
+                order = desc if reverse else asc
+                games = (
+                    self.__listing_query(scm.session)
+                    .order_by(order(Game._Game__release_date), order(Game._Game__game_id))
+                    .offset((page - 1) * count)
+                    .limit(count + lookahead)
+                    .all()
+                )
+            return self.__detach(scm.session, games)
+
+    def __games_from_cursor(self, session, column, descending: bool, cursor: Cursor, limit: int) -> List[Game]:
+        """
+        Returns the games next to the cursor in a listing ordered by the column and then by id. Every query is a range
+        that starts at the cursor, so the database seeks to it through an index instead of stepping over an offset.
+        :param column: The column the listing is sorted by, None if it is only sorted by id
+        :param descending: Whether the listing is in descending order
+        :param cursor: The game to start from
+        :param limit: The number of games to return
+        """
+        if cursor.before:
+            # The games before the cursor are the ones after it when reading the listing backwards
+            return self.__games_after(session, column, not descending, cursor.sort_key, cursor.game_id, limit)[::-1]
+        return self.__games_after(session, column, descending, cursor.sort_key, cursor.game_id, limit)
+
+    def __games_after(self, session, column, descending: bool, sort_key, game_id: int, limit: int) -> List[Game]:
+        game_id_column = Game._Game__game_id
+        order = desc if descending else asc
+
+        if column is None:
+            position = game_id_column < game_id if descending else game_id_column > game_id
+            return self.__listing_query(session).filter(position).order_by(order(game_id_column)).limit(limit).all()
+
+        # SQLite sorts NULL before every value. Games without a value are read as a separate run ordered by id, so
+        # both runs are simple index ranges.
+        runs = [(False, sort_key is not None), (True, sort_key is None)]
+        if not descending:
+            runs.reverse()
+        if not column.property.columns[0].nullable:
+            runs = [(False, True)]
+
+        games = []
+        started = False
+        for null_run, holds_cursor in runs:
+            started = started or holds_cursor
+            if not started or len(games) >= limit:
+                continue
+
+            if null_run:
+                keys, values = tuple_(game_id_column), tuple_(game_id)
+                query = self.__listing_query(session).filter(column.is_(None)).order_by(order(game_id_column))
+            else:
+                keys, values = tuple_(column, game_id_column), tuple_(literal(sort_key, column.type), game_id)
+                query = self.__listing_query(session).filter(column.isnot(None)).order_by(order(column), order(game_id_column))
+
+            if holds_cursor:
+                query = query.filter(keys < values if descending else keys > values)
+            games.extend(query.limit(limit - len(games)).all())
+
+        return games
 
-    def get_games_with_genre(self, genre: 'Genre', page: int, count: int) -> List[Game]:
+    def get_games_with_genre(self, genre: 'Genre', page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Returns a list of games that have the genre in their list of genres
         :param page: The page number to return (offset)
         :param count: The number of results to return
         :param genre: The genre to search for
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games that have the genre in their list of genres
         """
         with self.__session_context_manager as scm:
             games = (
-                scm.session.query(Game)
+                self.__listing_query(scm.session)
                 .join(game_genre_relationship_table)
                 .join(Genre)
                 .filter(Genre._Genre__genre_name == genre.genre_name)
+                .order_by(Game._Game__game_id)
                 .offset((page - 1) * count)
-                .limit(count)
+                .limit(count + lookahead)
                 .all()
             )
 
-            return games
+            return self.__detach(scm.session, games)
 
     def populate(self, testing: bool=False):
+        """
+        Bulk loads the games CSV file. The file is streamed, genres and publishers are deduplicated in memory and
+        every table is filled with batched executemany inserts in a single transaction. Rows that are already in the
+        database are left as they are.
+        :param testing: Whether to load the test dataset
+        """
+        started = time.perf_counter()
 
-        repo = csv_game_repository.CSVGameRepository()
-        repo.populate(testing)
+        publisher_names = set()
+        genre_names = set()
+        game_ids = set()
+        game_rows = []
+        link_rows = []
 
-        for game in repo.get_games(1, repo.get_number_of_games(), False):
-            try:
-                self.add_game(game)
-            except:
-                pass
+        with self.__session_context_manager as scm:
+            def flush():
+                # Publishers and genres go first so the foreign keys of the games and links already resolve
+                self.__insert_rows(scm, publishers_table, [{'name': name} for name in publisher_names])
+                self.__insert_rows(scm, genres_table, [{'name': name} for name in genre_names])
+                self.__insert_rows(scm, games_table, game_rows)
+                self.__insert_rows(scm, game_genre_relationship_table, link_rows)
+                publisher_names.clear()
+                genre_names.clear()
+                game_rows.clear()
+                link_rows.clear()
+
+            seen_publishers = set()
+            seen_genres = set()
+            for game in csv_game_repository.read_games(testing):
+                if game.game_id in game_ids:
+                    continue
+                game_ids.add(game.game_id)
+
+                publisher_name = game.publisher.publisher_name if game.publisher is not None else None
+                if publisher_name is not None and publisher_name not in seen_publishers:
+                    seen_publishers.add(publisher_name)
+                    publisher_names.add(publisher_name)
+
+                game_rows.append({
+                    'id': game.game_id,
+                    'title': game.title,
+                    'publisher_name': publisher_name,
+                    'price': game.price,
+                    'release_date': game.release_date_ordinal,
+                    'description': game.description,
+                    'image_url': game.image_url,
+                    'website_url': game.website_url,
+                })
+
+                for genre in game.genres:
+                    if genre.genre_name is None:
+                        continue
+                    if genre.genre_name not in seen_genres:
+                        seen_genres.add(genre.genre_name)
+                        genre_names.add(genre.genre_name)
+                    link_rows.append({'game_id': game.game_id, 'genre_name': genre.genre_name})
+
+                if len(game_rows) >= BULK_INSERT_BATCH_SIZE:
+                    flush()
+
+            flush()
+            touch_data_versions(scm.session, [CATALOGUE])
+            scm.commit()
 
-        for genre in repo.get_genres():
-            try:
-                self.add_genre(genre)
-            except:
-                pass
+        elapsed = time.perf_counter() - started
+        print("Loaded {} games ({} genres, {} publishers) in {:.2f}s, {:.0f} games/s".format(
+            len(game_ids), len(seen_genres), len(seen_publishers), elapsed, len(game_ids) / elapsed if elapsed else 0))
 
-        for publisher in repo.get_publishers():
-            try:
-                self.add_publisher(publisher)
-            except:
-                pass
\ No newline at end of file
+    @staticmethod
+    def __insert_rows(scm, table, rows: List[dict]):
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            scm.session.execute(table.insert().prefix_with('OR IGNORE'), rows[start:start + BULK_INSERT_BATCH_SIZE])
\ No newline at end of file
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List
 from games.domainmodel.model import Genre, Game, Publisher
+from games.pagination.cursor import Cursor
+from games.repository.data_version import DataVersion
 
 class GameRepository(ABC):
     @abstractmethod
@@ -29,6 +31,33 @@ class GameRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_number_of_games_with_genre(self, genre: Genre) -> int:
+        """
+        Returns the number of games that have the given genre
+        :param genre: The genre to count games for
+        :return: The number of games with the genre
+        """
+        pass
+
+    @abstractmethod
+    def get_number_of_games_by_publisher(self, publisher: Publisher) -> int:
+        """
+        Returns the number of games by the given publisher
+        :param publisher: The publisher to count games for
+        :return: The number of games by the publisher
+        """
+        pass
+
+    @abstractmethod
+    def get_number_of_search_results(self, search_term: str) -> int:
+        """
+        Returns the number of games that search_games would return for the search term across all pages
+        :param search_term: The term to search for
+        :return: The number of games that match the search term
+        """
+        pass
+
     @abstractmethod
     def add_game(self, game: Game):
         """
@@ -45,6 +74,15 @@ class GameRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_catalogue_version(self) -> DataVersion:
+        """
+        Returns a version that changes whenever a game, genre or publisher is added, so that anything derived from the
+        catalogue can tell whether it is out of date
+        :return: The current version of the catalogue, and when it was made
+        """
+        pass
+
     @abstractmethod
     def get_genres(self) -> List[Genre]:
         """
@@ -66,12 +104,13 @@ class GameRepository(ABC):
         pass
 
     @abstractmethod
-    def get_games_by_publisher(self, publisher: Publisher, count: int, page: int) -> List[Game]:
+    def get_games_by_publisher(self, publisher: Publisher, page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Returns a list of games by the given publisher
         :param publisher: The publisher to search for
         :param count: The number of results to return
         :param page: The page number to return (offset)
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games by the given publisher
         """
         pass
@@ -93,54 +132,62 @@ class GameRepository(ABC):
         pass
 
     @abstractmethod
-    def search_games(self, search_term: str, page: int, count: int) -> List[Game]:
+    def search_games(self, search_term: str, page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Searches for games that match the search term
         :param search_term: The term to search for
         :param page: The page number to return
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games that match the search term
         """
         pass
 
     @abstractmethod
-    def get_games(self, page: int, count: int, reverse: bool) -> List[Game]:
+    def get_games(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of all games (unsorted)
         :param page: The page number to return (offset)
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game (sort key is its ID) the page continues from, the page number is ignored when given
         :return: A list of games
         """
         pass
 
     @abstractmethod
-    def get_games_sorted_alphabetically(self, page: int, count: int, reverse: bool) -> List[Game]:
+    def get_games_sorted_alphabetically(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of games sorted alphabetically by title
         :param page: The page number to return (offset)
         :param count: The number of results to return
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game (sort key is its title) the page continues from, the page number is ignored when given
         :return: A list of games sorted alphabetically by title
         """
         pass
 
     @abstractmethod
-    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool) -> List[Game]:
+    def get_games_sorted_by_date(self, page: int, count: int, reverse: bool, lookahead: int = 0, cursor: Cursor = None) -> List[Game]:
         """
         Returns a list of games sorted by release date
         :param page: The page number to return (offset)
         :param count: The number of results to return
         :param reverse: Whether to reverse the order of the results
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
+        :param cursor: The game (sort key is its release date) the page continues from, the page number is ignored when given
         :return: A list of games sorted by release date
         """
         pass
 
     @abstractmethod
-    def get_games_with_genre(self, genre: 'Genre', page: int, count: int) -> List[Game]:
+    def get_games_with_genre(self, genre: 'Genre', page: int, count: int, lookahead: int = 0) -> List[Game]:
         """
         Returns a list of games that have the genre in their list of genres
         :param page: The page number to return (offset)
         :param count: The number of results to return
         :param genre: The genre to search for
+        :param lookahead: The number of extra results to return after the page (used to check if there is a next page)
         :return: A list of games that have the genre in their list of genres
         """
         pass
@@ -0,0 +1,68 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Hashable, Iterable, List, Tuple
+
+
+class OrderedIndex:
+    """
+    A list of ids kept sorted by a key, so that a page of results is a slice instead of a sort.
+    Entries with equal keys are ordered by id. Reverse order is served from the same list by slicing from the end.
+    """
+
+    def __init__(self):
+        self.__keys = []
+        self.__ids = []
+
+    def insert(self, key: Any, id_: Hashable):
+        """
+        Inserts the id at the position given by its sort key
+        :param key: The sort key of the entry (must be comparable with every other key in the index)
+        :param id_: The id to store
+        """
+        position = bisect_right(self.__keys, (key, id_))
+        self.__keys.insert(position, (key, id_))
+        self.__ids.insert(position, id_)
+
+    def insert_many(self, entries: Iterable[Tuple[Any, Hashable]]):
+        """
+        Inserts many (key, id) entries with one sort, which is much faster than inserting them one at a time
+        """
+        self.__keys = sorted(self.__keys + list(entries))
+        self.__ids = [id_ for _, id_ in self.__keys]
+
+    def remove(self, key: Any, id_: Hashable):
+        """
+        Removes an entry that was inserted with the given key and id, does nothing if it isn't in the index
+        """
+        position = bisect_left(self.__keys, (key, id_))
+        if position < len(self.__keys) and self.__keys[position] == (key, id_):
+            del self.__keys[position]
+            del self.__ids[position]
+
+    def span(self, key: Any, id_: Hashable, reverse: bool = False) -> Tuple[int, int]:
+        """
+        Finds where an entry is (or would be) when reading the index in the given order
+        :return: (first, stop) positions, the entries before the given one end at first and the ones after it start at stop
+        """
+        first, stop = bisect_left(self.__keys, (key, id_)), bisect_right(self.__keys, (key, id_))
+        if not reverse:
+            return first, stop
+        return len(self.__keys) - stop, len(self.__keys) - first
+
+    def slice(self, start: int, stop: int, reverse: bool = False) -> List[Hashable]:
+        """
+        Returns the ids between the two positions, counting from the end when reversed
+        :param start: Position of the first id to return
+        :param stop: Position after the last id to return
+        :param reverse: Whether to read the index in descending order
+        :return: The ids in the requested order
+        """
+        if not reverse:
+            return self.__ids[start:stop]
+        length = len(self.__ids)
+        return self.__ids[max(length - stop, 0):max(length - start, 0)][::-1]
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def __iter__(self):
+        return iter(self.__ids)
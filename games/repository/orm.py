@@ -1,16 +1,44 @@
+import time
+from datetime import date, datetime
+from typing import Iterable
+
 from sqlalchemy import (
     Table, MetaData, Column, Integer, String, Date, DateTime, Float,
-    ForeignKey, UniqueConstraint
+    ForeignKey, UniqueConstraint, Index, DDL, event, inspect, select, func, case
 )
 
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import scoped_session
+from sqlalchemy.types import TypeDecorator
 
 from sqlalchemy.orm import mapper, relationship, synonym
 
 from games.domainmodel.model import Game, Publisher, Genre, User, Review, Wish
+from games.repository.review_repository.review_repository import RATINGS
+from games.repository.data_version import DataVersion, UNCHANGED
 
 metadata = MetaData()
 
+
+class OrdinalDate(TypeDecorator):
+    """
+    A DATE column that is read as the date's ordinal (days since Jan 1 of year 1), the way games hold release dates.
+    Dates and datetimes (e.g. from cursors) can still be compared with it.
+    """
+    impl = Date
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, int):
+            return date.fromordinal(value)
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value.toordinal() if value is not None else None
+
+
 users_table = Table(
     'users', metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
@@ -24,7 +52,7 @@ games_table = Table(
     Column('title', String(255), nullable=False),
     Column('publisher_name', ForeignKey('publishers.name')),
     Column('price', Float, nullable=True),
-    Column('release_date', Date, nullable=True),
+    Column('release_date', OrdinalDate, nullable=True),
     Column('description', String(2000), nullable=True),
     Column('image_url', String(255), nullable=True),
     Column('website_url', String(255), nullable=True),
@@ -66,6 +94,173 @@ game_genre_relationship_table = Table(
     Column('genre_name', ForeignKey('genres.name')),
 )
 
+# Number of reviews, sum of their ratings and number of reviews per rating for each reviewed game. It is kept up to
+# date as reviews are added, so a game page reads its average rating from one row instead of every review.
+rating_summaries_table = Table(
+    'rating_summaries', metadata,
+    Column('game_id', ForeignKey('games.id'), primary_key=True),
+    Column('review_count', Integer, nullable=False, default=0),
+    Column('rating_total', Integer, nullable=False, default=0),
+    *[Column('rating_{}_count'.format(rating), Integer, nullable=False, default=0) for rating in RATINGS]
+)
+
+# Version number and time of the last change of each piece of data that pages are built from ("catalogue", or
+# "reviews:<game id>" for the reviews of a game). They are bumped in the same transaction as the change, so every
+# process serving the database sees the same versions, and cached pages and ETags built from them.
+data_versions_table = Table(
+    'data_versions', metadata,
+    Column('name', String(255), primary_key=True),
+    Column('version', Integer, nullable=False),
+    Column('modified', Float, nullable=False),  # seconds since the epoch
+)
+
+# Indexes on the foreign keys and sort columns that game, genre, publisher, profile and browse pages filter or order by
+Index('ix_games_title', games_table.c.title)
+Index('ix_games_release_date', games_table.c.release_date)
+Index('ix_games_publisher_name', games_table.c.publisher_name)
+Index('ix_reviews_game_id', reviews_table.c.game_id)
+Index('ix_reviews_user_id', reviews_table.c.user_id)
+# Pages of a game's or user's reviews sorted by rating (SQLite appends the row id, which breaks ties newest first)
+Index('ix_reviews_game_id_rating', reviews_table.c.game_id, reviews_table.c.rating)
+Index('ix_reviews_user_id_rating', reviews_table.c.user_id, reviews_table.c.rating)
+Index('ix_wish_game_id', wish_table.c.game_id)
+Index('ix_wish_user_id', wish_table.c.user_id)
+# Wishlists of a user or game in the order the wishes were made
+Index('ix_wish_user_id_date_added', wish_table.c.user_id, wish_table.c.date_added)
+Index('ix_wish_game_id_date_added', wish_table.c.game_id, wish_table.c.date_added)
+Index('ix_game_genre_relationship_game_id_genre_name',
+      game_genre_relationship_table.c.game_id, game_genre_relationship_table.c.genre_name, unique=True)
+Index('ix_game_genre_relationship_genre_name', game_genre_relationship_table.c.genre_name)
+
+# Full text index over game titles and descriptions. It is an external content FTS5 table, so it stores no copy of
+# the text and the triggers keep it in sync with every insert, update and delete on games.
+games_search_ddl = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS games_search USING fts5("
+    "title, description, content='games', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS games_search_insert AFTER INSERT ON games BEGIN "
+    "INSERT INTO games_search(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+
+    "CREATE TRIGGER IF NOT EXISTS games_search_delete AFTER DELETE ON games BEGIN "
+    "INSERT INTO games_search(games_search, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+
+    "CREATE TRIGGER IF NOT EXISTS games_search_update AFTER UPDATE ON games BEGIN "
+    "INSERT INTO games_search(games_search, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO games_search(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+for statement in games_search_ddl:
+    event.listen(games_table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(games_table, 'before_drop', DDL("DROP TABLE IF EXISTS games_search").execute_if(dialect='sqlite'))
+
+
+def create_search_index(engine):
+    """
+    Adds the full text index to a database that was created before it existed, and fills it from the games table
+    """
+    if engine.dialect.name != 'sqlite' or 'games_search' in inspect(engine).get_table_names():
+        return
+
+    with engine.begin() as connection:
+        for statement in games_search_ddl:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO games_search(games_search) VALUES ('rebuild')")
+
+
+def create_indexes(engine):
+    """
+    Adds any index declared in the metadata that an existing database doesn't have yet. Duplicate genre links are
+    removed first, since older databases could store them and the link index is unique.
+    :param engine: The engine of the database to update
+    """
+    existing = {table: {index['name'] for index in inspect(engine).get_indexes(table)}
+                for table in inspect(engine).get_table_names()}
+
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if table.name not in existing or index.name in existing[table.name]:
+                    continue
+                if table is game_genre_relationship_table and index.unique:
+                    connection.execute(game_genre_relationship_table.delete().where(
+                        game_genre_relationship_table.c.id.notin_(
+                            select(func.min(game_genre_relationship_table.c.id))
+                            .group_by(game_genre_relationship_table.c.game_id, game_genre_relationship_table.c.genre_name)
+                        )
+                    ))
+                index.create(connection)
+
+
+def create_rating_summaries(engine):
+    """
+    Adds the rating summaries to a database that was created before they existed, and fills them from the reviews
+    """
+    if 'rating_summaries' in inspect(engine).get_table_names():
+        return
+
+    with engine.begin() as connection:
+        rating_summaries_table.create(connection)
+        connection.execute(rating_summaries_table.insert().from_select(
+            [column.name for column in rating_summaries_table.c],
+            select(
+                reviews_table.c.game_id,
+                func.count(),
+                func.sum(reviews_table.c.rating),
+                *[func.sum(case((reviews_table.c.rating == rating, 1), else_=0)) for rating in RATINGS]
+            ).group_by(reviews_table.c.game_id)
+        ))
+
+
+def create_data_versions(engine):
+    """
+    Adds the data versions to a database that was created before they existed. Data without a row is at version 0.
+    """
+    data_versions_table.create(engine, checkfirst=True)
+
+
+def read_data_version(session, name: str) -> DataVersion:
+    """
+    Reads the version of the named data
+    """
+    row = session.execute(
+        select(data_versions_table.c.version, data_versions_table.c.modified).where(data_versions_table.c.name == name)
+    ).first()
+    return DataVersion(*row) if row is not None else UNCHANGED
+
+
+def touch_data_versions(session, names: Iterable[str]):
+    """
+    Records that the named data has changed, as part of the session's transaction
+    """
+    rows = [{'name': name, 'version': 1, 'modified': time.time()} for name in names]
+    if not rows:
+        return
+    statement = insert(data_versions_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[data_versions_table.c.name],
+        set_={'version': data_versions_table.c.version + 1, 'modified': statement.excluded.modified}
+    )
+    session.execute(statement, rows)
+
+
+def set_sqlite_pragmas(engine, pragmas: dict):
+    """
+    Runs PRAGMA statements on every new connection the engine opens (does nothing for other databases)
+    :param engine: The engine to configure
+    :param pragmas: Pragma name -> value, pragmas with a value of None are skipped
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if value is not None:
+                cursor.execute("PRAGMA {}={}".format(name, value))
+        cursor.close()
+
+
 def map_model_to_tables():
     mapper(Genre, genres_table, properties={
         '_Genre__genre_name': genres_table.c.name
@@ -1,39 +1,65 @@
 import csv
+import time
 from pathlib import Path
-from typing import List
-from games.repository.review_repository.review_repository import ReviewRepository, ReviewDTO
+from typing import Iterator, List
+from games.repository.review_repository.review_repository import ReviewRepository, ReviewDTO, RatingSummary
+from games.repository.data_version import DataVersion, changed
 
 from games.domainmodel.model import User, Game, Review
 
 from games.exceptions.repository_layer_exceptions import ResourceAlreadyExistsException, ResourceNotFoundException
+from games.repository.ordered_index import OrderedIndex
 
-from games.service.review_service import review_dto_to_review
+from games.service.review_service import review_dtos_to_reviews
 
 from games.repository import game_repository
 from games.repository import user_repository
 
 
+def read_reviews(testing: bool) -> Iterator[ReviewDTO]:
+    """
+    Reads the reviews CSV file
+    :param testing: Whether to read the test dataset
+    """
+    if testing:
+        path = Path(__file__).parent.parent / "data" / "test_reviews.csv"
+    else:
+        path = Path(__file__).parent.parent / "data" / "reviews.csv"
+
+    with open(path, mode='r', encoding='utf-8-sig') as csv_file:
+        data = csv.DictReader(csv_file)
+        for row in data:
+            yield ReviewDTO(
+                row['username'],
+                int(row['game_id']),
+                int(row['rating']),
+                row['comment']
+            )
+
+
 class CSVReviewRepository(ReviewRepository):
     def __init__(self):
         self.__dataset_of_reviews = set()
+        self.__rating_summaries = {}  # game_id -> RatingSummary
+        self.__reviews_versions = {}  # game_id -> DataVersion of the game's reviews, for the games reviewed since loading
+        self.__loaded_version = DataVersion(0, time.time())  # Reviews only live in this process, see CSVGameRepository
+
+        # Every review in the order it was added, a review's position is its sequence number
+        self.__reviews_in_order: List[ReviewDTO] = []
+        # game_id / username -> sequence numbers of its reviews (oldest first), and the same sorted by rating, so
+        # listing one game's or user's reviews never scans the others
+        self.__sequence_numbers_by_game = {}
+        self.__sequence_numbers_by_user = {}
+        self.__ratings_by_game = {}
+        self.__ratings_by_user = {}
 
     def get_reviews_by_user(self, user: User) -> List[Review]:
-        user_reviews = []
-
-        for review in self.__dataset_of_reviews:
-            if review.username == user.username:
-                user_reviews.append(review_dto_to_review(review, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user))
-
-        return user_reviews
+        review_dtos = [self.__reviews_in_order[sequence_number] for sequence_number in self.__sequence_numbers_by_user.get(user.username, [])]
+        return review_dtos_to_reviews(review_dtos, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user)
 
     def get_reviews_for_game(self, game: Game) -> List[Review]:
-        game_review = []
-
-        for review in self.__dataset_of_reviews:
-            if review.game_id == game.game_id:
-                game_review.append(review_dto_to_review(review, user_repository.user_repo_instance, game_repository.game_repo_instance, game=game))
-
-        return game_review
+        review_dtos = [self.__reviews_in_order[sequence_number] for sequence_number in self.__sequence_numbers_by_game.get(game.game_id, [])]
+        return review_dtos_to_reviews(review_dtos, user_repository.user_repo_instance, game_repository.game_repo_instance, game=game)
 
     def add_review(self, review: Review):
         review_dto = ReviewDTO(
@@ -46,25 +72,59 @@ class CSVReviewRepository(ReviewRepository):
         if review_dto in self.__dataset_of_reviews:
             raise ResourceAlreadyExistsException(f'Review with user <{review.user.username}> and game_id <{review.game.game_id}> and comment <{review.comment}> already exists')
 
+        self.__store(review_dto)
+        self.__reviews_versions[review_dto.game_id] = changed(self.get_reviews_version(review_dto.game_id))
+
+    def __store(self, review_dto: ReviewDTO):
         self.__dataset_of_reviews.add(review_dto)
+        self.__rating_summaries.setdefault(review_dto.game_id, RatingSummary()).add(review_dto.rating)
+
+        sequence_number = len(self.__reviews_in_order)
+        self.__reviews_in_order.append(review_dto)
+        self.__sequence_numbers_by_game.setdefault(review_dto.game_id, []).append(sequence_number)
+        self.__sequence_numbers_by_user.setdefault(review_dto.username, []).append(sequence_number)
+        self.__ratings_by_game.setdefault(review_dto.game_id, OrderedIndex()).insert(review_dto.rating, sequence_number)
+        self.__ratings_by_user.setdefault(review_dto.username, OrderedIndex()).insert(review_dto.rating, sequence_number)
+
+    def __page(self, sequence_numbers: List[int], ratings: OrderedIndex, sort_by: str, page: int, count: int, lookahead: int) -> List[ReviewDTO]:
+        """
+        Reads a page of reviews from one game's or user's indexes, newest first within equal ratings
+        """
+        start = (page - 1) * count
+        stop = start + count + lookahead
+        if sort_by == 'rating':
+            page_sequence_numbers = ratings.slice(start, stop, reverse=True)
+        else:
+            length = len(sequence_numbers)
+            page_sequence_numbers = sequence_numbers[max(length - stop, 0):max(length - start, 0)][::-1]
+        return [self.__reviews_in_order[sequence_number] for sequence_number in page_sequence_numbers]
+
+    def get_page_of_reviews_for_game(self, game: Game, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        review_dtos = self.__page(self.__sequence_numbers_by_game.get(game.game_id, []),
+                                  self.__ratings_by_game.get(game.game_id, OrderedIndex()),
+                                  sort_by, page, count, lookahead)
+        return review_dtos_to_reviews(review_dtos, user_repository.user_repo_instance, game_repository.game_repo_instance, game=game)
+
+    def get_page_of_reviews_by_user(self, user: User, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        review_dtos = self.__page(self.__sequence_numbers_by_user.get(user.username, []),
+                                  self.__ratings_by_user.get(user.username, OrderedIndex()),
+                                  sort_by, page, count, lookahead)
+        return review_dtos_to_reviews(review_dtos, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user)
+
+    def get_number_of_reviews_by_user(self, user: User) -> int:
+        return len(self.__sequence_numbers_by_user.get(user.username, []))
+
+    def get_reviews_version(self, game_id: int) -> DataVersion:
+        return self.__reviews_versions.get(game_id, self.__loaded_version)
+
+    def get_rating_summary(self, game: Game) -> RatingSummary:
+        summary = self.__rating_summaries.get(game.game_id, RatingSummary())
+        return RatingSummary(summary.count, summary.total, list(summary.histogram))
 
     def __read_csv_file(self, testing):
-        if testing:
-            path = Path(__file__).parent.parent / "data" / "test_reviews.csv"
-        else:
-            path = Path(__file__).parent.parent / "data" / "reviews.csv"
-
-        with open(path, mode='r', encoding='utf-8-sig') as csv_file:
-            data = csv.DictReader(csv_file)
-            for row in data:
-                review = ReviewDTO(
-                    row['username'],
-                    int(row['game_id']),
-                    int(row['rating']),
-                    row['comment']
-                )
-
-                self.__dataset_of_reviews.add(review)
+        for review in read_reviews(testing):
+            if review not in self.__dataset_of_reviews:
+                self.__store(review)
 
     def populate(self, testing=False):
         self.__read_csv_file(testing)
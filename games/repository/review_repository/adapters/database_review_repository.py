@@ -1,11 +1,14 @@
 from typing import List
 
-from games.repository.review_repository.review_repository import ReviewRepository
+from sqlalchemy import desc, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import joinedload
+
+from games.repository.review_repository.review_repository import ReviewRepository, RatingSummary, RATINGS
+from games.repository.orm import rating_summaries_table, read_data_version, touch_data_versions
+from games.repository.data_version import DataVersion, game_reviews
 from games.domainmodel.model import User, Game, Review
-from games.repository.review_repository.adapters import csv_review_repository
-from games.repository.user_repository.adapters import csv_user_repository
-from games.repository.game_repository.adapters import csv_game_repository
-from games.repository import user_repository, game_repository
+from games.repository.database_loader import DatabaseLoader
 
 from games.exceptions import repository_layer_exceptions
 
@@ -38,6 +41,65 @@ class DatabaseReviewRepository(ReviewRepository):
             )
             return game_reviews
 
+    @staticmethod
+    def __page_query(session, sort_by: str):
+        """
+        Starts a query for a page of reviews that loads each review's user and game in the same statement, in the given
+        order ('rating' for the highest rated first, 'newest' for the most recently added first)
+        """
+        query = session.query(Review).options(
+            joinedload(Review._Review__user),
+            joinedload(Review._Review__game).defer(Game._Game__description)
+        )
+        if sort_by == 'rating':
+            return query.order_by(desc(Review._Review__rating), desc(Review.id))
+        return query.order_by(desc(Review.id))
+
+    @staticmethod
+    def __detach(session, reviews: List[Review], related) -> List[Review]:
+        """
+        Removes a page of reviews and the related objects returned by related(review) from the session, so leaving the
+        session context doesn't expire them and reload each one when the page is rendered. The game or user the page
+        was asked for is left alone, since the caller is still using it.
+        """
+        for review in reviews:
+            for instance in (review, related(review)):
+                if instance is not None and instance in session:
+                    session.expunge(instance)
+        return reviews
+
+    def get_page_of_reviews_for_game(self, game: Game, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        with self.__session_context_manager as scm:
+            reviews = (
+                self.__page_query(scm.session, sort_by)
+                .filter(Review.game_id == game.game_id)
+                .offset((page - 1) * count)
+                .limit(count + lookahead)
+                .all()
+            )
+            return self.__detach(scm.session, reviews, lambda review: review.user)
+
+    def get_page_of_reviews_by_user(self, user: User, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        with self.__session_context_manager as scm:
+            user_id = scm.session.query(User.id).filter(User._User__username == user.username).scalar_subquery()
+            reviews = (
+                self.__page_query(scm.session, sort_by)
+                .filter(Review.user_id == user_id)
+                .offset((page - 1) * count)
+                .limit(count + lookahead)
+                .all()
+            )
+            return self.__detach(scm.session, reviews, lambda review: review.game)
+
+    def get_number_of_reviews_by_user(self, user: User) -> int:
+        with self.__session_context_manager as scm:
+            return (
+                scm.session.query(func.count(Review.id))
+                .join(User)
+                .filter(User._User__username == user.username)
+                .scalar()
+            )
+
     def get_review(self, game: Game, user: User, comment: str):
         with self.__session_context_manager as scm:
             try:
@@ -68,44 +130,52 @@ class DatabaseReviewRepository(ReviewRepository):
 
         with self.__session_context_manager as scm:
             scm.session.merge(review)
+            self.__add_to_rating_summary(scm, review.game.game_id, review.rating)
+            touch_data_versions(scm.session, [game_reviews(review.game.game_id)])
             scm.commit()
 
+    def __add_to_rating_summary(self, scm, game_id: int, rating: int):
+        """
+        Counts a new review in its game's rating summary, in the same transaction as the review itself
+        """
+        rating_column = 'rating_{}_count'.format(rating)
+        columns = rating_summaries_table.c
+        statement = insert(rating_summaries_table).values(
+            game_id=game_id, review_count=1, rating_total=rating,
+            **{'rating_{}_count'.format(r): int(r == rating) for r in RATINGS}
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[columns.game_id],
+            set_={
+                'review_count': columns.review_count + 1,
+                'rating_total': columns.rating_total + rating,
+                rating_column: columns[rating_column] + 1,
+            }
+        )
+        scm.session.execute(statement)
+
+    def get_reviews_version(self, game_id: int) -> DataVersion:
+        with self.__session_context_manager as scm:
+            return read_data_version(scm.session, game_reviews(game_id))
+
+    def get_rating_summary(self, game: Game) -> RatingSummary:
+        with self.__session_context_manager as scm:
+            row = scm.session.execute(
+                rating_summaries_table.select().where(rating_summaries_table.c.game_id == game.game_id)
+            ).first()
+            if row is None:
+                return RatingSummary()
+            return RatingSummary(
+                row.review_count, row.rating_total,
+                [row._mapping['rating_{}_count'.format(rating)] for rating in RATINGS]
+            )
+
 
     def populate(self, testing: bool=False):
         """
-        Populates the repository with games
+        Loads the test reviews of the users and games that are already in the database
         """
-
         if not testing:
             return
 
-        repo = csv_review_repository.CSVReviewRepository()
-        repo.populate(testing)
-
-
-        old_user_repo_instance = user_repository.user_repo_instance
-        old_game_repo_instance = game_repository.game_repo_instance
-
-        user_repo = csv_user_repository.CSVUserRepository()
-        game_repo = csv_game_repository.CSVGameRepository()
-        user_repo.populate(testing)
-        game_repo.populate(testing)
-
-        user_repository.user_repo_instance = user_repo
-        game_repository.game_repo_instance = game_repo
-
-
-        for user in user_repo.get_users(1, user_repo.get_number_of_users(), False):
-            for review in repo.get_reviews_by_user(user):
-                try:
-                    with self.__session_context_manager as scm:
-                        game = scm.session.query(Game).filter(Game._Game__game_id == review.game.game_id).one()
-                        user = scm.session.query(User).filter(User._User__username == review.user.username).one()
-                    review._Review__game = game
-                    review._Review__user = user
-                    self.add_review(review)
-                except:
-                    pass
-
-        user_repository.user_repo_instance = old_user_repo_instance
-        game_repository.game_repo_instance = old_game_repo_instance
\ No newline at end of file
+        DatabaseLoader(self.__session_context_manager).load_reviews(testing)
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from games.domainmodel.model import User, Game, Review
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from games.repository.data_version import DataVersion
+
+RATINGS = range(0, 6)  # Every rating a review can give
 
 @dataclass(frozen=True)
 class ReviewDTO:
@@ -18,6 +21,24 @@ class ReviewDTO:
     def __hash__(self):
         return hash((self.username, self.game_id, self.comment))
 
+@dataclass
+class RatingSummary:
+    """
+    The number of reviews of a game, the sum of their ratings and how many reviews gave each rating
+    """
+    count: int = 0
+    total: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * len(RATINGS))  # histogram[rating] -> number of reviews
+
+    def add(self, rating: int):
+        self.count += 1
+        self.total += rating
+        self.histogram[rating] += 1
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.total / self.count if self.count > 0 else None
+
 class ReviewRepository(ABC):
 
     @abstractmethod
@@ -34,6 +55,49 @@ class ReviewRepository(ABC):
         :return: reviews for the specific game
         """
 
+    @abstractmethod
+    def get_page_of_reviews_for_game(self, game: Game, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        """
+        :param game: the game object
+        :param sort_by: 'rating' for the highest rated first or 'newest' for the most recently added first
+        :param page: the page number to return (offset)
+        :param count: the number of reviews per page
+        :param lookahead: the number of extra reviews to return after the page (used to check if there is a next page)
+        :return: one page of the reviews for the specific game, in the given order
+        """
+
+    @abstractmethod
+    def get_page_of_reviews_by_user(self, user: User, sort_by: str, page: int, count: int, lookahead: int = 0) -> List[Review]:
+        """
+        :param user: the user object
+        :param sort_by: 'rating' for the highest rated first or 'newest' for the most recently added first
+        :param page: the page number to return (offset)
+        :param count: the number of reviews per page
+        :param lookahead: the number of extra reviews to return after the page (used to check if there is a next page)
+        :return: one page of the reviews written by the specific user, in the given order
+        """
+
+    @abstractmethod
+    def get_number_of_reviews_by_user(self, user: User) -> int:
+        """
+        :param user: the user object
+        :return: the number of reviews written by the specific user
+        """
+
+    @abstractmethod
+    def get_rating_summary(self, game: Game) -> RatingSummary:
+        """
+        :param game: the game object
+        :return: the rating summary of the game, kept up to date as reviews are added rather than computed from them
+        """
+
+    @abstractmethod
+    def get_reviews_version(self, game_id: int) -> DataVersion:
+        """
+        :param game_id: the id of the game
+        :return: a version of the game's reviews that changes whenever a review of the game is added, and when it was made
+        """
+
     @abstractmethod
     def add_review(self, review: Review):
         """
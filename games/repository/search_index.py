@@ -0,0 +1,87 @@
+import re
+from collections import Counter, defaultdict
+from math import ceil
+from typing import Dict, List, Set
+
+from rapidfuzz import fuzz, process
+
+# Fraction of the search term's trigrams a title has to share before it is scored at all
+MIN_TRIGRAM_OVERLAP = 0.3
+
+_NON_LETTERS_OR_NUMBERS = re.compile(r"(?ui)\W")
+_LATIN_1_CHARACTERS = {i: None for i in range(128, 256)}
+
+
+def normalise(text: str) -> str:
+    """
+    Normalises text the same way thefuzz's token_sort_ratio did before comparing: drops characters 128-255,
+    turns everything that isn't a letter or number into whitespace, lowercases and sorts the tokens
+    :param text: The text to normalise
+    :return: The sorted tokens joined by single spaces
+    """
+    text = _NON_LETTERS_OR_NUMBERS.sub(" ", text.translate(_LATIN_1_CHARACTERS)).lower()
+    return " ".join(sorted(text.split()))
+
+
+def trigrams(normalised_text: str) -> Set[str]:
+    """
+    Returns the trigrams of each token, padded so that short tokens and token boundaries still produce grams
+    """
+    grams = set()
+    for token in normalised_text.split():
+        padded = f"${token}$"
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SearchIndex:
+    """
+    Fuzzy title search that normalises each title once when it is added, uses a trigram index to find the titles
+    that could plausibly match, and scores only those candidates in one batch
+    """
+
+    def __init__(self):
+        self.__titles: Dict[int, str] = {}  # game_id -> normalised title
+        self.__ids_by_trigram: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, game_id: int, title: str):
+        """
+        Adds a title to the index
+        :param game_id: The id of the game the title belongs to
+        :param title: The title as shown to users
+        """
+        normalised_title = normalise(title or "")
+        self.__titles[game_id] = normalised_title
+        for gram in trigrams(normalised_title):
+            self.__ids_by_trigram[gram].add(game_id)
+
+    def __candidates(self, query_grams: Set[str]) -> Dict[int, str]:
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.__ids_by_trigram.get(gram, ()))
+
+        min_shared = max(1, ceil(len(query_grams) * MIN_TRIGRAM_OVERLAP))
+        return {game_id: self.__titles[game_id] for game_id, n in shared.items() if n >= min_shared}
+
+    def search(self, search_term: str) -> List[int]:
+        """
+        Ranks the titles that match the search term by their token sort ratio (highest first). Ties are broken by
+        game id (highest first), which is the same order the repository used when it scored every title
+        :param search_term: The term to search for
+        :return: The ids of every matching game, best match first
+        """
+        query = normalise(search_term)
+        if query == "":
+            return []
+
+        candidates = self.__candidates(trigrams(query))
+
+        # The query and titles are already token sorted, so a plain ratio is the token sort ratio
+        scored = process.extract(query, candidates, scorer=fuzz.ratio, processor=None, limit=None)
+
+        scored.sort(key=lambda result: (-int(round(result[1])), -result[2]))
+        return [game_id for _, _, game_id in scored]
+
+    def __len__(self):
+        return len(self.__titles)
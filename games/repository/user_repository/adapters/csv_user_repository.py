@@ -1,11 +1,30 @@
 import csv
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from games.repository.user_repository.user_repository import UserRepository, UserDTO, user_dto_to_user
 from games.domainmodel.model import User
 from games.exceptions.repository_layer_exceptions import ResourceAlreadyExistsException, ResourceNotFoundException
 
 
+def read_users(testing: bool) -> Iterator[UserDTO]:
+    """
+    Reads the users CSV file
+    :param testing: Whether to read the test dataset
+    """
+    if testing:
+        path = Path(__file__).parent.parent / "data" / "test_users.csv"
+    else:
+        path = Path(__file__).parent.parent / "data" / "users.csv"
+
+    with open(path, mode='r', encoding='utf-8=-sig') as csv_file:
+        data = csv.DictReader(csv_file)
+        for row in data:
+            # password must be bytes
+            password = row['password'].encode('utf-8')
+
+            yield UserDTO(row['username'], password)
+
+
 class CSVUserRepository(UserRepository):
     def __init__(self):
         self.__dataset_of_users = set()
@@ -16,14 +35,14 @@ class CSVUserRepository(UserRepository):
                 return user_dto_to_user(user)
         raise ResourceNotFoundException(f"User with username {username} does not exist")
 
-    def get_users(self, page: int, count: int, reverse: bool) -> List[User]:
+    def get_users(self, page: int, count: int, reverse: bool, lookahead: int = 0) -> List[User]:
         if page < 1:
             raise ValueError("Page number must be greater than 0")
         if count < 1:
             raise ValueError("Count must be greater than 0")
 
         start = (page - 1) * count
-        end = start + count
+        end = start + count + lookahead
 
         sorted_users = sorted(list(self.__dataset_of_users), key=lambda x: x.username, reverse=reverse)[start:end]
         return [user_dto_to_user(user) for user in sorted_users]
@@ -51,19 +70,7 @@ class CSVUserRepository(UserRepository):
         self.__dataset_of_users.remove(user_dto)
 
     def __read_csv_file(self, testing):
-        if testing:
-            path = Path(__file__).parent.parent / "data" / "test_users.csv"
-        else:
-            path = Path(__file__).parent.parent / "data" / "users.csv"
-
-        with open(path, mode='r', encoding='utf-8=-sig') as csv_file:
-            data = csv.DictReader(csv_file)
-            for row in data:
-                # password must be bytes
-                password = row['password'].encode('utf-8')
-
-                user = UserDTO(row['username'], password)
-                self.__dataset_of_users.add(user)
+        self.__dataset_of_users.update(read_users(testing))
 
     def populate(self, testing=False):
         self.__read_csv_file(testing=testing)
@@ -6,7 +6,7 @@ from sqlalchemy.orm import scoped_session
 
 from games.repository.user_repository.user_repository import UserRepository
 from games.domainmodel.model import User
-from games.repository.user_repository.adapters import csv_user_repository
+from games.repository.database_loader import DatabaseLoader
 
 from games.exceptions import repository_layer_exceptions
 
@@ -29,9 +29,9 @@ class DatabaseUserRepository(UserRepository):
             raise repository_layer_exceptions.ResourceNotFoundException(f"User with username {user_name} does not exist.")
         return user
 
-    def get_users(self, page: int, count: int, reverse: bool) -> List[User]:
+    def get_users(self, page: int, count: int, reverse: bool, lookahead: int = 0) -> List[User]:
         with self.__session_context_manager as scm:
-            users = scm.session.query(User).order_by(User._User__username).offset((page-1) * count).limit(count).all()
+            users = scm.session.query(User).order_by(User._User__username).offset((page-1) * count).limit(count + lookahead).all()
         return users
 
     def get_number_of_users(self) -> int:
@@ -58,12 +58,4 @@ class DatabaseUserRepository(UserRepository):
         if not testing:
             return
 
-        repo = csv_user_repository.CSVUserRepository()
-        repo.populate(testing)
-
-        if repo.get_number_of_users() > 0:
-            for user in repo.get_users(1, repo.get_number_of_users(), False):
-                try:
-                    self.add_user(user)
-                except:
-                    pass
\ No newline at end of file
+        DatabaseLoader(self.__session_context_manager).load_users(testing)
@@ -22,7 +22,7 @@ class UserRepository(ABC):
         return User("Example user, big fake", 'password123')
 
     @abstractmethod
-    def get_users(self, page: int, count: int, reverse: bool) -> List[User]:
+    def get_users(self, page: int, count: int, reverse: bool, lookahead: int = 0) -> List[User]:
         return []
 
     @abstractmethod
@@ -1,28 +1,69 @@
 import csv
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from games.repository.wishlist_repository.wishlist_repository import WishDTO, WishlistRepository
 
 from games.domainmodel.model import User, Game, Wish
 
 from games.exceptions.repository_layer_exceptions import ResourceAlreadyExistsException, ResourceNotFoundException
+from games.repository.ordered_index import OrderedIndex
 from datetime import datetime
 
 from games.service.wishlist_service import wish_dto_to_wish
 from games.repository import user_repository, game_repository
 
+
+def read_wishes(testing: bool) -> Iterator[WishDTO]:
+    """
+    Reads the wishlist CSV file, wishes without a time are taken as made now
+    :param testing: Whether to read the test dataset
+    """
+    if testing:
+        path = Path(__file__).parent.parent / "data" / "test_wishlist.csv"
+    else:
+        path = Path(__file__).parent.parent / "data" / "wishlist.csv"
+
+    with open(path, mode='r', encoding='utf-8-sig') as csv_file:
+        data = csv.DictReader(csv_file)
+        for row in data:
+            wish_time = row.get('wish_time')
+            yield WishDTO(
+                row['username'],
+                int(row['game_id']),
+                datetime.fromisoformat(wish_time) if wish_time else datetime.now()
+            )
+
+
 class CSVWishlistRepository(WishlistRepository):
 
     def __init__(self):
-        self.__dataset_of_wishlists = set()
+        self.__dataset_of_wishlists = {}  # (username, game_id) -> WishDTO
+        self.__game_ids_by_user = {}  # username -> OrderedIndex of game ids by wish time
+        self.__usernames_by_game = {}  # game_id -> OrderedIndex of usernames by wish time
 
     def get_wishlist_by_user(self, user: User) -> List[Wish]:
-        sorted_wishes = sorted([wish for wish in self.__dataset_of_wishlists if wish.username == user.username], key=lambda x:x.wish_time)
-        return [wish_dto_to_wish(wish, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user) for wish in sorted_wishes]
+        game_ids = self.__game_ids_by_user.get(user.username, OrderedIndex())
+        wishes = [self.__dataset_of_wishlists[(user.username, game_id)] for game_id in game_ids]
+        return [wish_dto_to_wish(wish, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user) for wish in wishes]
 
     def get_wishlist_by_game(self, game: Game) -> List[Wish]:
-        sorted_wishes = sorted([wish for wish in self.__dataset_of_wishlists if wish.game_id == game.game_id], key=lambda x:x.wish_time)
-        return [wish_dto_to_wish(wish, user_repository.user_repo_instance, game_repository.game_repo_instance, game=game) for wish in sorted_wishes]
+        usernames = self.__usernames_by_game.get(game.game_id, OrderedIndex())
+        wishes = [self.__dataset_of_wishlists[(username, game.game_id)] for username in usernames]
+        return [wish_dto_to_wish(wish, user_repository.user_repo_instance, game_repository.game_repo_instance, game=game) for wish in wishes]
+
+    def get_wish(self, game: Game, user: User) -> Wish:
+        wish_dto = self.__dataset_of_wishlists.get((user.username, game.game_id))
+        if wish_dto is None:
+            raise ResourceNotFoundException(f'Wishlist with user <{user.username}> and game_id <{game.game_id}> does not exist.')
+        return wish_dto_to_wish(wish_dto, user_repository.user_repo_instance, game_repository.game_repo_instance, user=user, game=game)
+
+    def has_wish(self, user: User, game: Game) -> bool:
+        return (user.username, game.game_id) in self.__dataset_of_wishlists
+
+    def __store(self, wish_dto: WishDTO):
+        self.__dataset_of_wishlists[(wish_dto.username, wish_dto.game_id)] = wish_dto
+        self.__game_ids_by_user.setdefault(wish_dto.username, OrderedIndex()).insert(wish_dto.wish_time, wish_dto.game_id)
+        self.__usernames_by_game.setdefault(wish_dto.game_id, OrderedIndex()).insert(wish_dto.wish_time, wish_dto.username)
 
     def add_wish(self, wish: Wish):
         wish_dto = WishDTO(
@@ -31,40 +72,25 @@ class CSVWishlistRepository(WishlistRepository):
             wish.wish_time
         )
 
-        if wish_dto in self.__dataset_of_wishlists:
+        if (wish_dto.username, wish_dto.game_id) in self.__dataset_of_wishlists:
             raise ResourceAlreadyExistsException(
                 f'Wish with user <{wish_dto.username}> and game_id <{wish_dto.game_id}> already exists')
 
-        self.__dataset_of_wishlists.add(wish_dto)
+        self.__store(wish_dto)
 
     def remove_wish(self, wish: Wish):
-        wish_dto = WishDTO(
-            wish.user.username,
-            wish.game.game_id,
-            wish.wish_time
-        )
+        wish_dto = self.__dataset_of_wishlists.pop((wish.user.username, wish.game.game_id), None)
 
-        if wish_dto not in self.__dataset_of_wishlists:
-            raise ResourceNotFoundException(f'Wishlist with user <{wish_dto.username}> and game_id <{wish_dto.game_id}> does not exist.')
+        if wish_dto is None:
+            raise ResourceNotFoundException(f'Wishlist with user <{wish.user.username}> and game_id <{wish.game.game_id}> does not exist.')
 
-        self.__dataset_of_wishlists.remove(wish_dto)
+        self.__game_ids_by_user[wish_dto.username].remove(wish_dto.wish_time, wish_dto.game_id)
+        self.__usernames_by_game[wish_dto.game_id].remove(wish_dto.wish_time, wish_dto.username)
 
     def __read_csv_file(self, testing):
-        if testing:
-            path = Path(__file__).parent.parent / "data" / "test_wishlist.csv"
-        else:
-            path = Path(__file__).parent.parent / "data" / "wishlist.csv"
-
-        with open(path, mode='r', encoding='utf-8-sig') as csv_file:
-            data = csv.DictReader(csv_file)
-            for row in data:
-                wishlist = WishDTO(
-                    row['username'],
-                    int(row['game_id']),
-                    (row.get('wish_time') or datetime.now())
-                )
-
-                self.__dataset_of_wishlists.add(wishlist)
+        for wishlist in read_wishes(testing):
+            if (wishlist.username, wishlist.game_id) not in self.__dataset_of_wishlists:
+                self.__store(wishlist)
 
     def populate(self, testing=False):
         self.__read_csv_file(testing)
\ No newline at end of file
@@ -2,15 +2,11 @@ from typing import List
 
 from games.repository.wishlist_repository.wishlist_repository import WishlistRepository
 from games.domainmodel.model import User, Game, Wish
-from games.repository.wishlist_repository.adapters import csv_wishlist_repository
+from games.repository.database_loader import DatabaseLoader
 
 from games.exceptions import repository_layer_exceptions
 from sqlalchemy.orm.exc import NoResultFound
 
-from games.repository import game_repository, user_repository
-from games.repository.user_repository.adapters import csv_user_repository
-from games.repository.game_repository.adapters import csv_game_repository
-
 class DatabaseWishlistRepository(WishlistRepository):
     def __init__(self, session_context_manager):
         self.__session_context_manager = session_context_manager
@@ -32,6 +28,7 @@ class DatabaseWishlistRepository(WishlistRepository):
                 scm.session.query(Wish)
                 .join(User)
                 .filter(User._User__username == user.username)
+                .order_by(Wish._Wish__wish_time, Wish.id)
                 .all()
             )
             return user_wishlist
@@ -47,6 +44,7 @@ class DatabaseWishlistRepository(WishlistRepository):
                 scm.session.query(Wish)
                 .join(User)
                 .filter(Wish._Wish__game == game)
+                .order_by(Wish._Wish__wish_time, Wish.id)
                 .all()
             )
             return game_wishlist
@@ -67,6 +65,16 @@ class DatabaseWishlistRepository(WishlistRepository):
                     f"Wish for user {user.username} and game {game.title} does not exist"
                 )
 
+    def has_wish(self, user: User, game: Game) -> bool:
+        with self.__session_context_manager as scm:
+            user_id = scm.session.query(User.id).filter(User._User__username == user.username).scalar_subquery()
+            wish = (
+                scm.session.query(Wish)
+                .filter(Wish.user_id == user_id)
+                .filter(Wish.game_id == game.game_id)
+            )
+            return scm.session.query(wish.exists()).scalar()
+
     def add_wish(self, wish: Wish):
         """
         Adds a game to a user's wishlist.
@@ -101,39 +109,9 @@ class DatabaseWishlistRepository(WishlistRepository):
 
     def populate(self, testing: bool=False):
         """
-        Populates the repository with games
+        Loads the test wishlists of the users and games that are already in the database
         """
         if not testing:
             return
 
-        repo = csv_wishlist_repository.CSVWishlistRepository()
-        repo.populate(testing)
-
-        old_user_repo_instance = user_repository.user_repo_instance
-        old_game_repo_instance = game_repository.game_repo_instance
-
-        user_repo = csv_user_repository.CSVUserRepository()
-        game_repo = csv_game_repository.CSVGameRepository()
-
-        user_repo.populate(testing)
-        game_repo.populate(testing)
-
-        user_repository.user_repo_instance = user_repo
-        game_repository.game_repo_instance = game_repo
-
-        for user in user_repo.get_users(1, user_repo.get_number_of_users(), False):
-            for wish in repo.get_wishlist_by_user(user):
-                try:
-                    with self.__session_context_manager as scm:
-
-                        game = scm.session.query(Game).filter(Game._Game__game_id == wish.game.game_id).one()
-                        user = scm.session.query(User).filter(User._User__username == wish.user.username).one()
-                    wish._Wish__game = game
-
-                    wish._Wish__user = user
-                    self.add_wish(wish)
-                except repository_layer_exceptions.ResourceAlreadyExistsException:
-                    pass
-
-        user_repository.user_repo_instance = old_user_repo_instance
-        game_repository.game_repo_instance = old_game_repo_instance
\ No newline at end of file
+        DatabaseLoader(self.__session_context_manager).load_wishlist(testing)
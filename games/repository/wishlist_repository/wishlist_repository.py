@@ -39,6 +39,27 @@ class WishlistRepository(ABC):
         """
         return []
     @abstractmethod
+    def get_wish(self, game: Game, user: User) -> Wish:
+        """
+        Retrieves the wish a user made for a game.
+        :param game: the game object
+        :param user: the user object
+        :return: the wish
+        :raises ResourceNotFoundException: if the user hasn't wishlisted the game
+        """
+        pass
+
+    @abstractmethod
+    def has_wish(self, user: User, game: Game) -> bool:
+        """
+        Checks whether a game is in a user's wishlist, without loading the rest of the wishlist.
+        :param user: the user object
+        :param game: the game object
+        :return: True if the user has wishlisted the game
+        """
+        pass
+
+    @abstractmethod
     def add_wish(self, wish: Wish):
         """
         Adds a game to a user's wishlist.
@@ -9,7 +9,7 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, SelectField, IntegerField, SubmitField, HiddenField
 from wtforms.validators import DataRequired
 
-from games.utils import validation
+from games.utils import validation, response_cache
 
 from games.exceptions import view_layer_exceptions, service_layer_exceptions
 
@@ -45,6 +45,9 @@ def add_review(authenticated_user: User):
         except service_layer_exceptions.ResourceAlreadyExistsException:
             raise view_layer_exceptions.BadRequestException(f"Sorry, it looks like you already have a review for this game with the exact same comment, please leave a review with a new comment!")
 
+        # The review gave the game's reviews a new version, so the game page cached under the old one can't be served
+        # again. Drop it now rather than waiting for it to be evicted.
+        response_cache.invalidate(response_cache.game_tag(game_id))
 
         return redirect(url_for('games.game', game_id=game_id))
     else:
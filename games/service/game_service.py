@@ -19,15 +19,19 @@ def add_game(game: Game, game_repository: GameRepository):
     except repository_layer_exceptions.ResourceAlreadyExistsException:
         raise service_layer_exceptions.ResourceAlreadyExistsException(f"Game with ID {game.game_id} already exists")
 
-@paginated()
-def get_games(repository: GameRepository, page_number, count, reverse):
-    return repository.get_games(page_number, count, reverse)
-
 def get_number_of_games(repository: GameRepository):
     return repository.get_number_of_games()
+
+@paginated(total=get_number_of_games, cursor_key=lambda game: game.game_id)
+def get_games(repository: GameRepository, page_number, count, reverse, lookahead=0, cursor=None):
+    return repository.get_games(page_number, count, reverse, lookahead, cursor)
+
 def get_genres(repository: GameRepository):
     return repository.get_genres()
 
+def get_catalogue_version(repository: GameRepository):
+    return repository.get_catalogue_version()
+
 def get_genre(genre_name: str, repository: GameRepository):
     try:
         return repository.get_genre(genre_name)
@@ -51,24 +55,33 @@ def get_publisher(publisher_name: str, repository: GameRepository):
     except repository_layer_exceptions.ResourceNotFoundException:
         raise service_layer_exceptions.ResourceNotFoundException(f"Publisher with name {publisher_name} not found")
 
-@paginated()
-def get_games_by_publisher(publisher, repository: GameRepository, page_number, count, reverse):
-    return repository.get_games_by_publisher(publisher, page_number, count)
+def get_number_of_games_by_publisher(publisher, repository: GameRepository):
+    return repository.get_number_of_games_by_publisher(publisher)
+
+def get_number_of_search_results(search_term: str, repository: GameRepository):
+    return repository.get_number_of_search_results(search_term)
+
+def get_number_of_games_with_genre(genre: Genre, repository: GameRepository):
+    return repository.get_number_of_games_with_genre(genre)
+
+@paginated(total=get_number_of_games_by_publisher)
+def get_games_by_publisher(publisher, repository: GameRepository, page_number, count, reverse, lookahead=0):
+    return repository.get_games_by_publisher(publisher, page_number, count, lookahead)
 
-@paginated()
-def search_games(search_term: str, repository: GameRepository, page_number, count, reverse):
-    return repository.search_games(search_term, page_number, count)
+@paginated(total=get_number_of_search_results)
+def search_games(search_term: str, repository: GameRepository, page_number, count, reverse, lookahead=0):
+    return repository.search_games(search_term, page_number, count, lookahead)
 
-@paginated()
-def get_games_with_genre(genre: Genre, repository: GameRepository, page_number, count, reverse):
-    return repository.get_games_with_genre(genre, page_number, count)
+@paginated(total=get_number_of_games_with_genre)
+def get_games_with_genre(genre: Genre, repository: GameRepository, page_number, count, reverse, lookahead=0):
+    return repository.get_games_with_genre(genre, page_number, count, lookahead)
 
 
-@paginated(default_reverse=True)
-def get_games_sorted_by_date(repository: GameRepository, page_number, count, reverse):
-    return repository.get_games_sorted_by_date(page_number, count, reverse)
+@paginated(default_reverse=True, total=get_number_of_games, cursor_key=lambda game: game.get_datetime())
+def get_games_sorted_by_date(repository: GameRepository, page_number, count, reverse, lookahead=0, cursor=None):
+    return repository.get_games_sorted_by_date(page_number, count, reverse, lookahead, cursor)
 
-@paginated()
-def get_games_sorted_alphabetically(repository: GameRepository, page_number, count, reverse):
-    return repository.get_games_sorted_alphabetically(page_number, count, reverse)
+@paginated(total=get_number_of_games, cursor_key=lambda game: game.title)
+def get_games_sorted_alphabetically(repository: GameRepository, page_number, count, reverse, lookahead=0, cursor=None):
+    return repository.get_games_sorted_alphabetically(page_number, count, reverse, lookahead, cursor)
 
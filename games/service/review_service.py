@@ -1,10 +1,12 @@
 from games.domainmodel.model import Review, User, Game
 from typing import List
 from games.service import game_service, user_service
-from games.repository.review_repository.review_repository import ReviewDTO, ReviewRepository
+from games.repository.review_repository.review_repository import ReviewDTO, ReviewRepository, RatingSummary
+from games.repository.data_version import DataVersion
 from games.exceptions import service_layer_exceptions, repository_layer_exceptions
 
 from games.repository import game_repository as gr, user_repository as ur
+from games.pagination.page import paginated
 
 
 def get_reviews_by_user(user: User, review_repository: ReviewRepository) -> List[Review]:
@@ -23,6 +25,38 @@ def get_reviews_for_game(game: Game, review_repository: ReviewRepository) -> Lis
     reviews = review_repository.get_reviews_for_game(game)
     return reviews
 
+def get_number_of_reviews_for_game(game: Game, sort_by: str, repository: ReviewRepository) -> int:
+    return repository.get_rating_summary(game).count
+
+def get_number_of_reviews_by_user(user: User, sort_by: str, repository: ReviewRepository) -> int:
+    return repository.get_number_of_reviews_by_user(user)
+
+@paginated(total=get_number_of_reviews_for_game)
+def get_page_of_reviews_for_game(game: Game, sort_by: str, repository: ReviewRepository, page_number, count, reverse, lookahead=0):
+    '''
+    Returns a page of the reviews written for the given game, sorted by 'rating' (highest first) or 'newest'
+    '''
+    return repository.get_page_of_reviews_for_game(game, sort_by, page_number, count, lookahead)
+
+@paginated(total=get_number_of_reviews_by_user)
+def get_page_of_reviews_by_user(user: User, sort_by: str, repository: ReviewRepository, page_number, count, reverse, lookahead=0):
+    '''
+    Returns a page of the reviews written by the given user, sorted by 'rating' (highest first) or 'newest'
+    '''
+    return repository.get_page_of_reviews_by_user(user, sort_by, page_number, count, lookahead)
+
+def get_rating_summary(game: Game, review_repository: ReviewRepository) -> RatingSummary:
+    '''
+    Returns the number of reviews of the given game, the sum of their ratings and how many reviews gave each rating
+    '''
+    return review_repository.get_rating_summary(game)
+
+def get_reviews_version(game_id: int, review_repository: ReviewRepository) -> DataVersion:
+    '''
+    Returns the version of the reviews of the given game, which changes whenever one is added
+    '''
+    return review_repository.get_reviews_version(game_id)
+
 def add_review(review: Review, review_repository: ReviewRepository):
     '''
     Adds a review to the given review_repository
@@ -49,4 +83,22 @@ def review_dto_to_review(review_dto: ReviewDTO, user_repository: ur.UserReposito
         comment=review_dto.comment,
     )
 
-    return review
\ No newline at end of file
+    return review
+
+
+def review_dtos_to_reviews(review_dtos: List[ReviewDTO], user_repository: ur.UserRepository, game_repository: gr.GameRepository, user=None, game=None) -> List[Review]:
+    '''
+    Converts ReviewDTOs to Reviews, looking up each distinct user and game only once however many reviews share it
+    '''
+    users = {user.username: user} if user else {}
+    games = {game.game_id: game} if game else {}
+
+    reviews = []
+    for review_dto in review_dtos:
+        if review_dto.username not in users:
+            users[review_dto.username] = user_service.get_user_by_username(review_dto.username, user_repository)
+        if review_dto.game_id not in games:
+            games[review_dto.game_id] = game_service.get_game(review_dto.game_id, game_repository)
+        reviews.append(review_dto_to_review(review_dto, user_repository, game_repository, user=users[review_dto.username], game=games[review_dto.game_id]))
+
+    return reviews
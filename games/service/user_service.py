@@ -7,9 +7,13 @@ from games.pagination.page import paginated
 import bcrypt
 
 
-@paginated()
-def get_users(repository: UserRepository, page_number, count, reverse):
-    users = repository.get_users(page_number, count, reverse)
+def get_number_of_users(repository: UserRepository) -> int:
+    return repository.get_number_of_users()
+
+
+@paginated(total=get_number_of_users)
+def get_users(repository: UserRepository, page_number, count, reverse, lookahead=0):
+    users = repository.get_users(page_number, count, reverse, lookahead)
     return users
 
 
@@ -82,8 +86,6 @@ def get_user_by_username(username: str, repository: UserRepository) -> User:
     return user
 
 
-def get_number_of_users(repository: UserRepository) -> int:
-    return repository.get_number_of_users()
 
 
 def get_logged_in_user_from_session(session, repo: UserRepository):
@@ -28,14 +28,14 @@ def get_wishes_by_game(game: Game, repo: WishlistRepository) -> List[Wish]:
 
     return wishes
 
-def check_if_user_has_wishlisted_game(user: User, game: Game, repo: WishlistRepository) -> bool:
-    user_wishes = get_wishes_by_user(user, repo)
-
-    for wish in user_wishes:
-        if wish.game == game:
-            return True
+def get_wish(user: User, game: Game, repo: WishlistRepository) -> Wish:
+    try:
+        return repo.get_wish(game, user)
+    except repository_layer_exceptions.ResourceNotFoundException:
+        raise service_layer_exceptions.ResourceNotFoundException(f"{user.username} hasn't wishlisted game {game.game_id}")
 
-    return False
+def check_if_user_has_wishlisted_game(user: User, game: Game, repo: WishlistRepository) -> bool:
+    return repo.has_wish(user, game)
 
 
 def wish_dto_to_wish(wish_dto: WishDTO, user_repository: ur.UserRepository, game_repository:gr.GameRepository, user=None, game=None):
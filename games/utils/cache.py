@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    A bounded least-recently-used cache with an optional time to live and hit/miss counters. Safe to share between threads.
+    """
+
+    def __init__(self, max_size: int, ttl: float = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param max_size: The maximum number of entries, the least recently used entry is evicted after that
+        :param ttl: The number of seconds an entry stays valid for (None means entries don't expire)
+        :param clock: Function returning the current time in seconds (mainly so tests can control time)
+        """
+        if max_size < 1:
+            raise ValueError("Cache size must be a positive integer")
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__entries = OrderedDict()  # key -> (time stored, value), least recently used first
+        self.__lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for the key, or default if it isn't cached or has expired
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and (self.__ttl is None or self.__clock() - entry[0] < self.__ttl):
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self.__entries[key]  # expired
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Stores the value, evicting the least recently used entry if the cache is full
+        """
+        with self.__lock:
+            self.__entries[key] = (self.__clock(), value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for the key, computing and storing it first if it isn't cached
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
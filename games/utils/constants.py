@@ -4,3 +4,11 @@ MAX_COUNT = 200
 DEFAULT_SORT_BY = 'default'
 SORT_BY_OPTIONS = ['default', 'title', 'release_date']
 DEFAULT_ASCENDING = None # None means rely on the test_repository default
+SEARCH_CACHE_SIZE = 256 # Number of search terms whose ranked results are kept
+SEARCH_CACHE_TTL = 600 # Seconds before a cached search ranking is recomputed
+COUNT_CACHE_SIZE = 256 # Number of listing and search result counts kept
+SIDEBAR_CACHE_SIZE = 8 # Number of rendered sidebars kept (one per repository and catalogue version)
+DEFAULT_REVIEW_COUNT = 10 # Reviews per page on game and profile pages
+REVIEW_SORT_BY_OPTIONS = ['rating', 'newest']
+DEFAULT_GAME_REVIEW_SORT_BY = 'rating'
+DEFAULT_PROFILE_REVIEW_SORT_BY = 'newest'
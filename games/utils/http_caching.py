@@ -0,0 +1,113 @@
+import hashlib
+import os
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterable, Tuple
+
+from flask import current_app, request, session
+
+from games.repository.data_version import DataVersion
+from games.utils.page_versions import page_versions
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60  # Seconds, static URLs change whenever the file does so they can be kept for good
+
+clock: Callable[[], float] = time.time  # Returns the current time in seconds (mainly so tests can control time)
+
+
+def etag(versions: Iterable[DataVersion]) -> str:
+    """
+    Builds a strong ETag from the versions of the data a page is built from. The times the versions were made are
+    part of it, so a rebuilt database or a restarted CSV process never repeats an ETag that meant other data.
+    """
+    text = ",".join("{}@{!r}".format(version, modified) for version, modified in versions)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_get(versions: Callable[..., Iterable[DataVersion]] = None, validate: Callable = None):
+    """
+    Gives a view a strong ETag and a Last-Modified date built from the versions of the data it shows, and answers
+    requests that already have the current page with 304 Not Modified without rendering it. Only visitors who aren't
+    logged in are handled, since logged in users see pages that depend on their wishlist.
+    :param versions: Optional function that takes the view's arguments and returns the versions of the data the page
+        is built from, on top of the catalogue (see page_versions)
+    :param validate: Optional function that takes the view's arguments and checks them the way the view does, raising
+        the same errors. It runs before a 304 is sent, so a page that doesn't exist or arguments the view rejects never
+        get one, whatever ETag or date the request has.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            if request.method != 'GET' or session.get('username'):
+                return view(**view_args)
+
+            data_versions = page_versions(versions, view_args)
+            if data_versions is None:
+                return view(**view_args)
+
+            page_etag = etag(data_versions)
+            newest = max(modified for _, modified in data_versions)
+            last_modified = int(newest)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(page_etag)
+            else:
+                # HTTP dates are whole seconds, so a date only vouches for the page once the second of the newest change
+                # is over. Until then another change in the same second would get the same date
+                since = request.if_modified_since
+                not_modified = since is not None and since.timestamp() >= last_modified and clock() >= last_modified + 1
+
+            if not_modified:
+                if validate is not None:
+                    validate(**view_args)
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(**view_args))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(page_etag)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True  # keep the page, but check it is still current before using it
+            return response
+        return wrapper
+    return decorator
+
+
+_static_hashes: Dict[str, Tuple[float, str]] = {}  # path -> (modification time, content hash)
+
+
+def static_file_hash(filename: str) -> str:
+    """
+    Returns a short hash of a file in the static folder, reading the file again only if it has been modified
+    """
+    path = os.path.join(current_app.static_folder, filename)
+    modified = os.path.getmtime(path)
+    cached = _static_hashes.get(path)
+    if cached is None or cached[0] != modified:
+        with open(path, "rb") as file:
+            cached = (modified, hashlib.sha256(file.read()).hexdigest()[:12])
+        _static_hashes[path] = cached
+    return cached[1]
+
+
+def hashed_static_url(endpoint: str, values: dict):
+    """
+    URL defaults callback that adds the content hash of static files to their URLs (as ?v=...), so a changed file
+    gets a new URL and unchanged ones can be cached by browsers indefinitely
+    """
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        try:
+            values['v'] = static_file_hash(values['filename'])
+        except OSError:  # missing files are left for the static view to 404
+            pass
+
+
+def static_cache_headers(response):
+    """
+    After request callback that marks static files requested by their hashed URL as cacheable for good
+    """
+    if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,40 @@
+"""
+Reads the versions of the data a page is built from. They come from the repositories, so in database mode every
+worker sees the same ones and pages cached or validated by one worker are retired by a change made through another.
+"""
+from typing import Callable, Iterable, List, Optional
+
+from flask import g
+
+from games.repository import game_repository, review_repository
+from games.repository.data_version import DataVersion
+from games.service import game_service, review_service
+
+
+def game_reviews(game_id) -> DataVersion:
+    """
+    Returns the version of a game's reviews
+    :param game_id: The game id from the URL, raises ValueError if it isn't a number
+    """
+    return review_service.get_reviews_version(int(game_id), review_repository.review_repo_instance)
+
+
+def page_versions(versions: Optional[Callable[..., Iterable[DataVersion]]], view_args: dict) -> Optional[List[DataVersion]]:
+    """
+    Returns the versions of the data a page is built from: the catalogue, which every page shows in its sidebar, and
+    the ones the versions function gives for the view's arguments. They are read once per request, so the response
+    cache and conditional GETs of the same page use the same versions.
+    :param versions: Optional function that takes the view's arguments and returns the other versions the page depends
+        on. It may raise ValueError for arguments the view would reject.
+    :param view_args: The view's arguments
+    :return: The versions, or None if the versions function rejected the arguments
+    """
+    if 'page_versions' not in g:
+        try:
+            found = list(versions(**view_args)) if versions is not None else []
+        except ValueError:
+            found = None
+        else:
+            found.insert(0, game_service.get_catalogue_version(game_repository.game_repo_instance))
+        g.page_versions = found
+    return g.page_versions
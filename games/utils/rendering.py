@@ -1,9 +1,26 @@
 from flask import render_template as flask_render_template
 from flask import current_app
+from markupsafe import Markup
 
 from games.service import game_service
 from games.repository import game_repository
+from games.utils import constants
+from games.utils.cache import LRUCache
+
+# (repository, catalogue version) -> rendered sidebar, so the genre list is only read and rendered when it changes
+sidebar_cache = LRUCache(constants.SIDEBAR_CACHE_SIZE)
+
+def render_sidebar() -> Markup:
+    """Returns the sidebar HTML, rendering it again only if the catalogue has changed since it was last rendered."""
+    repository = game_repository.game_repo_instance
+    key = (repository, game_service.get_catalogue_version(repository))
+    return sidebar_cache.get_or_compute(key, lambda: Markup(flask_render_template('include/sidebar.html', genres=game_service.get_genres(repository))))
+
+def template_defaults():
+    """Values every template can use, registered as a context processor so templates rendered with Flask's own
+    render_template get them too."""
+    return {'sidebar': render_sidebar}
 
 def render_template(template_name, **kwargs):
     """Render template with some default values."""
-    return flask_render_template(template_name, genres=game_service.get_genres(game_repository.game_repo_instance), **kwargs)
\ No newline at end of file
+    return flask_render_template(template_name, **kwargs)
@@ -0,0 +1,360 @@
+import hashlib
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from flask import current_app, request, session
+
+from games.repository.data_version import DataVersion
+from games.utils.page_versions import page_versions
+
+BACKENDS = {'memory', 'disk', 'none'}
+
+
+class ResponseCacheBackend(ABC):
+    """
+    Stores rendered pages by key, evicting the least recently used ones once the entry or byte limit is reached
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the page stored under the key, or None if there isn't one
+        """
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: bytes) -> List[str]:
+        """
+        Stores a page under the key
+        :return: The keys that were evicted to make room for it
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()  # key -> page, least recently used first
+        self.__size = 0
+        self.__lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is not None:
+                self.__entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> List[str]:
+        with self.__lock:
+            if len(value) > self.__max_bytes:
+                return []
+            self.__size -= len(self.__entries.pop(key, b""))
+            self.__entries[key] = value
+            self.__size += len(value)
+
+            evicted = []
+            while len(self.__entries) > self.__max_entries or self.__size > self.__max_bytes:
+                old_key, old_value = self.__entries.popitem(last=False)
+                self.__size -= len(old_value)
+                evicted.append(old_key)
+            return evicted
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__size -= len(self.__entries.pop(key, b""))
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+class DiskResponseCacheBackend(ResponseCacheBackend):
+    """
+    Keeps pages in files under a local directory that several processes can share. The files are the whole index: a
+    file holds its key and page, its size counts towards the byte limit and its modification time is when it was
+    last used, so every process evicts in the same order. Files left by an earlier run are kept, their keys hold the
+    versions of the data they were built from, so they are only served while that data is unchanged.
+    """
+
+    SUFFIX = ".page"
+
+    def __init__(self, directory: str, max_entries: int, max_bytes: int):
+        self.__directory = directory
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__lock = Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # Running totals so put only scans the directory once the limits may have been passed. They only see this
+        # process's writes, so they are brought back in line with the directory whenever it is scanned
+        files = self.__files()
+        self.__entries = len(files)
+        self.__bytes = sum(file_size for _, file_size, _ in files)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.__directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + self.SUFFIX)
+
+    def __files(self) -> List[Tuple[int, int, str]]:
+        """
+        Returns (last used, size, path) of every page file, least recently used first
+        """
+        files = []
+        for entry in os.scandir(self.__directory):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        files.sort()
+        return files
+
+    @staticmethod
+    def __mark_used(path: str):
+        # Set explicitly, since the times the file system records can be too coarse to order pages used in a row
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    @staticmethod
+    def __read(path: str) -> Tuple[str, bytes]:
+        with open(path, "rb") as file:
+            key, _, value = file.read().partition(b"\n")
+        return key.decode("unicode_escape"), value
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.__path(key)
+        try:
+            stored_key, value = self.__read(path)
+            if stored_key != key:
+                return None
+            self.__mark_used(path)
+        except FileNotFoundError:
+            return None
+        return value
+
+    def put(self, key: str, value: bytes) -> List[str]:
+        contents = key.encode("unicode_escape") + b"\n" + value  # escaped, so the key has no newline of its own
+        if len(contents) > self.__max_bytes:
+            return []
+
+        # Write to a temporary file first so a reader never sees half a page
+        path = self.__path(key)
+        try:
+            replaced_size = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced_size = None
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.__directory, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(contents)
+        os.replace(temporary_path, path)
+        self.__mark_used(path)
+
+        with self.__lock:
+            self.__entries += 1 if replaced_size is None else 0
+            self.__bytes += len(contents) - (replaced_size or 0)
+            if self.__entries <= self.__max_entries and self.__bytes <= self.__max_bytes:
+                return []
+            return self.__evict()
+
+    def __evict(self) -> List[str]:
+        """
+        Removes the least recently used pages until the directory is a tenth under its limits, so the next few puts
+        don't have to scan it again
+        :return: The keys of the removed pages
+        """
+        files = self.__files()
+        remaining = len(files)
+        size = sum(file_size for _, file_size, _ in files)
+        max_entries = self.__max_entries - self.__max_entries // 10
+        max_bytes = self.__max_bytes - self.__max_bytes // 10
+        evicted = []
+        for _, file_size, old_path in files:
+            if remaining <= max_entries and size <= max_bytes:
+                break
+            try:
+                old_key, _ = self.__read(old_path)
+                os.remove(old_path)
+            except FileNotFoundError:  # evicted by another process
+                pass
+            else:
+                evicted.append(old_key)
+            remaining -= 1
+            size -= file_size
+        self.__entries = remaining
+        self.__bytes = size
+        return evicted
+
+    def delete(self, key: str):
+        path = self.__path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self.__lock:
+            self.__entries -= 1
+            self.__bytes -= size
+
+    def clear(self):
+        for _, _, path in self.__files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self.__lock:
+            self.__entries = 0
+            self.__bytes = 0
+
+    def __len__(self):
+        return len(self.__files())
+
+
+class ResponseCache:
+    """
+    Caches whole rendered pages. Keys hold the endpoint, the URL arguments and the versions of the data the page is
+    built from, so a change retires the pages it affects in every process, even one that didn't make the change.
+    Pages can also be tagged (e.g. with the game they show) so a write can drop the pages it retired straight away
+    instead of waiting for them to be evicted.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend):
+        self.__backend = backend
+        self.__keys_by_tag = {}  # tag -> keys of the pages stored with it
+        self.__lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint: str, view_args: dict, query_args: Iterable[Tuple[str, str]], versions: Iterable[DataVersion]) -> str:
+        """
+        Builds the key of a page. Query arguments are sorted, so the order they appear in the URL doesn't matter
+        """
+        view_part = "&".join("{}={}".format(name, value) for name, value in sorted(view_args.items()))
+        query_part = "&".join("{}={}".format(name, value) for name, value in sorted(query_args))
+        version_part = ",".join("{}@{!r}".format(version, modified) for version, modified in versions)
+        return "{}|{}|{}|{}".format(endpoint, view_part, query_part, version_part)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.__backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes, tags: Iterable[str] = ()):
+        evicted = self.__backend.put(key, value)
+        with self.__lock:
+            for tag in tags:
+                self.__keys_by_tag.setdefault(tag, set()).add(key)
+            if evicted:
+                for keys in self.__keys_by_tag.values():
+                    keys.difference_update(evicted)
+
+    def invalidate(self, tag: str):
+        """
+        Drops every page stored with the tag
+        """
+        with self.__lock:
+            keys = self.__keys_by_tag.pop(tag, set())
+        for key in keys:
+            self.__backend.delete(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__keys_by_tag.clear()
+        self.__backend.clear()
+
+    def __len__(self):
+        return len(self.__backend)
+
+
+response_cache_instance: Optional[ResponseCache] = None
+
+
+def create_response_cache(config) -> Optional[ResponseCache]:
+    """
+    Creates the response cache described by the RESPONSE_CACHE_* configuration values
+    :return: The cache, or None if response caching is turned off
+    """
+    backend = (config.get('RESPONSE_CACHE_BACKEND') or 'none').lower()
+    if backend not in BACKENDS:
+        raise ValueError("Unknown response cache backend '{}', expected one of {}".format(backend, sorted(BACKENDS)))
+
+    max_entries = config.get('RESPONSE_CACHE_MAX_ENTRIES')
+    max_bytes = config.get('RESPONSE_CACHE_MAX_BYTES')
+    if backend == 'memory':
+        return ResponseCache(MemoryResponseCacheBackend(max_entries, max_bytes))
+    if backend == 'disk':
+        return ResponseCache(DiskResponseCacheBackend(config.get('RESPONSE_CACHE_DIRECTORY'), max_entries, max_bytes))
+    return None
+
+
+def game_tag(game_id: int) -> str:
+    return "game:{}".format(game_id)
+
+
+def invalidate(tag: str):
+    """
+    Drops the cached pages stored with the tag, does nothing if response caching is turned off
+    """
+    if response_cache_instance is not None:
+        response_cache_instance.invalidate(tag)
+
+
+def cached_response(versions: Callable[..., Iterable[DataVersion]] = None, tags: Callable[..., Iterable[str]] = None):
+    """
+    Serves a view from the response cache for visitors who aren't logged in, who all see the same page.
+    Logged in users get pages with their wishlist button and review form, so they always go to the view.
+    :param versions: Optional function that takes the view's arguments and returns the versions of the data the page
+        is built from, on top of the catalogue (see page_versions)
+    :param tags: Optional function that takes the view's arguments and returns the tags to store the page with
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            cache = response_cache_instance
+            if cache is None or request.method != 'GET' or session.get('username'):
+                return view(**view_args)
+
+            data_versions = page_versions(versions, view_args)
+            if data_versions is None:
+                return view(**view_args)
+            key = ResponseCache.key(request.endpoint, view_args, request.args.items(multi=True), data_versions)
+            page = cache.get(key)
+            if page is not None:
+                response = current_app.response_class(page, mimetype='text/html')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(**view_args))
+            if response.status_code == 200:
+                cache.put(key, response.get_data(), tags(**view_args) if tags is not None else ())
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
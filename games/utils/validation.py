@@ -1,5 +1,9 @@
 from games.exceptions import view_layer_exceptions
 from games.utils import constants
+from games.pagination.cursor import Cursor
+from datetime import datetime
+
+MAX_DATABASE_INTEGER = 2 ** 63 - 1  # Largest value of a signed 64 bit integer column
 
 def validate_page_number(page_number):
     if page_number is None:
@@ -25,6 +29,27 @@ def validate_count(count):
         raise view_layer_exceptions.BadRequestException(f"Count must be less than or equal to {constants.MAX_COUNT}.")
     return count
 
+def validate_cursor(token, sort_by):
+    if token is None:
+        return None
+    try:
+        cursor = Cursor.decode(token)
+    except ValueError:
+        raise view_layer_exceptions.BadRequestException("Invalid cursor.")
+    # Ids are compared with 64 bit integer columns, larger values can't even be sent to the database
+    if not 0 <= cursor.game_id <= MAX_DATABASE_INTEGER:
+        raise view_layer_exceptions.BadRequestException("Invalid cursor.")
+    # The sort key has to be something the listing it is used with can compare
+    if sort_by == 'title':
+        valid = isinstance(cursor.sort_key, str)
+    elif sort_by == 'release_date':
+        valid = isinstance(cursor.sort_key, (datetime, type(None)))
+    else:
+        valid = isinstance(cursor.sort_key, int) and cursor.sort_key == cursor.game_id
+    if not valid:
+        raise view_layer_exceptions.BadRequestException("Cursor doesn't match the sort order.")
+    return cursor
+
 def validate_search_term(search_term):
     if search_term is None:
         raise view_layer_exceptions.BadRequestException("No search term provided.")
@@ -43,6 +68,8 @@ def validate_game_id(game_id):
         raise view_layer_exceptions.BadRequestException("Game id must be an integer.")
     if game_id < 1:
         raise view_layer_exceptions.BadRequestException("Game id must be a positive integer.")
+    if game_id > MAX_DATABASE_INTEGER:
+        raise view_layer_exceptions.BadRequestException("Game id is too large.")
     return game_id
 
 def validate_rating(rating):
@@ -84,6 +111,13 @@ def validate_sort_by(sort_by):
         raise view_layer_exceptions.BadRequestException(f"Sort by must be one of {constants.SORT_BY_OPTIONS}.")
     return sort_by
 
+def validate_review_sort_by(sort_by):
+    if sort_by is None:
+        raise view_layer_exceptions.BadRequestException("No sort by provided.")
+    if sort_by not in constants.REVIEW_SORT_BY_OPTIONS:
+        raise view_layer_exceptions.BadRequestException(f"Sort by must be one of {constants.REVIEW_SORT_BY_OPTIONS}.")
+    return sort_by
+
 def validate_ascending(ascending):
     if ascending is None:
         return ascending
@@ -51,14 +51,9 @@ def remove(authenticated_user: User, game_id: int):
     except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.NotFoundException(f"Game with game_id {game_id} does not exist")
 
-    actual_wish = None
-    wishes = wishlist_service.get_wishes_by_user(authenticated_user, wishlist_repository.wishlist_repo_instance)
-    for wish in wishes:
-        if wish.game == game:
-            actual_wish = wish
-            break
-
-    if actual_wish is None:
+    try:
+        actual_wish = wishlist_service.get_wish(authenticated_user, game, wishlist_repository.wishlist_repo_instance)
+    except service_layer_exceptions.ResourceNotFoundException:
         raise view_layer_exceptions.BadRequestException(f"{str(game)} is not in your wishlist")
 
 
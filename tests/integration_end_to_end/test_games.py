@@ -1,5 +1,19 @@
-from tests.integration_end_to_end.utils import client
+import re
+import html
+import time
+from email.utils import parsedate_to_datetime
+import pytest
+from sqlalchemy import create_engine
+from tests.integration_end_to_end.utils import client, config
 from flask import session
+from games.utils import http_caching
+from games.__init__ import create_app
+from games.domainmodel.model import Genre
+from games.pagination.cursor import Cursor
+from games.repository import game_repository
+from games.repository.orm import touch_data_versions
+from games.repository.data_version import game_reviews
+from games.utils.rendering import sidebar_cache
 
 
 
@@ -22,6 +36,23 @@ def test_games_index(client):
             count += 1
     assert count == 1  # assert that only one game is showing up
 
+def test_games_index_cursor(client):
+    response = client.get("/games/?sort_by=release_date&count=1", follow_redirects=True)
+    next_url = html.unescape(re.search(rb'href="([^"]*cursor=[^"]*)"[^>]*>Next', response.data).group(1).decode())
+    assert "page=2" in next_url  # assert the next link keeps the page number for the page counter
+
+    response = client.get(next_url + "&count=1")  # links don't carry the count
+    assert response.status_code == 200
+    assert b"Page 2 of 4" in response.data
+
+    response = client.get("/games/?sort_by=title&cursor=not-a-cursor")
+    assert response.status_code == 400  # assert a broken cursor is rejected
+
+    too_large = Cursor(10 ** 30, 10 ** 30).encode()
+    assert client.get("/games/?cursor=" + too_large).status_code == 400  # assert ids past 64 bits are rejected, not sent to the database
+    too_large = Cursor("Title", 10 ** 30).encode()
+    assert client.get("/games/?sort_by=title&cursor=" + too_large).status_code == 400
+
 def test_games_search(client):
     response = client.get("/games/search?q=Call", follow_redirects=True)
     assert response.status_code == 200
@@ -65,4 +96,107 @@ def test_games_game(client):
         assert session.get('username') == 'test'
 
         response = client.get("/games/game/7940", follow_redirects=True)
-        assert b"Add to wishlist" in response.data  # assert add to wishlist shows up when we are logged in
\ No newline at end of file
+        assert b"Add to wishlist" in response.data  # assert add to wishlist shows up when we are logged in
+
+def test_sidebar_cache(client):
+    client.get("/games/")
+    hits = sidebar_cache.hits
+    response = client.get("/authentication/login")
+    assert b"Action" in response.data  # assert the genres show up in the sidebar of every page
+    assert sidebar_cache.hits == hits + 1  # assert the sidebar wasn't rendered again
+
+    game_repository.game_repo_instance.add_genre(Genre("Brand New Genre"))
+    response = client.get("/games/")
+    assert b"Brand New Genre" in response.data  # assert adding a genre replaces the cached sidebar
+
+
+def test_games_conditional_get(client, monkeypatch):
+    monkeypatch.setattr(http_caching, "clock", lambda: time.time() + 1)  # as if the second of the last change is over
+    response = client.get("/games/?sort_by=title")
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert response.status_code == 200
+
+    response = client.get("/games/?sort_by=title", headers={"If-None-Match": etag})
+    assert response.status_code == 304  # assert an unchanged page isn't sent again
+    assert response.data == b""
+
+    response = client.get("/games/?sort_by=title", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = client.get("/games/game/7940", headers={"If-None-Match": etag})
+    assert response.status_code == 200  # assert the game page also depends on the game's reviews
+
+    response = client.get("/games/game/abc", headers={"If-None-Match": etag})
+    assert response.status_code == 400  # assert bad arguments still reach the view
+
+
+@pytest.fixture(params=["database", "csv"])
+def any_client(request, client, tmp_path):
+    if request.param == "database":
+        return client
+    config.REPOSITORY_ADAPTER_TYPE = "csv"
+    try:
+        return create_app(custom_config=config).test_client()
+    finally:
+        config.REPOSITORY_ADAPTER_TYPE = "database"
+
+
+def test_if_modified_since_waits_for_the_second_to_end(client, monkeypatch):
+    last_modified = client.get("/games/").headers["Last-Modified"]
+    second = parsedate_to_datetime(last_modified).timestamp()
+
+    monkeypatch.setattr(http_caching, "clock", lambda: second + 0.999)
+    response = client.get("/games/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200  # assert a change later in the same second can't be missed
+
+    monkeypatch.setattr(http_caching, "clock", lambda: second + 1)
+    response = client.get("/games/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_conditional_get_checks_the_page_first(any_client, monkeypatch):
+    monkeypatch.setattr(http_caching, "clock", lambda: time.time() + 1)
+    client = any_client
+    game_etag = client.get("/games/game/7940").headers["ETag"]
+    index_etag = client.get("/games/").headers["ETag"]
+    future = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+    # The game doesn't exist, whatever the request says it already has
+    assert client.get("/games/game/123456789", headers={"If-None-Match": game_etag}).status_code == 404
+    assert client.get("/games/game/123456789", headers={"If-Modified-Since": future}).status_code == 404
+    assert client.get("/games/game/" + "9" * 30, headers={"If-Modified-Since": future}).status_code == 400
+    assert client.get("/games/game/7940?page=-5", headers={"If-None-Match": game_etag}).status_code == 400
+
+    # Arguments the page rejects
+    assert client.get("/games/?page=-5", headers={"If-None-Match": index_etag}).status_code == 400
+    assert client.get("/games/?page=-5", headers={"If-Modified-Since": future}).status_code == 400
+    assert client.get("/games/genre/NotAGenre", headers={"If-Modified-Since": future}).status_code == 404
+    assert client.get("/games/publisher/NotAPublisher", headers={"If-Modified-Since": future}).status_code == 404
+    assert client.get("/games/search?q=%20", headers={"If-Modified-Since": future}).status_code == 400
+
+    assert client.get("/games/game/7940", headers={"If-None-Match": game_etag}).status_code == 304
+    assert client.get("/games/?page=2&count=1", headers={"If-Modified-Since": future}).status_code == 304
+
+
+def test_etags_are_shared_by_workers(client):
+    response = client.get("/games/game/7940")
+    etag = response.headers["ETag"]
+
+    # Another worker serving the same database adds a review, all they share is the database
+    engine = create_engine(client.application.config['SQLALCHEMY_DATABASE_URI'] + "_test")
+    with engine.begin() as connection:
+        touch_data_versions(connection, [game_reviews(7940)])
+    engine.dispose()
+
+    response = client.get("/games/game/7940", headers={"If-None-Match": etag})
+    assert response.status_code == 200  # assert the review shows up here instead of a stale 304
+    assert response.headers["ETag"] != etag
+
+
+def test_static_files_are_hashed(client):
+    response = client.get("/games/")
+    static_url = re.search(rb'href="(/static/[^"]*\.css\?v=[0-9a-f]+)"', response.data).group(1).decode()
+
+    response = client.get(static_url)
+    assert response.status_code == 200
+    assert "max-age=31536000" in response.headers["Cache-Control"]  # assert hashed static files can be kept for good
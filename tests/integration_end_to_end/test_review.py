@@ -1,5 +1,8 @@
 from tests.integration_end_to_end.utils import client
 from flask import session, request
+from sqlalchemy import create_engine
+from games.repository.orm import touch_data_versions
+from games.repository.data_version import game_reviews, CATALOGUE
 
 def test_review_form_display(client):
     with client:
@@ -40,4 +43,76 @@ def test_add_review(client):
         assert response.status_code == 400 # assert that we get a 400 if we try to add a review with an empty comment
 
         response = client.post('/review/add', data={"game_id": "42138947123098472", "rating": "5", "comment": "a very specific review for testing"}, follow_redirects=True)
-        assert response.status_code == 404 # assert that we get a 404 if we try to add a review to a game that doesn't exist
\ No newline at end of file
+        assert response.status_code == 404 # assert that we get a 404 if we try to add a review to a game that doesn't exist
+
+def test_review_invalidates_cached_game_page(client):
+    response = client.get('/games/game/7940')
+    assert response.headers['X-Cache'] == 'MISS'
+    response = client.get('/games/game/7940')
+    assert response.headers['X-Cache'] == 'HIT'  # check anonymous visitors are served the cached page
+
+    with client:
+        client.post('/authentication/register', data={"user_name": "cachetest", "password": "Sixsix7", "confirm_password": "Sixsix7"}, follow_redirects=True)
+        client.post('/authentication/login', data={"user_name": "cachetest", "password": "Sixsix7"}, follow_redirects=True)
+        response = client.get('/games/game/7940')
+        assert 'X-Cache' not in response.headers  # check logged in users bypass the cache
+        client.post('/review/add', data={"game_id": "7940", "rating": "4", "comment": "a review that should show up straight away"}, follow_redirects=True)
+        client.get('/authentication/logout')
+
+    response = client.get('/games/game/7940')
+    assert response.headers['X-Cache'] == 'MISS'  # check the review dropped the cached page
+    assert b"a review that should show up straight away" in response.data
+
+
+def test_review_through_another_worker_retires_cached_game_page(client):
+    client.get('/games/game/7940')
+    client.get('/games/')
+    assert client.get('/games/game/7940').headers['X-Cache'] == 'HIT'
+
+    # Another worker serving the same database has its own response cache, all they share is the database
+    engine = create_engine(client.application.config['SQLALCHEMY_DATABASE_URI'] + "_test")
+    with engine.begin() as connection:
+        touch_data_versions(connection, [game_reviews(7940)])
+
+    assert client.get('/games/game/7940').headers['X-Cache'] == 'MISS'  # check a review added there retires the page here
+    assert client.get('/games/').headers['X-Cache'] == 'HIT'  # check pages that don't show the reviews are kept
+
+    with engine.begin() as connection:
+        touch_data_versions(connection, [CATALOGUE])
+    assert client.get('/games/').headers['X-Cache'] == 'MISS'
+    engine.dispose()
+
+def test_review_changes_game_page_etag(client):
+    etag = client.get('/games/game/7940').headers['ETag']
+    assert client.get('/games/game/7940', headers={"If-None-Match": etag}).status_code == 304
+
+    with client:
+        client.post('/authentication/register', data={"user_name": "etagtest", "password": "Sixsix7", "confirm_password": "Sixsix7"}, follow_redirects=True)
+        client.post('/authentication/login', data={"user_name": "etagtest", "password": "Sixsix7"}, follow_redirects=True)
+        client.post('/review/add', data={"game_id": "7940", "rating": "4", "comment": "a review that changes the etag"}, follow_redirects=True)
+        client.get('/authentication/logout')
+
+    response = client.get('/games/game/7940', headers={"If-None-Match": etag})
+    assert response.status_code == 200  # check the new review is sent
+    assert response.headers['ETag'] != etag
+
+def test_game_page_reviews_are_paginated(client):
+    with client:
+        client.post('/authentication/register', data={"user_name": "pagetest", "password": "Sixsix7", "confirm_password": "Sixsix7"}, follow_redirects=True)
+        for i, rating in enumerate([2, 5, 3]):
+            client.post('/review/add', data={"game_id": "7940", "rating": str(rating), "comment": f"paged review {i}"}, follow_redirects=True)
+        client.get('/authentication/logout')
+
+    response = client.get('/games/game/7940?count=1')
+    assert b'paged review 1' in response.data  # highest rated first by default
+    assert b'paged review 0' not in response.data
+    assert b'page=2' in response.data  # check there is a link to the next page
+
+    response = client.get('/games/game/7940?count=1&sort_by=newest')
+    assert b'paged review 2' in response.data
+    assert b'paged review 1' not in response.data
+
+    response = client.get('/games/game/7940?count=1&page=2&sort_by=newest')
+    assert b'paged review 1' in response.data
+
+    assert client.get('/games/game/7940?sort_by=title').status_code == 400
@@ -12,7 +12,8 @@ config.WTF_CSRF_ENABLED = False
 config.SECRET_KEY = "test"
 
 @pytest.fixture()
-def client():
+def client(tmp_path):
+    config.CSV_SNAPSHOT_DIRECTORY = str(tmp_path / "snapshots")
     my_app = create_app(custom_config=config)
 
     return my_app.test_client()
\ No newline at end of file
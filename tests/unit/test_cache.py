@@ -0,0 +1,59 @@
+import pytest
+
+from games.utils.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    cache.put("c", 3)  # so "b" should be evicted
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = LRUCache(10, ttl=5, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None  # check entries expire after the ttl
+    assert len(cache) == 0
+
+
+def test_get_or_compute():
+    cache = LRUCache(10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None  # check None values are still cached
+
+    assert cache.get_or_compute("a", compute) is None
+    assert cache.get_or_compute("a", compute) is None
+    assert len(calls) == 1
+
+    cache.invalidate("a")
+    cache.get_or_compute("a", compute)
+    assert len(calls) == 2
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(0)
@@ -0,0 +1,64 @@
+import pytest
+
+from games.repository.game_repository.adapters import csv_ingest
+from games.repository.game_repository.adapters.csv_game_repository import games_csv_path
+
+HEADER = "AppID,Name,Release date,Price,About the game,Header image,Website,Publishers,Genres\n"
+
+
+def row(game_id, name="Game", release_date="Oct 21, 2008", price="1.99", description="About", genres="Action"):
+    return '{},{},"{}",{},"{}",image.png,,Publisher,"{}"\n'.format(game_id, name, release_date, price, description, genres)
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(*rows):
+        path = tmp_path / "games.csv"
+        path.write_text(HEADER + "".join(rows), encoding="utf-8")
+        return path
+    return write
+
+
+def test_record_boundaries_skip_newlines_inside_quotes():
+    data = b'a,b\n1,"x\ny"\n2,"""q""\n"\n3,z\n'
+    _, start = csv_ingest.read_header(data)
+    assert start == 4
+    assert csv_ingest.next_record_boundary(data, start + 1, start) == data.index(b"2,")
+    assert csv_ingest.next_record_boundary(data, data.index(b"2,") + 1, start) == data.index(b"3,")
+
+    ranges = csv_ingest.record_ranges(data, start, 10)
+    assert ranges[0][0] == start and ranges[-1][1] == len(data)
+    assert [data[range_start:range_start + 2] for range_start, _ in ranges] == [b"1,", b"2,", b"3,"]
+
+
+def test_games_are_in_app_id_order(write_csv):
+    columns = csv_ingest.read_columns(write_csv(row(30), row(10, description="Two\nlines"), row(20)))
+    assert list(columns.ids) == [10, 20, 30]
+    assert columns.details[0] == ["Two\nlines", ""]
+
+
+def test_malformed_rows_are_reported_and_skipped(write_csv, capsys):
+    path = write_csv(row(1), row("x"), row(2, price="-1"), row(3, release_date="soon"), "4,Short\n", row(1, name="Again"), row(5))
+
+    columns = csv_ingest.read_columns(path)
+
+    assert list(columns.ids) == [1, 5]
+    assert [columns.strings[index] for index in columns.text["Name"]] == ["Game", "Game"]  # the first game 1 is kept
+    assert [number for number, _ in columns.rejected_rows] == [2, 3, 4, 5, 6]
+    assert "AppID 1 is already taken" in columns.rejected_rows[-1][1]
+    assert "Skipped row 2 of games.csv" in capsys.readouterr().out
+
+
+def test_parallel_parse_matches_parse_in_process(monkeypatch):
+    in_process = csv_ingest.read_columns(games_csv_path(False), workers=1)
+
+    monkeypatch.setattr(csv_ingest, "PARALLEL_THRESHOLD", 0)
+    parallel = csv_ingest.read_columns(games_csv_path(False), workers=2)
+
+    assert parallel.ids == in_process.ids
+    assert parallel.prices == in_process.prices
+    assert parallel.details == in_process.details
+    for column in csv_ingest.TEXT_COLUMNS:
+        assert [parallel.strings[i] for i in parallel.text[column]] == [in_process.strings[i] for i in in_process.text[column]]
+    assert [parallel.strings[i] for i in parallel.genres] == [in_process.strings[i] for i in in_process.genres]
+    assert parallel.genre_offsets == in_process.genre_offsets
@@ -0,0 +1,103 @@
+import csv
+import io
+import shutil
+
+import pytest
+
+from games.repository.game_repository.adapters import csv_snapshot
+from games.repository.game_repository.adapters.csv_game_repository import CSVGameRepository, games_csv_path, games_from_columns, read_games
+
+
+def describe(game):
+    return (game.game_id, game.title, game.price, game.release_date, game.description, game.image_url,
+            game.website_url, game.publisher, game.genres)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "games.csv"
+    shutil.copy(games_csv_path(False), path)
+    return path
+
+
+def test_snapshot_games_match_csv_games(tmp_path):
+    csv_games = [describe(game) for game in read_games(False)]
+    assert [describe(game) for game in read_games(False, snapshot_directory=tmp_path)] == csv_games  # compiled
+    assert [describe(game) for game in read_games(False, snapshot_directory=tmp_path)] == csv_games  # loaded
+
+
+def test_snapshot_round_trip(csv_path, tmp_path):
+    directory = tmp_path / "snapshots"
+    columns = csv_snapshot.load_columns(csv_path, directory)  # compiles the snapshot
+    assert csv_snapshot.snapshot_path(csv_path, directory).exists()
+
+    loaded = csv_snapshot.read_snapshot(csv_snapshot.snapshot_path(csv_path, directory), csv_snapshot.checksum(csv_path))
+    assert loaded is not None
+    assert loaded.strings == columns.strings
+    assert loaded.ids == columns.ids
+    assert loaded.prices == columns.prices
+    assert loaded.text == columns.text
+    assert (loaded.genre_offsets, loaded.genres) == (columns.genre_offsets, columns.genres)
+
+
+def test_snapshot_is_rebuilt_when_csv_changes(csv_path, tmp_path):
+    directory = tmp_path / "snapshots"
+    games = list(read_games(False, snapshot_directory=directory))
+
+    # Drop the game on the last row of the CSV file
+    header_and_rows = csv_path.read_text(encoding="utf-8-sig")
+    header, *rows = csv.reader(io.StringIO(header_and_rows, newline=""))
+    last_game_id = rows[-1][header.index("AppID")]
+    last_row_start = header_and_rows.rindex("\n" + last_game_id + ",")
+    csv_path.write_text(header_and_rows[:last_row_start + 1], encoding="utf-8")
+
+    assert csv_snapshot.read_snapshot(csv_snapshot.snapshot_path(csv_path, directory), csv_snapshot.checksum(csv_path)) is None
+    columns = csv_snapshot.load_columns(csv_path, directory)
+    assert list(columns.ids) == [game.game_id for game in games if game.game_id != int(last_game_id)]
+
+
+def test_corrupt_snapshot_is_ignored(csv_path, tmp_path):
+    directory = tmp_path / "snapshots"
+    csv_snapshot.load_columns(csv_path, directory)
+    path = csv_snapshot.snapshot_path(csv_path, directory)
+    path.write_bytes(path.read_bytes()[:200])
+
+    assert csv_snapshot.read_snapshot(path, csv_snapshot.checksum(csv_path)) is None
+    assert len(csv_snapshot.load_columns(csv_path, directory)) > 0
+
+
+def test_repository_populates_from_snapshot(tmp_path):
+    from_csv = CSVGameRepository()
+    from_csv.populate(True)
+    from_snapshot = CSVGameRepository()
+    from_snapshot.populate(True, snapshot_directory=tmp_path)
+
+    assert from_snapshot.get_number_of_games() == from_csv.get_number_of_games()
+    assert from_snapshot.get_genres() == from_csv.get_genres()
+    assert [describe(game) for game in from_snapshot.get_games(1, 10, False)] == [describe(game) for game in from_csv.get_games(1, 10, False)]
+
+
+def test_details_are_read_on_demand(csv_path, tmp_path):
+    directory = tmp_path / "snapshots"
+    csv_games = {game.game_id: game for game in read_games(False)}
+    columns = csv_snapshot.load_columns(csv_path, directory)
+    assert isinstance(columns.details, csv_snapshot.DetailStore)
+    assert len(columns.details) == len(columns)
+
+    for game in games_from_columns(columns):
+        assert game._Game__description is None and game._Game__website_url is None  # not held by the game
+        assert game.description == csv_games[game.game_id].description
+        assert game.website_url == csv_games[game.game_id].website_url
+
+    game.description = "A new description"  # setting a field replaces what the store has
+    assert game.description == "A new description"
+
+
+def test_missing_details_file_is_rebuilt(csv_path, tmp_path):
+    directory = tmp_path / "snapshots"
+    csv_snapshot.load_columns(csv_path, directory)
+    csv_snapshot.details_path(csv_path, directory).unlink()
+
+    columns = csv_snapshot.load_columns(csv_path, directory)
+    assert csv_snapshot.details_path(csv_path, directory).exists()
+    assert columns.details.get(0, "description") is not None
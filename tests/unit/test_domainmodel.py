@@ -166,6 +166,21 @@ def test_game_release_date_setter():
 
     assert game.get_datetime() == datetime(2008, 10, 21)
 
+
+def test_game_release_date_is_stored_as_ordinal():
+    game = Game(1, "Super Soccer Blast")
+    game.release_date = "Oct 21, 2008"
+    assert game.release_date_ordinal == datetime(2008, 10, 21).toordinal()
+    assert game.release_date == "2008-10-21"
+
+    other_game = Game(2, "Super Soccer Blast 2")
+    other_game.release_date = "Oct 21, 2008"
+    assert other_game.release_date is game.release_date  # formatted once
+    assert other_game.get_datetime() is game.get_datetime()
+
+    other_game.release_date = "Nov 1, 2008"
+    assert game.release_date_ordinal < other_game.release_date_ordinal
+
 def test_game_description_setter():
     game = Game(1, "Domino House")
     game.description = "This is a domino game"
@@ -0,0 +1,9 @@
+from games.repository.data_version import DataVersion
+from games.utils.http_caching import etag
+
+
+def test_etag():
+    versions = [DataVersion(3, 100.5), DataVersion(1, 50.0)]
+    assert etag(versions) == etag([DataVersion(3, 100.5), DataVersion(1, 50.0)])  # check any process gets the same ETag
+    assert etag(versions) != etag([DataVersion(3, 100.5), DataVersion(2, 60.0)])  # check a new version changes it
+    assert etag(versions) != etag([DataVersion(3, 200.5), DataVersion(1, 50.0)])  # check a rebuilt database does too
@@ -1,8 +1,10 @@
 import pytest
+from datetime import datetime
 
 from games.pagination import page
 from flask import Flask
 from games.domainmodel.model import Game, Genre
+from games.pagination.cursor import Cursor
 from games.repository.game_repository.game_repository import GameRepository
 from games.repository.game_repository.adapters import csv_game_repository
 
@@ -71,4 +73,59 @@ def test_pagination_decorator(test_app, pagination_decorated_function, game_repo
 
     with test_app.app_context():
         test_params_pages = pagination_decorated_function(genres[0], repository=game_repository, page_number=1, count=5, reverse=False, endpoint="test", example_param_1="spam", example_param_2="eggs")
-        assert test_params_pages.next_page_url == "http://localhost/test?page=2&example_param_1=spam&example_param_2=eggs"  # check if urls with custom parameters are correct
\ No newline at end of file
+        assert test_params_pages.next_page_url == "http://localhost/test?page=2&example_param_1=spam&example_param_2=eggs"  # check if urls with custom parameters are correct
+
+def test_pagination_decorator_single_call(test_app, game_repository):
+    calls = []
+
+    @page.paginated()
+    def get_games(repository: GameRepository, page_number, count, reverse, lookahead=0):
+        calls.append((page_number, count, lookahead))
+        return repository.get_games(page_number, count, reverse, lookahead)
+
+    for i in range(1, 11):
+        game_repository.add_game(Game(i, f"Game {i}"))
+
+    with test_app.app_context():
+        first_page = get_games(repository=game_repository, page_number=1, count=5, reverse=False, endpoint="test")
+        last_page = get_games(repository=game_repository, page_number=2, count=5, reverse=False, endpoint="test")
+
+    assert calls == [(1, 5, 1), (2, 5, 1)]  # check the repository is only asked once per page, for one extra result
+    assert first_page.data == game_repository.get_games(1, 5, False)  # check the extra result isn't part of the page
+    assert first_page.has_next_page == True
+    assert last_page.data == game_repository.get_games(2, 5, False)
+    assert last_page.has_next_page == False
+
+
+def test_pagination_total_pages(test_app, game_repository):
+    @page.paginated(total=lambda genre, repository: repository.get_number_of_games_with_genre(genre))
+    def get_games_with_genre(genre: Genre, repository: GameRepository, page_number, count, reverse, lookahead=0):
+        return repository.get_games_with_genre(genre, page_number, count, lookahead)
+
+    action = Genre("Action")
+    for i in range(1, 12):
+        game = Game(i, f"Game {i}")
+        game.add_genre(action)
+        game_repository.add_game(game)
+
+    with test_app.app_context():
+        genre_page = get_games_with_genre(action, repository=game_repository, page_number=1, count=5, reverse=False, endpoint="test")
+        assert genre_page.total_items == 11  # check the total comes from the repository count
+        assert genre_page.total_pages == 3  # 5 + 5 + 1
+        assert genre_page.last_page_url == "http://localhost/test?page=3"
+
+    uncounted_page = page.Page("test", [], 1, 5, False)
+    assert uncounted_page.total_pages is None  # check pages without a total don't crash
+    with test_app.app_context():
+        assert uncounted_page.last_page_url is None
+
+
+def test_cursor_encoding():
+    for cursor in (Cursor(7940, 7940), Cursor("Call of Duty", 7940, before=True), Cursor(datetime(2008, 10, 21), 7940), Cursor(None, 7940)):
+        token = cursor.encode()
+        assert Cursor.decode(token) == cursor  # check the cursor survives a round trip
+        assert token.isascii() and "=" not in token and "/" not in token and "+" not in token  # check the token is safe in a URL
+
+    for token in ("", "not a cursor", Cursor("Call of Duty", 7940).encode()[:-3], "WzEsMl0"):
+        with pytest.raises(ValueError):
+            Cursor.decode(token)
@@ -59,6 +59,20 @@ class TestCSVReader:
         with pytest.raises(repository_layer_exceptions.ResourceNotFoundException):
             populated_csv_game_repository.get_game(1234567890123456789)  # check if exception is raised when game_id is not found
 
+    def test_get_game_after_add(self, unpopulated_csv_game_repository):
+        repo = unpopulated_csv_game_repository
+
+        with pytest.raises(repository_layer_exceptions.ResourceNotFoundException):
+            repo.get_game(42)  # check the game can't be found before it is added
+
+        game = Game(42, "Game 42")
+        repo.add_game(game)
+        assert repo.get_game(42) is game  # check the exact same object is returned from the index
+
+        with pytest.raises(repository_layer_exceptions.ResourceAlreadyExistsException):
+            repo.add_game(Game(42, "Another Game 42"))  # check a duplicate id doesn't replace the indexed game
+        assert repo.get_game(42).title == "Game 42"
+
     def test_get_games(self, unpopulated_csv_game_repository):
         repo = unpopulated_csv_game_repository
 
@@ -169,4 +183,105 @@ class TestCSVReader:
         assert free_genre == Genre("Free to Play")
         free_games = repo.get_games_with_genre(free_genre, 1, 10)
         for game in free_games:
-            assert free_genre in game.genres  # check if all games have the free to play genre
\ No newline at end of file
+            assert free_genre in game.genres  # check if all games have the free to play genre
+
+    def test_get_games_by_publisher(self, unpopulated_csv_game_repository):
+        repo = unpopulated_csv_game_repository
+
+        activision = Publisher("Activision")
+        valve = Publisher("Valve")
+        repo.add_publisher(valve)  # a publisher with no games yet
+
+        games = []
+        for i in (5, 3, 1, 4, 2):  # add games out of id order
+            game = Game(i, f"Game {i}")
+            game.publisher = activision
+            repo.add_game(game)
+            games.append(game)
+
+        assert repo.get_publisher("Activision") == activision
+        assert repo.get_games_by_publisher(activision, 1, 3) == sorted(games)[:3]  # check the publisher index is kept in id order
+        assert repo.get_games_by_publisher(activision, 2, 3) == sorted(games)[3:]
+        assert repo.get_games_by_publisher(valve, 1, 10) == []
+
+        with pytest.raises(repository_layer_exceptions.ResourceAlreadyExistsException):
+            repo.add_publisher(Publisher("Activision"))
+
+        with pytest.raises(repository_layer_exceptions.ResourceNotFoundException):
+            repo.get_games_by_publisher(Publisher("Nintendo"), 1, 10)
+
+        valve_game = Game(6, "Game 6")
+        valve_game.publisher = valve
+        repo.add_game(valve_game)
+        assert repo.get_games_by_publisher(valve, 1, 10) == [valve_game]  # check games added later are indexed
+
+    def test_sorted_pages_match_full_sort(self, populated_csv_game_repository):
+        repo = populated_csv_game_repository
+        all_games = repo.get_games(1, repo.get_number_of_games())
+        assert all_games == sorted(all_games)  # check the default order is by id
+
+        by_title = sorted(all_games, key=lambda game: (game.title.casefold(), game.game_id))
+        dated = sorted([game for game in all_games if game.get_datetime() is not None], key=lambda game: (game.get_datetime(), game.game_id))
+        undated = [game for game in all_games if game.get_datetime() is None]
+
+        for page in range(1, 6):  # check pages are slices of the full orderings, including the reversed ones
+            start, stop = (page - 1) * 7, page * 7
+            assert repo.get_games(page, 7, True) == list(reversed(all_games))[start:stop]
+            assert repo.get_games_sorted_alphabetically(page, 7, False) == by_title[start:stop]
+            assert repo.get_games_sorted_alphabetically(page, 7, True) == list(reversed(by_title))[start:stop]
+            assert repo.get_games_sorted_by_date(page, 7, False) == (dated + undated)[start:stop]
+            assert repo.get_games_sorted_by_date(page, 7, True) == (undated + list(reversed(dated)))[start:stop]
+
+    def test_sorted_by_date_across_null_boundary(self, unpopulated_csv_game_repository):
+        repo = unpopulated_csv_game_repository
+        dated = []
+        for i in range(1, 5):
+            game = Game(i, f"Game {i}")
+            game.release_date = f"Jan 0{i}, 2020"
+            dated.append(game)
+        undated = [Game(i, f"Game {i}") for i in range(5, 8)]
+        for game in undated + dated:
+            repo.add_game(game)
+
+        assert repo.get_games_sorted_by_date(2, 3, False) == [dated[3], undated[0], undated[1]]  # page spans both indexes
+        assert repo.get_games_sorted_by_date(2, 3, True) == [dated[3], dated[2], dated[1]]
+        assert repo.get_games_sorted_by_date(4, 3, True) == []  # check pages past the end are empty
+
+    def test_search_cache(self, unpopulated_csv_game_repository):
+        repo = unpopulated_csv_game_repository
+        for i in range(1, 31):
+            repo.add_game(Game(i, f"Space Game {i}"))
+
+        first_page = repo.search_games("space game", 1, 10)
+        assert repo.search_cache.misses == 1
+        second_page = repo.search_games("  SPACE   game", 2, 10)  # the same search term once normalised
+        assert repo.search_cache.hits == 1  # check later pages are served from the cached ranking
+        assert not set(first_page) & set(second_page)
+        assert repo.get_number_of_search_results("space game") == 30
+        assert repo.search_cache.hits == 2
+
+        new_game = Game(31, "Space Game")
+        repo.add_game(new_game)  # adding a game should invalidate the cached rankings
+        assert repo.search_games("space game", 1, 1) == [new_game]
+        assert repo.search_cache.misses == 2
+
+    def test_catalogue_version(self, unpopulated_csv_game_repository):
+        repo = unpopulated_csv_game_repository
+        versions = [repo.get_catalogue_version()]
+
+        repo.add_genre(Genre("Strategy"))
+        versions.append(repo.get_catalogue_version())
+        assert repo.get_genres() == [Genre("Strategy")]
+
+        game = Game(1, "Game")
+        game.add_genre(Genre("Action"))
+        repo.add_game(game)
+        versions.append(repo.get_catalogue_version())
+        assert repo.get_genres() == [Genre("Action"), Genre("Strategy")]  # check the cached genre list picks up genres added with a game
+
+        repo.add_publisher(Publisher("Valve"))
+        versions.append(repo.get_catalogue_version())
+        assert len(set(versions)) == 4  # check every change gives a new version
+
+        repo.get_genres().clear()
+        assert len(repo.get_genres()) == 2  # check callers can't change the cached list
@@ -126,4 +126,67 @@ class TestCSVReader:
 
         fetched_reviews_by_g3 = unpopulated_review_repository.get_reviews_for_game(g3)
         for review in fetched_reviews_by_g3:
-            assert review.game.game_id == g3.game_id
\ No newline at end of file
+            assert review.game.game_id == g3.game_id
+    def test_rating_summary(self, unpopulated_review_repository):
+        u1 = User('eli', 'password')
+        u2 = User('max', 'password')
+        user_repository.user_repo_instance.add_user(u1)
+        user_repository.user_repo_instance.add_user(u2)
+
+        g1 = Game(1, "Game")
+        g2 = Game(2, "Game")
+        game_repository.game_repo_instance.add_game(g1)
+        game_repository.game_repo_instance.add_game(g2)
+
+        assert unpopulated_review_repository.get_rating_summary(g1).count == 0
+        assert unpopulated_review_repository.get_rating_summary(g1).average is None
+
+        unpopulated_review_repository.add_review(Review(u1, g1, 5, "Great"))
+        unpopulated_review_repository.add_review(Review(u2, g1, 2, "Meh"))
+        unpopulated_review_repository.add_review(Review(u1, g1, 5, "Still great"))
+        unpopulated_review_repository.add_review(Review(u1, g2, 0, "Bad"))
+
+        summary = unpopulated_review_repository.get_rating_summary(g1)
+        assert summary.count == 3
+        assert summary.total == 12
+        assert summary.histogram == [0, 0, 1, 0, 0, 2]
+        assert summary.average == 4
+
+        # A rejected duplicate isn't counted
+        with pytest.raises(Exception):
+            unpopulated_review_repository.add_review(Review(u1, g1, 5, "Great"))
+        assert unpopulated_review_repository.get_rating_summary(g1).count == 3
+
+        assert unpopulated_review_repository.get_rating_summary(g2).histogram == [1, 0, 0, 0, 0, 0]
+
+    def test_page_of_reviews(self, unpopulated_review_repository):
+        u1 = User('eli', 'password')
+        u2 = User('max', 'password')
+        user_repository.user_repo_instance.add_user(u1)
+        user_repository.user_repo_instance.add_user(u2)
+
+        g1 = Game(1, "Game")
+        g2 = Game(2, "Game")
+        game_repository.game_repo_instance.add_game(g1)
+        game_repository.game_repo_instance.add_game(g2)
+
+        ratings = [3, 5, 1, 5, 3]
+        for i, rating in enumerate(ratings):
+            unpopulated_review_repository.add_review(Review(u1, g1, rating, f"Review {i}"))
+        unpopulated_review_repository.add_review(Review(u2, g1, 4, "Other user"))
+        unpopulated_review_repository.add_review(Review(u1, g2, 2, "Other game"))
+
+        # Highest rated first, newest first within a rating
+        by_rating = unpopulated_review_repository.get_page_of_reviews_by_user(u1, 'rating', 1, 3, lookahead=1)
+        assert [review.comment for review in by_rating] == ["Review 3", "Review 1", "Review 4", "Review 0"]
+        by_rating = unpopulated_review_repository.get_page_of_reviews_by_user(u1, 'rating', 2, 3, lookahead=1)
+        assert [review.comment for review in by_rating] == ["Review 0", "Other game", "Review 2"]
+
+        newest = unpopulated_review_repository.get_page_of_reviews_for_game(g1, 'newest', 1, 4)
+        assert [review.comment for review in newest] == ["Other user", "Review 4", "Review 3", "Review 2"]
+        newest = unpopulated_review_repository.get_page_of_reviews_for_game(g1, 'newest', 2, 4)
+        assert [review.comment for review in newest] == ["Review 1", "Review 0"]
+        assert unpopulated_review_repository.get_page_of_reviews_for_game(g1, 'newest', 3, 4) == []
+
+        assert unpopulated_review_repository.get_number_of_reviews_by_user(u1) == 6
+        assert unpopulated_review_repository.get_number_of_reviews_by_user(User('joy', 'password')) == 0
@@ -156,4 +156,31 @@ class TestCSVReader:
         wishlist_u1 = unpopulated_wishlist_repository.get_wishlist_by_user(user)
 
         # Check if length of wishlist is still 1
-        assert len(wishlist_u1) == 1
\ No newline at end of file
+        assert len(wishlist_u1) == 1
+
+    def test_has_wish_and_wishlist_order(self, unpopulated_wishlist_repository):
+        games = [Game(i, f'Game {i}') for i in (1, 2, 3)]
+        for game in games:
+            game_repository.game_repo_instance.add_game(game)
+        user = User('max', 'password')
+        other_user = User('eli', 'password')
+        user_repository.user_repo_instance.add_user(user)
+        user_repository.user_repo_instance.add_user(other_user)
+
+        unpopulated_wishlist_repository.add_wish(Wish(user, games[2], datetime(2023, 1, 1)))
+        unpopulated_wishlist_repository.add_wish(Wish(user, games[0], datetime(2023, 1, 2)))
+        unpopulated_wishlist_repository.add_wish(Wish(other_user, games[0], datetime(2022, 1, 1)))
+
+        assert unpopulated_wishlist_repository.has_wish(user, games[0])
+        assert not unpopulated_wishlist_repository.has_wish(user, games[1])
+        assert unpopulated_wishlist_repository.get_wish(games[2], user).wish_time == datetime(2023, 1, 1)
+        with pytest.raises(ResourceNotFoundException):
+            unpopulated_wishlist_repository.get_wish(games[1], user)
+
+        # Oldest wish first
+        assert [wish.game for wish in unpopulated_wishlist_repository.get_wishlist_by_user(user)] == [games[2], games[0]]
+        assert [wish.user for wish in unpopulated_wishlist_repository.get_wishlist_by_game(games[0])] == [other_user, user]
+
+        unpopulated_wishlist_repository.remove_wish(Wish(user, games[0]))  # the wish time doesn't have to match
+        assert not unpopulated_wishlist_repository.has_wish(user, games[0])
+        assert [wish.user for wish in unpopulated_wishlist_repository.get_wishlist_by_game(games[0])] == [other_user]
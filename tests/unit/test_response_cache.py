@@ -0,0 +1,92 @@
+import pytest
+
+from games.repository.data_version import DataVersion
+
+from games.utils.response_cache import (
+    ResponseCache, MemoryResponseCacheBackend, DiskResponseCacheBackend, create_response_cache
+)
+
+
+@pytest.fixture(params=["memory", "disk"])
+def backend_factory(request, tmp_path):
+    if request.param == "memory":
+        return lambda max_entries, max_bytes: MemoryResponseCacheBackend(max_entries, max_bytes)
+    return lambda max_entries, max_bytes: DiskResponseCacheBackend(str(tmp_path / "pages"), max_entries, max_bytes)
+
+
+def test_backend_lru_eviction(backend_factory):
+    backend = backend_factory(2, 1000)
+    assert backend.put("a", b"page a") == []
+    backend.put("b", b"page b")
+    assert backend.get("a") == b"page a"  # "a" is now the most recently used
+    assert backend.put("c", b"page c") == ["b"]  # so "b" should be evicted
+
+    assert backend.get("b") is None
+    assert backend.get("c") == b"page c"
+    assert len(backend) == 2
+
+
+def test_backend_size_limit(backend_factory):
+    backend = backend_factory(10, 110)  # the disk backend counts the key stored with each page as well
+    backend.put("a", b"x" * 50)
+    backend.put("b", b"x" * 50)
+    assert backend.put("c", b"x" * 30) == ["a"]  # check the oldest page makes room once the bytes run out
+    assert backend.put("d", b"x" * 111) == []  # check a page bigger than the whole cache isn't stored
+    assert backend.get("d") is None
+
+    backend.delete("b")
+    assert backend.get("b") is None
+    backend.clear()
+    assert len(backend) == 0 and backend.get("c") is None
+
+
+def test_disk_backend_is_shared(tmp_path):
+    first = DiskResponseCacheBackend(str(tmp_path), 2, 1000)
+    first.put("a", b"page a")
+    first.put("b", b"page b")
+    second = DiskResponseCacheBackend(str(tmp_path), 2, 1000)  # e.g. another worker, or a restart
+    assert second.get("a") == b"page a"  # check pages written by one backend are served by the other
+    assert second.put("c", b"page c") == ["b"]  # check they evict in the same order, "a" was last used by second
+    assert first.get("b") is None and len(first) == 2
+
+    second.put("key\nwith a newline", b"page d")
+    assert first.get("key\nwith a newline") == b"page d"
+
+
+def test_disk_backend_evicts_below_its_limits(tmp_path):
+    backend = DiskResponseCacheBackend(str(tmp_path), 10, 1000)
+    for i in range(10):
+        backend.put(str(i), b"page")
+    assert backend.put("10", b"page") == ["0", "1"]  # check a full directory is brought a tenth under its limits
+    assert backend.put("11", b"page") == []  # so the next put doesn't have to scan it again
+    assert len(backend) == 10
+
+
+def test_response_cache_key():
+    versions = [DataVersion(3, 100.0)]
+    key = ResponseCache.key("games.index", {}, [("sort_by", "title"), ("page", "2")], versions)
+    assert key == ResponseCache.key("games.index", {}, [("page", "2"), ("sort_by", "title")], versions)  # check argument order doesn't matter
+    assert key != ResponseCache.key("games.index", {}, [("page", "2"), ("sort_by", "title")], [DataVersion(4, 200.0)])  # check a new catalogue version is a new key
+    assert key != ResponseCache.key("games.index", {}, [("page", "2"), ("sort_by", "title")], [DataVersion(3, 300.0)])  # check a rebuilt database is a new key
+    assert key != ResponseCache.key("games.search", {}, [("page", "2"), ("sort_by", "title")], versions)
+
+
+def test_response_cache_tags():
+    cache = ResponseCache(MemoryResponseCacheBackend(10, 1000))
+    cache.put("game 1", b"game 1", tags=["game:1"])
+    cache.put("game 1 again", b"game 1", tags=["game:1"])
+    cache.put("game 2", b"game 2", tags=["game:2"])
+
+    cache.invalidate("game:1")
+    assert cache.get("game 1") is None and cache.get("game 1 again") is None
+    assert cache.get("game 2") == b"game 2"  # check other pages are kept
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_create_response_cache(tmp_path):
+    config = {"RESPONSE_CACHE_MAX_ENTRIES": 10, "RESPONSE_CACHE_MAX_BYTES": 1000, "RESPONSE_CACHE_DIRECTORY": str(tmp_path)}
+    assert create_response_cache({**config, "RESPONSE_CACHE_BACKEND": "none"}) is None
+    assert create_response_cache({**config, "RESPONSE_CACHE_BACKEND": "memory"}) is not None
+    assert create_response_cache({**config, "RESPONSE_CACHE_BACKEND": "disk"}) is not None
+    with pytest.raises(ValueError):
+        create_response_cache({**config, "RESPONSE_CACHE_BACKEND": "fake"})
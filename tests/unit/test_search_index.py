@@ -0,0 +1,29 @@
+from thefuzz import fuzz
+
+from games.repository.search_index import SearchIndex, normalise, trigrams
+
+
+def test_normalise():
+    assert normalise("Call of Duty® 4: Modern Warfare®") == "4 call duty modern of warfare"  # check symbols are dropped and tokens sorted
+    assert normalise("  ") == ""
+
+
+def test_trigrams():
+    assert trigrams("a") == {"$a$"}  # check single letter tokens still produce a gram
+    assert trigrams("war") == {"$wa", "war", "ar$"}
+
+
+def test_search_ranking():
+    titles = {1: "Call of Duty", 2: "Call of Duty 2", 3: "Duty Calls", 4: "Stardew Valley", 5: "Call of Duty"}
+    index = SearchIndex()
+    for game_id, title in titles.items():
+        index.add(game_id, title)
+
+    results = index.search("call of duty")
+    assert results[:2] == [5, 1]  # check equal scores are ordered by highest id first
+    assert 4 not in results  # check titles that share nothing with the search term are pruned
+
+    expected = sorted(results, key=lambda game_id: (fuzz.token_sort_ratio(titles[game_id].lower(), "call of duty"), game_id), reverse=True)
+    assert results == expected  # check candidates keep the same ranking as scoring every title with thefuzz
+
+    assert index.search("???") == []  # check a search term with no letters or numbers matches nothing
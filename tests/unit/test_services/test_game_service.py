@@ -1,8 +1,10 @@
 import pytest
+from urllib.parse import urlparse, parse_qs
 
 from flask import Flask
 from games.service import game_service
 from games.domainmodel.model import Game, Genre, Publisher
+from games.pagination.cursor import Cursor
 from games.repository.game_repository.game_repository import GameRepository
 from games.repository.game_repository.adapters import csv_game_repository
 from games.exceptions import service_layer_exceptions
@@ -59,7 +61,7 @@ def test_get_games(populated_game_repository, test_app):
         game_page = game_service.get_games(repository=populated_game_repository, page_number=1, count=10, reverse=False, endpoint='test')
         assert len(game_page.data) == 10  # check if there are 10 games in the page
         assert game_page.has_next_page  # ensure there is a next page, since our test data has more than 10 games
-        assert game_page.next_page_url == 'http://localhost/test?page=2' # ensure the next page url correctly sets the page number
+        assert game_page.next_page_url.startswith('http://localhost/test?page=2&cursor=') # ensure the next page url correctly sets the page number and continues from the last game
 
 def test_get_games_sorted_by_date(populated_game_repository, test_app):
     with test_app.app_context():
@@ -74,13 +76,32 @@ def test_get_games_sorted_alphabetically(populated_game_repository, test_app):
         game_page = game_service.get_games_sorted_alphabetically(repository=populated_game_repository, page_number=1, count=10, reverse=False, endpoint='test')
         assert len(game_page.data) == 10
         assert game_page.has_next_page
-        assert game_page.next_page_url == 'http://localhost/test?page=2'
+        assert game_page.next_page_url.startswith('http://localhost/test?page=2&cursor=')
         sorted_games = populated_game_repository.get_games_sorted_alphabetically(1, 10000000, False) # Get all games sorted alphabetically
         assert game_page.data == sorted_games[:10]  # check if the games are sorted by title
         reverse_game_page = game_service.get_games_sorted_alphabetically(repository=populated_game_repository, page_number=1, count=10, reverse=True, endpoint='test')
         assert reverse_game_page.data == list(reversed(sorted_games[-10:]))  # check if the games are sorted by title in reverse
         assert reverse_game_page.has_next_page
 
+def test_cursor_pages_match_offset_pages(populated_game_repository, test_app):
+    listings = [game_service.get_games, game_service.get_games_sorted_alphabetically, game_service.get_games_sorted_by_date]
+    with test_app.app_context():
+        for listing in listings:
+            for reverse in (False, True):
+                pages = [listing(repository=populated_game_repository, page_number=1, count=10, reverse=reverse, endpoint='test')]
+                while pages[-1].next_page_url is not None:  # follow the next links to the end
+                    query = parse_qs(urlparse(pages[-1].next_page_url).query)
+                    pages.append(listing(repository=populated_game_repository, page_number=int(query['page'][0]), count=10, reverse=reverse, endpoint='test', cursor=Cursor.decode(query['cursor'][0])))
+
+                for page in pages:  # check every page holds the same games it would have by offset
+                    assert page.data == listing(repository=populated_game_repository, page_number=page.page, count=10, reverse=reverse, endpoint='test').data
+                assert pages[-1].page == pages[-1].total_pages
+
+                query = parse_qs(urlparse(pages[-1].prev_page_url).query)  # check the previous link goes back a page
+                prev_page = listing(repository=populated_game_repository, page_number=int(query['page'][0]), count=10, reverse=reverse, endpoint='test', cursor=Cursor.decode(query['cursor'][0]))
+                assert prev_page.data == pages[-2].data
+                assert prev_page.has_next_page and prev_page.has_prev_page
+
 def test_get_games_by_genre(populated_game_repository, test_app):
     with test_app.app_context():
         game_page = game_service.get_games_with_genre(Genre('Action'), repository=populated_game_repository, page_number=1, count=10, reverse=False, endpoint='test')
@@ -3,6 +3,7 @@ import pytest
 from flask import Flask
 
 from games.repository.review_repository.adapters import csv_review_repository
+from games.repository.review_repository.review_repository import ReviewDTO
 from games.service import review_service
 from games.exceptions.service_layer_exceptions import ResourceAlreadyExistsException, ResourceNotFoundException
 from games.domainmodel.model import User, Review, Game
@@ -159,4 +160,27 @@ def test_get_review_by_game(unpopulated_review_repository):
     assert reviews_g1[1].game == game_1
 
     assert reviews_g2[0].game == game_2
-    assert reviews_g2[1].game == game_2
\ No newline at end of file
+    assert reviews_g2[1].game == game_2
+
+
+def test_review_dtos_to_reviews_looks_up_each_user_and_game_once(unpopulated_review_repository):
+    users = [User('eli', 'password'), User('max', 'password')]
+    for user in users:
+        user_repository.user_repo_instance.add_user(user)
+    games = [Game(1, 'Game 1'), Game(2, 'Game 2')]
+    for game in games:
+        game_service.add_game(game, game_repository.game_repo_instance)
+
+    lookups = []
+
+    class CountingUserRepository:
+        def get_user(self, username):
+            lookups.append(username)
+            return user_repository.user_repo_instance.get_user(username)
+
+    review_dtos = [ReviewDTO(user.username, game.game_id, 3, f'comment {i}') for i in range(3) for user in users for game in games]
+    reviews = review_service.review_dtos_to_reviews(review_dtos, CountingUserRepository(), game_repository.game_repo_instance)
+
+    assert sorted(lookups) == ['eli', 'max']
+    assert [(review.user.username, review.game.game_id, review.comment) for review in reviews] == \
+           [(dto.username, dto.game_id, dto.comment) for dto in review_dtos]
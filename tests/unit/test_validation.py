@@ -1,6 +1,7 @@
 import pytest
 
 from games.utils import validation, constants
+from games.pagination.cursor import Cursor
 from games.exceptions.view_layer_exceptions import BadRequestException
 
 raises_error = object()  # This is a unique object (sentinel) that we can use to signify that an error should be raised.
@@ -93,6 +94,8 @@ def test_validate_search_term(search_term, expected_result):
         ("0", raises_error),  # Strings that can be converted to integers are valid but they still need to be positive
         ("-1", raises_error),  # Strings that can be converted to integers are valid but they still need to be positive
         ("a", raises_error),  # Strings that cannot be converted to integers are not valid
+        (2 ** 63 - 1, 2 ** 63 - 1),  # The largest id a 64 bit integer column holds is valid
+        (str(10 ** 30), raises_error),  # Larger ones can't even be looked up
         ("", raises_error),  # Empty strings are not valid
         (True, 1),  # Booleans are valid but they need to be converted to integers
         (False, raises_error),  # Booleans are valid but False == 0 so they still need to be positive
@@ -148,4 +151,20 @@ def test_validate_publisher_name(publisher_name, expected_result):
         assert validation.validate_publisher_name(publisher_name) == expected_result
     else:
         with pytest.raises(BadRequestException):
-            validation.validate_publisher_name(publisher_name)
\ No newline at end of file
+            validation.validate_publisher_name(publisher_name)
+@pytest.mark.parametrize(
+    "cursor,sort_by",
+    [
+        (Cursor(10 ** 30, 10 ** 30), None),  # Ids too large for a 64 bit integer column are not valid
+        (Cursor("Title", 10 ** 30), "title"),  # Even when the sort key is fine
+        (Cursor(-1, -1), None),  # Negative ids are not valid
+        (Cursor(2 ** 63, 2 ** 63), None),  # Just past the largest 64 bit integer
+    ]
+)
+def test_validate_cursor_rejects_out_of_range_ids(cursor, sort_by):
+    with pytest.raises(BadRequestException):
+        validation.validate_cursor(cursor.encode(), sort_by)
+
+def test_validate_cursor_accepts_largest_id():
+    cursor = validation.validate_cursor(Cursor(2 ** 63 - 1, 2 ** 63 - 1).encode(), None)
+    assert cursor.game_id == 2 ** 63 - 1
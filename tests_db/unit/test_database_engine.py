@@ -0,0 +1,39 @@
+import pytest
+
+from sqlalchemy.pool import NullPool, QueuePool
+
+from games import create_database_engine, POOL_CLASSES
+from games.config import Config
+
+
+def config_with(**overrides):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update(overrides)
+    return config
+
+
+def test_pool_configuration(tmp_path):
+    database_uri = 'sqlite:///{}'.format(tmp_path / 'pool.db')
+
+    engine = create_database_engine(database_uri, config_with(SQLALCHEMY_POOL_CLASS='queue', SQLALCHEMY_POOL_SIZE=3))
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+
+    engine = create_database_engine(database_uri, config_with(SQLALCHEMY_POOL_CLASS='null'))
+    assert isinstance(engine.pool, NullPool)
+
+    engine = create_database_engine(database_uri, config_with(SQLALCHEMY_POOL_CLASS=None))
+    assert isinstance(engine.pool, POOL_CLASSES[Config.SQLALCHEMY_POOL_CLASS])  # assert an unset pool class uses the Config default
+
+    with pytest.raises(ValueError):
+        create_database_engine(database_uri, config_with(SQLALCHEMY_POOL_CLASS='fake'))
+
+
+def test_sqlite_pragmas(tmp_path):
+    database_uri = 'sqlite:///{}'.format(tmp_path / 'pragmas.db')
+    engine = create_database_engine(database_uri, config_with(SQLITE_JOURNAL_MODE='WAL', SQLITE_SYNCHRONOUS='NORMAL', SQLITE_CACHE_SIZE=-2000))
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar().lower() == 'wal'
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -2000
@@ -1,3 +1,8 @@
+from unittest.mock import patch
+
+from games import repository
+from games.repository.database_loader import DatabaseLoader
+from games.repository.game_repository.adapters import csv_game_repository
 from games.repository.game_repository.adapters import database_game_repository
 from games.repository.user_repository.adapters import database_user_repository
 from games.repository.review_repository.adapters import database_review_repository
@@ -30,4 +35,41 @@ def test_population(session_context_manager):
     for user in user_repository.get_users(1, user_repository.get_number_of_users(), False):
         total += len(review_repository.get_reviews_by_user(user))
 
-    assert total != 0
\ No newline at end of file
+    assert total != 0
+
+def test_loader_loads_every_file_once_without_swapping_repositories(session_context_manager):
+    game_repository = database_game_repository.DatabaseGameRepository(session_context_manager)
+    user_repository = database_user_repository.DatabaseUserRepository(session_context_manager)
+    review_repository = database_review_repository.DatabaseReviewRepository(session_context_manager)
+    wishlist_repository = database_wishlist_repository.DatabaseWishlistRepository(session_context_manager)
+
+    game_repo_instance = repository.game_repository.game_repo_instance
+    user_repo_instance = repository.user_repository.user_repo_instance
+
+    with patch.object(csv_game_repository, 'read_games', wraps=csv_game_repository.read_games) as read_games:
+        DatabaseLoader(session_context_manager).load(game_repository, True)
+    assert read_games.call_count == 1
+
+    assert repository.game_repository.game_repo_instance is game_repo_instance
+    assert repository.user_repository.user_repo_instance is user_repo_instance
+
+    assert user_repository.get_number_of_users() == 3
+    max_user = user_repository.get_user("max")
+    assert sorted(wish.game.game_id for wish in wishlist_repository.get_wishlist_by_user(max_user)) == [7940, 1228870]
+    assert [review.rating for review in review_repository.get_reviews_by_user(max_user)] == [1]
+
+    summary = review_repository.get_rating_summary(game_repository.get_game(7940))
+    assert (summary.count, summary.total, summary.histogram[5]) == (1, 5, 1)
+
+
+def test_loading_again_adds_nothing(session_context_manager):
+    game_repository = database_game_repository.DatabaseGameRepository(session_context_manager)
+    review_repository = database_review_repository.DatabaseReviewRepository(session_context_manager)
+    loader = DatabaseLoader(session_context_manager)
+
+    loader.load(game_repository, True)
+    loader.load(game_repository, True)
+
+    game = game_repository.get_game(410320)
+    assert len(review_repository.get_reviews_for_game(game)) == 1
+    assert review_repository.get_rating_summary(game).count == 1
@@ -0,0 +1,151 @@
+import re
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+
+from games.domainmodel.model import Game, Genre, Publisher, User
+from games.pagination.cursor import Cursor
+from games.repository.orm import metadata, create_indexes
+from games.repository.game_repository.adapters import database_game_repository
+from games.repository.review_repository.adapters import database_review_repository
+from games.repository.user_repository.adapters import database_user_repository
+from games.repository.wishlist_repository.adapters import database_wishlist_repository
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+$")  # an index scan reads "SCAN <table> USING [COVERING] INDEX ..."
+
+
+@pytest.fixture
+def repositories(session_context_manager):
+    game_repo = database_game_repository.DatabaseGameRepository(session_context_manager)
+    user_repo = database_user_repository.DatabaseUserRepository(session_context_manager)
+    review_repo = database_review_repository.DatabaseReviewRepository(session_context_manager)
+    wishlist_repo = database_wishlist_repository.DatabaseWishlistRepository(session_context_manager)
+    for repo in (game_repo, user_repo, review_repo, wishlist_repo):
+        repo.populate(True)
+    return game_repo, user_repo, review_repo, wishlist_repo
+
+
+def full_scans(engine, statements):
+    scans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+                if FULL_SCAN.match(row[-1]):
+                    scans.append((row[-1], statement))
+    return scans
+
+
+def query_plans(engine, statements):
+    with engine.connect() as connection:
+        return [[row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+                for statement, parameters in statements]
+
+
+def test_repository_queries_use_indexes(session_context_manager, repositories):
+    game_repo, user_repo, review_repo, wishlist_repo = repositories
+    engine = session_context_manager.session.get_bind()
+
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+
+    game = game_repo.get_game(7940)
+    user = User("kanye", "Password123")
+    game_repo.get_games(1, 2, False, cursor=Cursor(game.game_id, game.game_id))
+    for reverse in (False, True):
+        game_repo.get_games_sorted_alphabetically(2, 2, reverse)
+        game_repo.get_games_sorted_by_date(2, 2, reverse)
+        game_repo.get_games_sorted_alphabetically(1, 2, reverse, cursor=Cursor(game.title, game.game_id))
+        game_repo.get_games_sorted_by_date(1, 2, reverse, cursor=Cursor(game.get_datetime(), game.game_id, before=True))
+        game_repo.get_games_sorted_by_date(1, 2, reverse, cursor=Cursor(None, game.game_id))
+    game_repo.get_games_with_genre(Genre("Action"), 1, 2)
+    game_repo.get_games_by_publisher(Publisher("Activision"), 1, 2)
+    game_repo.get_number_of_games_with_genre(Genre("Action"))
+    game_repo.get_number_of_games_by_publisher(Publisher("Activision"))
+    user_repo.get_users(2, 2, False)
+    review_repo.get_reviews_for_game(game)
+    review_repo.get_reviews_by_user(user)
+    for sort_by in ('rating', 'newest'):
+        review_repo.get_page_of_reviews_for_game(game, sort_by, 2, 2)
+        review_repo.get_page_of_reviews_by_user(user, sort_by, 2, 2)
+    wishlist_repo.get_wishlist_by_game(game)
+    wishlist_repo.get_wishlist_by_user(user)
+    wishlist_repo.has_wish(user, game)
+
+    event.remove(engine, 'before_cursor_execute', record)
+
+    assert len(statements) > 0
+    assert full_scans(engine, statements) == []
+
+
+def test_review_pages_are_read_in_index_order(session_context_manager, repositories):
+    game_repo, user_repo, review_repo, wishlist_repo = repositories
+    engine = session_context_manager.session.get_bind()
+
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    for sort_by in ('rating', 'newest'):
+        review_repo.get_page_of_reviews_for_game(Game(7940, "blah"), sort_by, 1, 2)
+        review_repo.get_page_of_reviews_by_user(User("kanye", "Password123"), sort_by, 1, 2)
+    event.remove(engine, 'before_cursor_execute', record)
+
+    with engine.connect() as connection:
+        sorts = [row[-1] for statement, parameters in statements
+                 for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+                 if "TEMP B-TREE" in row[-1]]
+    assert sorts == []
+
+
+def test_allowed_scans_and_sorts(session_context_manager, repositories):
+    """
+    The queries left out of the tests above, with the plans they are allowed to have
+    """
+    game_repo = repositories[0]
+    engine = session_context_manager.session.get_bind()
+
+    def plans_of(read):
+        statements = []
+
+        def record(connection, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', record)
+        read()
+        event.remove(engine, 'before_cursor_execute', record)
+        return query_plans(engine, statements[:1])[0]  # the page query, the genres and publishers are loaded by id
+
+    # An offset page of the default listing walks the table in rowid order and stops after offset + count rows, so the
+    # plan reads "SCAN games" but there is no sort. Skipping the offset can't be done with an index, the listing
+    # follows its cursor after the first page, which is a rowid range (checked above).
+    assert plans_of(lambda: game_repo.get_games(2, 2, False)) == ["SCAN games"]
+
+    # Search results are ranked by bm25, which no index holds, so the matches are sorted. Only the rows the full text
+    # index matched are read and sorted, and the games are looked up by rowid.
+    search_plan = plans_of(lambda: game_repo.search_games("call", 1, 2))
+    assert search_plan[0].startswith("SCAN games_search VIRTUAL TABLE INDEX")
+    assert search_plan[1:] == ["SEARCH games USING INTEGER PRIMARY KEY (rowid=?)", "USE TEMP B-TREE FOR ORDER BY"]
+
+
+def test_create_indexes_on_existing_database():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    for table in metadata.sorted_tables:  # simulate a database created before the indexes existed
+        for index in table.indexes:
+            engine.execute("DROP INDEX {}".format(index.name))
+    engine.execute("INSERT INTO game_genre_relationship (game_id, genre_name) VALUES (1, 'Action'), (1, 'Action'), (1, 'Indie')")
+
+    create_indexes(engine)
+    assert {index['name'] for index in inspect(engine).get_indexes('reviews')} == {'ix_reviews_game_id', 'ix_reviews_user_id', 'ix_reviews_game_id_rating', 'ix_reviews_user_id_rating'}
+    assert engine.execute("SELECT game_id, genre_name FROM game_genre_relationship ORDER BY id").fetchall() == [(1, 'Action'), (1, 'Indie')]  # check duplicate links are removed
+
+    create_indexes(engine)  # check running it again does nothing
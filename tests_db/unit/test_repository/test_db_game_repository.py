@@ -1,7 +1,11 @@
 import pytest
 
+from sqlalchemy import create_engine, event, text
+
 from games.repository.game_repository.adapters import database_game_repository
-from games.repository.orm import SessionContextManager
+from games.repository.game_repository.adapters.csv_game_repository import CSVGameRepository
+from games.repository.orm import SessionContextManager, metadata, create_search_index
+from games.pagination.cursor import Cursor
 from games.domainmodel.model import Game, Publisher, Genre, User, Review, Wishlist
 from games.repository import game_repository
 from games.__init__ import create_app
@@ -40,6 +44,19 @@ class TestDatabase:
         with pytest.raises(repository_layer_exceptions.ResourceAlreadyExistsException):
             game_repo.add_game(game)
 
+    def test_release_date_is_read_as_ordinal(self, unpopulated_game_repository, session_context_manager):
+        game_repo = unpopulated_game_repository
+
+        game = Game(1234, "Test Game")
+        game.release_date = "Oct 10, 2021"
+        game_repo.add_game(game)
+
+        with session_context_manager as scm:
+            stored = scm.session.execute(text("SELECT release_date FROM games WHERE id = 1234")).scalar()
+        assert stored == "2021-10-10"  # still a DATE in the database
+        assert game_repo.get_game(1234).release_date_ordinal == game.release_date_ordinal
+        assert game_repo.get_game(1234).release_date == "2021-10-10"
+
 
     def test_add_genre(self, unpopulated_game_repository):
         game_repo = unpopulated_game_repository
@@ -138,4 +155,172 @@ class TestDatabase:
             game_repo.add_game(game)
 
         date_sorted_games = game_repo.get_games_sorted_by_date(1, 1000, False)
-        assert date_sorted_games == sorted(date_sorted_games, key=lambda game: game.release_date)
\ No newline at end of file
+        assert date_sorted_games == sorted(date_sorted_games, key=lambda game: game.release_date)
+
+    def test_catalogue_version(self, session_context_manager):
+        game_repo = database_game_repository.DatabaseGameRepository(session_context_manager)
+        other_game_repo = database_game_repository.DatabaseGameRepository(session_context_manager)  # e.g. in another worker
+        assert other_game_repo.get_number_of_games() == 0
+
+        game_repo.populate(True)
+        versions = [other_game_repo.get_catalogue_version()]
+        assert other_game_repo.get_number_of_games() == 4  # check the cached count follows the version in the database
+
+        game_repo.add_genre(Genre("Test Genre"))
+        versions.append(other_game_repo.get_catalogue_version())
+        game_repo.add_publisher(Publisher("Test Publisher"))
+        versions.append(other_game_repo.get_catalogue_version())
+        game_repo.add_game(Game(1, "Test Game"))
+        versions.append(other_game_repo.get_catalogue_version())
+
+        assert [version.version for version in versions] == [1, 2, 3, 4]
+        assert versions == sorted(versions, key=lambda version: version.modified)
+        assert other_game_repo.get_number_of_games() == 5
+
+    def test_listing_counts(self, unpopulated_game_repository):
+        game_repo = unpopulated_game_repository
+
+        genre = Genre("Test Genre")
+        publisher = Publisher("Test Publisher")
+        game_repo.add_genre(genre)
+        game_repo.add_publisher(publisher)
+
+        assert game_repo.get_number_of_games() == 0
+        assert game_repo.get_number_of_games_with_genre(genre) == 0
+
+        for i in range(1, 4):
+            game = Game(i, "Test Game {}".format(i))
+            game.add_genre(genre)
+            game.publisher = publisher
+            game_repo.add_game(game)  # adding games should invalidate the cached counts
+
+        assert game_repo.get_number_of_games() == 3
+        assert game_repo.get_number_of_games_with_genre(genre) == 3
+        assert game_repo.get_number_of_games_by_publisher(publisher) == 3
+        assert game_repo.get_number_of_search_results("Game 2") == 1
+        assert game_repo.get_number_of_search_results("fajskdfj02ijfsa") == 0
+
+    def test_count_cache_is_bounded(self, session_context_manager):
+        game_repo = database_game_repository.DatabaseGameRepository(session_context_manager, count_cache_size=2)
+        game_repo.populate(True)
+
+        for search_term in ["one", "two", "three", "four"]:
+            game_repo.get_number_of_search_results(search_term)
+        assert len(game_repo.count_cache) == 2
+
+        game_repo.get_number_of_games()
+        game_repo.get_number_of_games()
+        assert game_repo.count_cache.hits == 1
+        assert len(game_repo.count_cache) == 2
+
+    def test_bulk_populate_matches_csv(self, populated_game_repository):
+        game_repo = populated_game_repository
+        csv_repo = CSVGameRepository()
+        csv_repo.populate(True)
+
+        for csv_game in csv_repo.get_games(1, csv_repo.get_number_of_games(), False):
+            game = game_repo.get_game(csv_game.game_id)
+            assert game.title == csv_game.title
+            assert game.publisher == csv_game.publisher
+            assert sorted(game.genres) == sorted(csv_game.genres)
+            assert game.release_date[:10] == csv_game.release_date[:10]
+        assert sorted(game_repo.get_genres()) == sorted(csv_repo.get_genres())
+        assert sorted(game_repo.get_publishers()) == sorted(csv_repo.get_publishers())
+
+        game_repo.populate(True)  # check loading again leaves the existing rows alone
+        assert game_repo.get_number_of_games() == csv_repo.get_number_of_games()
+        assert game_repo.get_number_of_games_with_genre(Genre("Action")) == csv_repo.get_number_of_games_with_genre(Genre("Action"))
+
+    def test_listing_statement_count(self, session_context_manager):
+        game_repo = database_game_repository.DatabaseGameRepository(session_context_manager)
+        for game_id in range(1, 41):
+            game = Game(game_id, "Game {}".format(game_id))
+            game.price = game_id / 2
+            game.release_date = "Oct 21, 2008"
+            game.image_url = "https://example.com/{}.jpg".format(game_id)
+            game.publisher = Publisher("Publisher {}".format(game_id % 3))
+            game.add_genre(Genre("Genre {}".format(game_id % 4)))
+            game.add_genre(Genre("Genre {}".format(game_id % 5)))
+            game_repo.add_game(game)
+
+        statements = []
+        event.listen(session_context_manager.session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        listings = [
+            lambda count: game_repo.get_games(1, count, False),
+            lambda count: game_repo.get_games_sorted_alphabetically(1, count, True),
+            lambda count: game_repo.get_games_sorted_by_date(1, count, False),
+            lambda count: game_repo.get_games_with_genre(Genre("Genre 1"), 1, count),
+            lambda count: game_repo.get_games_by_publisher(Publisher("Publisher 1"), 1, count),
+            lambda count: game_repo.search_games("game", 1, count),
+        ]
+        for listing in listings:
+            for count in (5, 20):
+                statements.clear()
+                for game in listing(count):  # touch everything a game card and its links show
+                    assert game.title == "Game {}".format(game.game_id)
+                    assert game.image_url == "https://example.com/{}.jpg".format(game.game_id)
+                    assert game.price == game.game_id / 2
+                    assert game.release_date == "2008-10-21"
+                    assert game.publisher.publisher_name == "Publisher {}".format(game.game_id % 3)
+                    assert {genre.genre_name for genre in game.genres} == {"Genre {}".format(game.game_id % 4), "Genre {}".format(game.game_id % 5)}
+                assert len(statements) == 3  # the page, its genres and its publishers
+
+    def test_cursor_pages(self, session_context_manager):
+        game_repo = database_game_repository.DatabaseGameRepository(session_context_manager)
+        for game_id in range(1, 31):
+            game = Game(game_id, "Game {}".format(game_id % 7))  # repeated titles and dates, so ties are broken by id
+            if game_id % 4 != 0:  # some games have no release date
+                game.release_date = "Oct {}, 2008".format(game_id % 5 + 1)
+            game_repo.add_game(game)
+
+        statements = []
+        event.listen(session_context_manager.session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2:4]))
+
+        listings = [
+            (game_repo.get_games, lambda game: game.game_id),
+            (game_repo.get_games_sorted_alphabetically, lambda game: game.title),
+            (game_repo.get_games_sorted_by_date, lambda game: game.get_datetime()),
+        ]
+        for listing, sort_key in listings:
+            for reverse in (False, True):
+                expected = listing(1, 100, reverse)
+                for position in range(len(expected)):
+                    game = expected[position]
+                    statements.clear()
+                    after = listing(1, 4, reverse, cursor=Cursor(sort_key(game), game.game_id))
+                    before = listing(1, 4, reverse, cursor=Cursor(sort_key(game), game.game_id, before=True))
+                    assert after == expected[position + 1:position + 5]  # check the page after the cursor continues the listing
+                    assert before == expected[max(position - 4, 0):position]  # check the page before it ends just before the cursor
+                    assert all(parameters[-1] == 0 for statement, parameters in statements if "OFFSET" in statement)  # check no rows are skipped
+
+    def test_full_text_search(self, unpopulated_game_repository):
+        game_repo = unpopulated_game_repository
+
+        duty = Game(1, "Call of Duty")
+        space_duty = Game(2, "Space Duty")
+        farm = Game(3, "Farm Together")
+        farm.description = "Answer the call of the countryside"
+        for game in (duty, space_duty, farm):
+            game_repo.add_game(game)
+
+        assert game_repo.search_games("call of dut", 1, 10) == [duty]  # check the last word is matched as a prefix
+        assert game_repo.search_games("CALL", 1, 10) == [duty, farm]  # check title matches rank above description matches
+        assert sorted(game_repo.search_games("duty", 1, 1, lookahead=1)) == [duty, space_duty]
+        assert game_repo.search_games("®", 1, 10) == []  # check a term without words doesn't reach the index
+        assert game_repo.get_number_of_search_results("duty") == 2
+
+
+def test_create_search_index_on_existing_database():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    for name in ("games_search_insert", "games_search_delete", "games_search_update"):  # simulate a database created before the full text index existed
+        engine.execute("DROP TRIGGER {}".format(name))
+    engine.execute("DROP TABLE games_search")
+    engine.execute("INSERT INTO games (id, title) VALUES (1, 'Call of Duty')")
+
+    create_search_index(engine)
+    assert engine.execute("SELECT rowid FROM games_search WHERE games_search MATCH 'duty'").fetchall() == [(1,)]  # check existing games are indexed
+
+    engine.execute("INSERT INTO games (id, title) VALUES (2, 'Space Duty')")
+    assert len(engine.execute("SELECT rowid FROM games_search WHERE games_search MATCH 'duty'").fetchall()) == 2  # check the triggers keep it in sync
@@ -4,6 +4,7 @@ from games.repository.review_repository.review_repository import ReviewRepositor
 from games.repository.review_repository.adapters.database_review_repository import DatabaseReviewRepository
 from games.domainmodel.model import User, Review, Game
 from games.exceptions import repository_layer_exceptions
+from games.repository.orm import rating_summaries_table, create_rating_summaries
 
 class TestDatabaseReviewRepository:
     def test_add_review(self, unpopulated_review_repository):
@@ -67,4 +68,67 @@ class TestDatabaseReviewRepository:
 
         #then try again to add the same review
         with pytest.raises(sqlalchemy.exc.IntegrityError):
-            review_repo.add_review(review)
\ No newline at end of file
+            review_repo.add_review(review)
+
+    def test_rating_summary(self, unpopulated_review_repository):
+        review_repo = unpopulated_review_repository
+        game = Game(1, "Call of Duty")
+        user1 = User("testuser", "Password1")
+        user2 = User("testuser2", "Password2")
+        user3 = User("testuser3", "Password3")
+
+        assert review_repo.get_rating_summary(game).count == 0
+
+        review_repo.add_review(Review(user1, game, 5, "Great Game!"))
+        review_repo.add_review(Review(user2, game, 2, "Not great"))
+        review_repo.add_review(Review(user3, game, 5, "Still great"))
+
+        summary = review_repo.get_rating_summary(game)
+        assert summary.count == 3
+        assert summary.total == 12
+        assert summary.histogram == [0, 0, 1, 0, 0, 2]
+        assert summary.average == 4
+
+    def test_reviews_version(self, session_context_manager):
+        review_repo = DatabaseReviewRepository(session_context_manager)
+        other_review_repo = DatabaseReviewRepository(session_context_manager)  # e.g. in another worker
+        game = Game(1, "Call of Duty")
+        assert review_repo.get_reviews_version(1) == (0, 0.0)
+
+        review_repo.add_review(Review(User("testuser", "Password1"), game, 3, "Fine"))
+        version = other_review_repo.get_reviews_version(1)
+        assert version.version == 1 and version.modified > 0  # check the version is read from the database
+        assert other_review_repo.get_reviews_version(2) == (0, 0.0)  # check other games are unaffected
+
+    def test_rating_summaries_are_backfilled(self, session_context_manager):
+        engine = session_context_manager.session.get_bind()
+        review_repo = DatabaseReviewRepository(session_context_manager)
+        game = Game(1, "Call of Duty")
+        review_repo.add_review(Review(User("testuser", "Password1"), game, 3, "Fine"))
+        review_repo.add_review(Review(User("testuser2", "Password2"), game, 4, "Good"))
+
+        # A database from before the summaries existed
+        rating_summaries_table.drop(engine)
+        create_rating_summaries(engine)
+
+        summary = review_repo.get_rating_summary(game)
+        assert (summary.count, summary.total, summary.histogram) == (2, 7, [0, 0, 0, 1, 1, 0])
+
+    def test_page_of_reviews(self, unpopulated_review_repository):
+        review_repo = unpopulated_review_repository
+        game = Game(1, "Call of Duty")
+        users = [User("testuser{}".format(i), "Password1") for i in range(5)]
+        for i, (user, rating) in enumerate(zip(users, [3, 5, 1, 5, 3])):
+            review_repo.add_review(Review(user, game, rating, "Review {}".format(i)))
+
+        by_rating = review_repo.get_page_of_reviews_for_game(game, 'rating', 1, 3, lookahead=1)
+        assert [review.comment for review in by_rating] == ["Review 3", "Review 1", "Review 4", "Review 0"]
+        assert [review.user.username for review in by_rating] == ["testuser3", "testuser1", "testuser4", "testuser0"]
+
+        newest = review_repo.get_page_of_reviews_for_game(game, 'newest', 2, 2)
+        assert [review.comment for review in newest] == ["Review 2", "Review 1"]
+
+        by_user = review_repo.get_page_of_reviews_by_user(users[1], 'newest', 1, 10)
+        assert [(review.comment, review.game.title) for review in by_user] == [("Review 1", "Call of Duty")]
+        assert review_repo.get_number_of_reviews_by_user(users[1]) == 1
+        assert review_repo.get_number_of_reviews_by_user(User("nobody", "Password1")) == 0
@@ -110,4 +110,23 @@ class TestDatabase:
         wishlist_repo.add_wish(Wish(user2, game))
 
         wishes = wishlist_repo.get_wishlist_by_user(user)
-        assert len(wishes) == 2
\ No newline at end of file
+        assert len(wishes) == 2
+
+    def test_has_wish(self, unpopulated_wishlist_repository, unpopulated_game_repository, unpopulated_user_repository):
+        wishlist_repo = unpopulated_wishlist_repository
+
+        unpopulated_user_repository.add_user(User("joy", "password"))
+        unpopulated_game_repository.add_game(Game(1, "Call of Duty"))
+        unpopulated_game_repository.add_game(Game(2, "Call of Duty 2"))
+        user = unpopulated_user_repository.get_user("joy")
+        game = unpopulated_game_repository.get_game(1)
+        game2 = unpopulated_game_repository.get_game(2)
+
+        assert not wishlist_repo.has_wish(user, game)
+        wishlist_repo.add_wish(Wish(user, game))
+        assert wishlist_repo.has_wish(user, game)
+        assert not wishlist_repo.has_wish(user, game2)
+        assert not wishlist_repo.has_wish(User("nobody", "password"), game)
+
+        wishlist_repo.remove_wish(wishlist_repo.get_wish(game, user))
+        assert not wishlist_repo.has_wish(user, game)